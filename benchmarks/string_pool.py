@@ -0,0 +1,70 @@
+"""Measure the memory used by query results with and without sharing repeated
+strings, as done by :class:`pg_grant.query._StringPool`.
+
+Rows are synthetic, like those of :func:`pg_grant.query.get_all_column_acls`,
+with a new string object for every value, as a database driver returns them.
+
+Usage::
+
+    python benchmarks/string_pool.py [ROWS]
+"""
+import sys
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from pg_grant.query import _StringPool
+from pg_grant.types import ColumnInfo
+
+
+def decode(value: str) -> str:
+    """Return a new string object, like a driver decoding a row."""
+    return value.encode().decode()
+
+
+def make_rows(count: int) -> List[Dict[str, Any]]:
+    owners = ["alice", "bob", "charlie"]
+    rows = []
+    for i in range(count):
+        table = i // 20
+        owner = owners[table % len(owners)]
+        rows.append(
+            {
+                "table_oid": 16384 + table,
+                "schema": decode(f"schema{table % 10}"),
+                "table": decode(f"table{table}"),
+                "column": decode(f"column{i % 20}"),
+                "owner": decode(owner),
+                "acl": [decode(f"{owner}=arwx/{owner}"), decode(f"reader=r/{owner}")],
+            }
+        )
+    return rows
+
+
+def measure(count: int, pool: Callable[[Dict[str, Any]], Dict[str, Any]]) -> int:
+    # Strings that aren't kept by the results are freed with the rows, so only
+    # the memory still in use afterwards is counted.
+    tracemalloc.start()
+    rows = make_rows(count)
+    infos = [ColumnInfo(**pool(row)) for row in rows]
+    del rows
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del infos
+    return size
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    # Without sharing, each ColumnInfo keeps the row's own strings.
+    baseline = measure(count, lambda row: dict(row))
+    pooled = measure(count, _StringPool())  # type: ignore[arg-type]
+
+    mib = 1024 * 1024
+    print(f"{count} ColumnInfo rows")
+    print(f"without string pool: {baseline / mib:.1f} MiB")
+    print(f"with string pool:    {pooled / mib:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
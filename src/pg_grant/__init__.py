@@ -1,7 +1,8 @@
-from .exc import NoSuchObjectError
-from .parse import get_default_privileges, parse_acl, parse_acl_item
+from .exc import ApplyError, NoSuchObjectError
+from .parse import expand_acls, get_default_privileges, parse_acl, parse_acl_item
 from .types import (
     FunctionInfo,
+    ObjectKey,
     PgObjectType,
     Privileges,
     RelationInfo,
@@ -9,12 +10,15 @@ from .types import (
 )
 
 __all__ = (
+    "ApplyError",
     "FunctionInfo",
     "NoSuchObjectError",
+    "ObjectKey",
     "PgObjectType",
     "Privileges",
     "RelationInfo",
     "SchemaRelationInfo",
+    "expand_acls",
     "get_default_privileges",
     "parse_acl",
     "parse_acl_item",
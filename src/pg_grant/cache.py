@@ -0,0 +1,388 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple, TypeVar
+
+from attrs import define, evolve
+
+from . import query as q
+from ._typing_sqlalchemy import ArgTypesInput
+from .exc import NoSuchObjectError
+from .notify import AclChange
+from .types import (
+    ColumnInfo,
+    FunctionInfo,
+    ParameterInfo,
+    PgObjectType,
+    RelationInfo,
+    SchemaRelationInfo,
+)
+
+__all__ = (
+    "AclCache",
+    "CacheStats",
+)
+
+T = TypeVar("T")
+
+# Kind of object, schema, and name (plus argument types for functions).
+_Key = Tuple[str, Optional[str], Hashable]
+
+# Kinds of cached lookup affected by a change to each object type.
+_change_kinds = {
+    PgObjectType.TABLE: ("table", "column"),
+    PgObjectType.FOREIGN_TABLE: ("table", "column"),
+    PgObjectType.SEQUENCE: ("sequence",),
+    PgObjectType.FUNCTION: ("function",),
+    PgObjectType.LANGUAGE: ("language",),
+    PgObjectType.DATABASE: ("database",),
+    PgObjectType.TABLESPACE: ("tablespace",),
+    PgObjectType.TYPE: ("type",),
+    PgObjectType.DOMAIN: ("type",),
+    PgObjectType.PARAMETER: ("parameter",),
+}
+
+
+def _identity_name(identity: Optional[str], schema: Optional[str]) -> Optional[str]:
+    """Return the name of an object (or of the table, for a column) from its
+    identity as given by PostgreSQL, e.g. ``'public.table1.id'``, or ``None``
+    if it can't be found.
+    """
+    if identity is None:
+        return None
+
+    if schema is not None:
+        quoted = '"{}"'.format(schema.replace('"', '""'))
+        for prefix in (schema + ".", quoted + "."):
+            if identity.startswith(prefix):
+                identity = identity[len(prefix) :]
+                break
+        else:
+            return None
+
+    if not identity.startswith('"'):
+        return identity.split(".", 1)[0].split("(", 1)[0] or None
+
+    # Quoted identifier, with "" for each quote in the name.
+    end = 1
+    while True:
+        end = identity.find('"', end)
+        if end == -1:
+            return None
+        if identity[end + 1 : end + 2] != '"':
+            return identity[1:end].replace('""', '"')
+        end += 2
+
+
+@define
+class CacheStats:
+    """Statistics of an :class:`AclCache`."""
+
+    #: Lookups answered from the cache, including cached missing objects.
+    hits: int = 0
+
+    #: Lookups which queried the database.
+    misses: int = 0
+
+    #: Lookups which waited for another thread to query the same object.
+    coalesced: int = 0
+
+    #: Entries removed to make space for new ones.
+    evictions: int = 0
+
+    #: Total time spent querying the database, in seconds.
+    load_time: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups answered without querying the database."""
+        total = self.hits + self.misses + self.coalesced
+        return (self.hits + self.coalesced) / total if total else 0.0
+
+    @property
+    def average_load_time(self) -> float:
+        """Average time spent querying the database, in seconds."""
+        return self.load_time / self.misses if self.misses else 0.0
+
+
+@define
+class _Entry:
+    value: Any
+    error: Optional[NoSuchObjectError]
+    expires: float
+
+
+class _Flight:
+    """A query in progress, which other threads can wait for."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+        self.invalidated = False
+
+
+class AclCache:
+    """Thread-safe cache for the single-object functions of :mod:`.query`,
+    for looking up privileges on the request path without a round trip to the
+    database each time.
+
+    The methods have the same signature as the :mod:`.query` function of the
+    same name. Results expire after `ttl` seconds, and objects that don't
+    exist (:exc:`~.exc.NoSuchObjectError`) are cached for `negative_ttl`
+    seconds. When several threads look up the same object at once, only one
+    of them queries the database.
+
+    .. code-block:: pycon
+
+        >>> from pg_grant.cache import AclCache
+        >>> cache = AclCache(maxsize=10000, ttl=30)
+        >>> cache.get_table_acl(conn, "table2")
+        SchemaRelationInfo(oid=..., name='table2', owner='alice', ...)
+
+    Use :meth:`invalidate` when privileges change, for example from the
+    changes received with :func:`~.notify.listen_acl_changes`, which can be
+    passed to :meth:`handle_change`.
+
+    Parameters:
+        maxsize: Maximum number of entries. The least recently used entries
+                 are evicted first.
+        ttl: Seconds before an entry expires.
+        negative_ttl: Optional. Seconds before an entry for a missing object
+                      expires. By default, the same as `ttl`.
+        clock: Function returning the current time in seconds.
+    """
+
+    def __init__(
+        self,
+        *,
+        maxsize: int = 1024,
+        ttl: float = 60.0,
+        negative_ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be positive.")
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[_Key, _Entry]" = OrderedDict()
+        self._flights: Dict[_Key, _Flight] = {}
+        self._stats = CacheStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def stats(self) -> CacheStats:
+        """A copy of the current statistics."""
+        with self._lock:
+            return evolve(self._stats)
+
+    def _get(self, key: _Key, load: Callable[[], T]) -> T:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires > self._clock():
+                    self._entries.move_to_end(key)
+                    self._stats.hits += 1
+                    if entry.error is not None:
+                        raise NoSuchObjectError(*entry.error.args)
+                    return entry.value  # type: ignore[no-any-return]
+                del self._entries[key]
+
+            flight = self._flights.get(key)
+            leader = flight is None
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+                self._stats.misses += 1
+            else:
+                self._stats.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value  # type: ignore[no-any-return]
+
+        start = self._clock()
+        try:
+            flight.value = load()
+        except BaseException as exc:
+            flight.error = exc
+        load_time = self._clock() - start
+
+        with self._lock:
+            self._stats.load_time += load_time
+            del self._flights[key]
+
+            error = flight.error
+            if not flight.invalidated and (
+                error is None or isinstance(error, NoSuchObjectError)
+            ):
+                ttl = self.ttl if error is None else self.negative_ttl
+                self._entries[key] = _Entry(flight.value, error, self._clock() + ttl)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self._stats.evictions += 1
+
+        flight.done.set()
+
+        if flight.error is not None:
+            raise flight.error
+        return flight.value  # type: ignore[no-any-return]
+
+    def invalidate(
+        self,
+        kind: Optional[str] = None,
+        *,
+        schema: Optional[str] = None,
+        name: Optional[str] = None,
+    ) -> int:
+        """Remove entries so that they are queried again next time.
+
+        Parameters:
+            kind: Optional. Kind of lookup, i.e. the name of the method without
+                  ``get_`` and ``_acl`` or ``_acls``, e.g. ``'table'`` or
+                  ``'column'``.
+            schema: Optional. Schema name. Entries looked up without a schema
+                    are also removed, since they may be in this schema.
+            name: Optional. Name of the object, or of the table for
+                  ``'column'``.
+
+        Returns:
+            Number of entries removed.
+        """
+
+        def matches(key: _Key) -> bool:
+            key_kind, key_schema, key_name = key
+            if isinstance(key_name, tuple):
+                key_name = key_name[0]
+            return (
+                (kind is None or key_kind == kind)
+                and (schema is None or key_schema is None or key_schema == schema)
+                and (name is None or key_name == name)
+            )
+
+        with self._lock:
+            for key, flight in self._flights.items():
+                if matches(key):
+                    flight.invalidated = True
+
+            keys = [key for key in self._entries if matches(key)]
+            for key in keys:
+                del self._entries[key]
+
+        return len(keys)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self.invalidate()
+
+    def handle_change(self, change: AclChange) -> int:
+        """Invalidate the entries which may be affected by a change from
+        :func:`~.notify.listen_acl_changes`.
+
+        When the change names an object, only the entries for that object are
+        removed. Otherwise, e.g. for ``GRANT``, all entries of that kind (in
+        the schema, if known) are removed. Changes to an unknown type of
+        object remove all entries.
+
+        Returns:
+            Number of entries removed.
+        """
+        if change.type is None or change.type is PgObjectType.SCHEMA:
+            # Renaming or dropping a schema affects every object in it.
+            return self.invalidate()
+
+        name = _identity_name(change.identity, change.schema)
+        removed = 0
+        for kind in _change_kinds.get(change.type, ()):
+            removed += self.invalidate(kind, schema=change.schema, name=name)
+        return removed
+
+    def get_table_acl(
+        self, conn: q.Connectable, name: str, schema: Optional[str] = None
+    ) -> SchemaRelationInfo:
+        """Cached :func:`~.query.get_table_acl`."""
+        return self._get(
+            ("table", schema, name), lambda: q.get_table_acl(conn, name, schema)
+        )
+
+    def get_column_acls(
+        self, conn: q.Connectable, table_name: str, schema: Optional[str] = None
+    ) -> List[ColumnInfo]:
+        """Cached :func:`~.query.get_column_acls`."""
+        columns = self._get(
+            ("column", schema, table_name),
+            lambda: tuple(q.get_column_acls(conn, table_name, schema)),
+        )
+        return list(columns)
+
+    def get_sequence_acl(
+        self, conn: q.Connectable, sequence: str, schema: Optional[str] = None
+    ) -> SchemaRelationInfo:
+        """Cached :func:`~.query.get_sequence_acl`."""
+        return self._get(
+            ("sequence", schema, sequence),
+            lambda: q.get_sequence_acl(conn, sequence, schema),
+        )
+
+    def get_function_acl(
+        self,
+        conn: q.Connectable,
+        function_name: str,
+        arg_types: ArgTypesInput,
+        schema: Optional[str] = None,
+    ) -> FunctionInfo:
+        """Cached :func:`~.query.get_function_acl`."""
+        return self._get(
+            ("function", schema, (function_name, tuple(arg_types))),
+            lambda: q.get_function_acl(conn, function_name, arg_types, schema),
+        )
+
+    def get_type_acl(
+        self, conn: q.Connectable, type_name: str, schema: Optional[str] = None
+    ) -> SchemaRelationInfo:
+        """Cached :func:`~.query.get_type_acl`."""
+        return self._get(
+            ("type", schema, type_name),
+            lambda: q.get_type_acl(conn, type_name, schema),
+        )
+
+    def get_language_acl(self, conn: q.Connectable, language: str) -> RelationInfo:
+        """Cached :func:`~.query.get_language_acl`."""
+        return self._get(
+            ("language", None, language), lambda: q.get_language_acl(conn, language)
+        )
+
+    def get_schema_acl(self, conn: q.Connectable, schema: str) -> RelationInfo:
+        """Cached :func:`~.query.get_schema_acl`."""
+        return self._get(
+            ("schema", None, schema), lambda: q.get_schema_acl(conn, schema)
+        )
+
+    def get_database_acl(self, conn: q.Connectable, database: str) -> RelationInfo:
+        """Cached :func:`~.query.get_database_acl`."""
+        return self._get(
+            ("database", None, database), lambda: q.get_database_acl(conn, database)
+        )
+
+    def get_tablespace_acl(self, conn: q.Connectable, tablespace: str) -> RelationInfo:
+        """Cached :func:`~.query.get_tablespace_acl`."""
+        return self._get(
+            ("tablespace", None, tablespace),
+            lambda: q.get_tablespace_acl(conn, tablespace),
+        )
+
+    def get_parameter_acl(
+        self, conn: q.Connectable, parameter: str
+    ) -> Optional[ParameterInfo]:
+        """Cached :func:`~.query.get_parameter_acl`."""
+        return self._get(
+            ("parameter", None, parameter),
+            lambda: q.get_parameter_acl(conn, parameter),
+        )
@@ -0,0 +1,349 @@
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from attrs import define
+from sqlalchemy import Executable
+
+from .parse import (
+    _CODE_BITS,
+    _KEYWORD_BITS,
+    _PRIVILEGE_KEYWORDS,
+    _type_codes,
+    _type_mask,
+    get_default_privileges,
+    parse_acl,
+)
+from .sql import _Grant, _re_valid_priv, _Revoke
+from .types import (
+    ColumnInfo,
+    ObjectKey,
+    ParameterInfo,
+    PgObjectType,
+    Privileges,
+    RelationInfo,
+)
+
+__all__ = (
+    "PrivilegesChange",
+    "diff_acls",
+    "diff_acl_streams",
+    "diff_privileges",
+    "iter_privileges_by_key",
+    "oid_sort_key",
+    "privileges_by_key",
+)
+
+AnyInfo = Union[RelationInfo, ColumnInfo, ParameterInfo]
+
+# Privileges held by a grantee, by subname (None for the object itself). The
+# first mask is for privileges without grant option, the second for those with.
+_Masks = Dict[Optional[str], Tuple[int, int]]
+
+
+def _normalize(
+    type: PgObjectType, privileges: Iterable[Privileges], column: Optional[str]
+) -> Dict[str, _Masks]:
+    """Combine privileges by grantee into bit masks, regardless of grantor."""
+    grantees: Dict[str, _Masks] = {}
+
+    for p in privileges:
+        subnames = grantees.setdefault(p.grantee, {})
+
+        for privs, grant_option in ((p.privs, False), (p.privswgo, True)):
+            for priv in privs:
+                match = _re_valid_priv.fullmatch(priv)
+                if match is None:
+                    raise ValueError(f"Privilege not valid: {priv}")
+
+                keyword, subname = match.groups()
+                if subname is None:
+                    subname = column
+
+                if keyword == "ALL":
+                    bits = _type_mask(type, subname is not None)
+                else:
+                    bits = _KEYWORD_BITS[keyword]
+
+                mask, gomask = subnames.get(subname, (0, 0))
+                if grant_option:
+                    gomask |= bits
+                else:
+                    mask |= bits
+                subnames[subname] = mask, gomask
+
+    return grantees
+
+
+def _mask_privileges(
+    type: PgObjectType, mask: int, subname: Optional[str]
+) -> List[str]:
+    column = subname is not None
+    suffix = "" if subname is None else f" ({subname})"
+
+    if mask == _type_mask(type, column):
+        return ["ALL" + suffix]
+
+    return [
+        _PRIVILEGE_KEYWORDS[code] + suffix
+        for code in _type_codes(type, column)
+        if mask & _CODE_BITS[code]
+    ]
+
+
+def diff_privileges(
+    key: ObjectKey,
+    desired: Iterable[Privileges],
+    current: Iterable[Privileges],
+) -> List[Executable]:
+    """Return the :func:`~.sql.grant` and :func:`~.sql.revoke` statements that
+    change the `current` privileges on an object into the `desired` ones.
+
+    Privileges are compared by grantee, without regard to grantor. Only the
+    missing privileges are granted and only the extra ones revoked. A
+    privilege held with grant option that should be held without it only has
+    its grant option revoked.
+
+    Privileges on columns (e.g. ``'SELECT (user)'``) are compared separately
+    from those on the table itself, like PostgreSQL stores them. If `key` is
+    for a column, privileges without a column are taken to be for that column.
+
+    Parameters:
+        key: The object the privileges are for.
+        desired: Privileges that should be held on the object, including those
+                 of the owner.
+        current: Privileges currently held on the object, e.g. from
+                 :func:`~.parse.parse_acl`. Use
+                 :func:`~.parse.get_default_privileges` if the ACL is ``None``.
+    """
+    type = key.type
+    desired_grantees = _normalize(type, desired, key.column)
+    current_grantees = _normalize(type, current, key.column)
+
+    statements: List[Executable] = []
+
+    for grantee in {**current_grantees, **desired_grantees}:
+        desired_subnames = desired_grantees.get(grantee, {})
+        current_subnames = current_grantees.get(grantee, {})
+
+        for subname in {**current_subnames, **desired_subnames}:
+            mask, gomask = desired_subnames.get(subname, (0, 0))
+            current_mask, current_gomask = current_subnames.get(subname, (0, 0))
+
+            held = mask | gomask
+            current_held = current_mask | current_gomask
+
+            # Revoking a privilege also revokes its grant option.
+            to_revoke = current_held & ~held
+            to_revoke_go = current_gomask & ~gomask & held
+            to_grant = held & ~current_held & ~gomask
+            to_grant_go = gomask & ~current_gomask
+
+            for bits, grant_option, cls in (
+                (to_revoke_go, True, _Revoke),
+                (to_revoke, False, _Revoke),
+                (to_grant, False, _Grant),
+                (to_grant_go, True, _Grant),
+            ):
+                if not bits:
+                    continue
+
+                statements.append(
+                    cls(
+                        _mask_privileges(type, bits, subname),
+                        type,
+                        key.name,
+                        grantee,
+                        grant_option=grant_option,
+                        schema=key.schema,
+                        arg_types=key.arg_types,
+                    )
+                )
+
+    return statements
+
+
+def diff_acls(
+    desired: Mapping[ObjectKey, Iterable[Privileges]],
+    current: Mapping[ObjectKey, Iterable[Privileges]],
+) -> List[Executable]:
+    """Return the :func:`~.sql.grant` and :func:`~.sql.revoke` statements that
+    change the `current` privileges into the `desired` ones for every object
+    in `desired`.
+
+    Objects missing from `current` are assumed to have no privileges. Objects
+    missing from `desired` are left alone; use an empty list to revoke all
+    privileges.
+
+    .. seealso:: :func:`diff_privileges` and :func:`privileges_by_key`.
+    """
+    statements: List[Executable] = []
+    for key, privileges in desired.items():
+        statements.extend(diff_privileges(key, privileges, current.get(key, ())))
+    return statements
+
+
+def privileges_by_key(
+    type: PgObjectType, infos: Iterable[AnyInfo]
+) -> Dict[ObjectKey, List[Privileges]]:
+    """Parse the results of a :mod:`.query` function for use with
+    :func:`diff_acls`.
+
+    Default privileges are used for objects where the ACL is ``None``, except
+    for columns and parameters which have no implicit privileges.
+    """
+    return dict(iter_privileges_by_key(type, infos))
+
+
+def iter_privileges_by_key(
+    type: PgObjectType, infos: Iterable[AnyInfo]
+) -> Iterator[Tuple[ObjectKey, List[Privileges]]]:
+    """Like :func:`privileges_by_key`, but parse the objects one at a time, in
+    the order of `infos`, e.g. for :func:`diff_acl_streams`.
+    """
+    for info in infos:
+        key = ObjectKey.from_info(type, info)
+
+        if info.type is type:
+            # Parsed once and cached by the object.
+            privileges = info.privileges
+        elif info.acl is not None:
+            privileges = parse_acl(info.acl, type, key.column)
+        elif isinstance(info, (ColumnInfo, ParameterInfo)):
+            privileges = []
+        else:
+            privileges = get_default_privileges(type, info.owner)
+
+        yield key, privileges
+
+
+@define(frozen=True)
+class PrivilegesChange:
+    """A difference between two ACL streams, from :func:`diff_acl_streams`.
+
+    Privileges are matched by grantee and grantor.
+    """
+
+    #: The object. For a changed object, this is the key from the new stream.
+    key: ObjectKey
+
+    #: The privileges in the old stream, or ``None`` if they were added.
+    old: Optional[Privileges]
+
+    #: The privileges in the new stream, or ``None`` if they were removed.
+    new: Optional[Privileges]
+
+    @property
+    def kind(self) -> str:
+        """``'added'``, ``'removed'``, or ``'changed'``."""
+        if self.old is None:
+            return "added"
+        if self.new is None:
+            return "removed"
+        return "changed"
+
+
+def oid_sort_key(key: ObjectKey) -> Tuple[str, int, str]:
+    """The default order of :func:`diff_acl_streams`: by object type, then
+    `oid`, then column name.
+    """
+    return key.type.value, key.oid or 0, key.column or ""
+
+
+def _diff_entries(
+    key: ObjectKey, old: Iterable[Privileges], new: Iterable[Privileges]
+) -> Iterator[PrivilegesChange]:
+    old_entries = {(p.grantee, p.grantor): p for p in old}
+
+    for p in new:
+        old_p = old_entries.pop((p.grantee, p.grantor), None)
+        if old_p is None:
+            yield PrivilegesChange(key, None, p)
+        elif sorted(old_p.privs) != sorted(p.privs) or sorted(old_p.privswgo) != sorted(
+            p.privswgo
+        ):
+            yield PrivilegesChange(key, old_p, p)
+
+    for p in old_entries.values():
+        yield PrivilegesChange(key, p, None)
+
+
+def _check_order(
+    entries: Iterable[Tuple[ObjectKey, Iterable[Privileges]]],
+    sort_key: Callable[[ObjectKey], Any],
+) -> Iterator[Tuple[Any, ObjectKey, Iterable[Privileges]]]:
+    previous = None
+    for key, privileges in entries:
+        order = sort_key(key)
+        if previous is not None and not previous < order:
+            raise ValueError(f"ACL stream is not sorted at {key!r}")
+        previous = order
+        yield order, key, privileges
+
+
+def diff_acl_streams(
+    old: Iterable[Tuple[ObjectKey, Iterable[Privileges]]],
+    new: Iterable[Tuple[ObjectKey, Iterable[Privileges]]],
+    *,
+    sort_key: Callable[[ObjectKey], Any] = oid_sort_key,
+) -> Iterator[PrivilegesChange]:
+    """Compare two streams of objects and their privileges, yielding the
+    differences as they are found.
+
+    Both streams must be sorted by `sort_key`, without duplicates, so that
+    they can be merged like a merge join. Only one object from each stream is
+    held in memory at a time, so two catalogs of any size can be compared,
+    e.g. :func:`iter_privileges_by_key` over
+    :func:`~.query.iter_large_object_acls`, which is ordered by `oid`.
+
+    Other sources, such as the ``get_all_*`` functions of :mod:`.query` or
+    :meth:`~.snapshot_file.SnapshotFile.items`, return objects in no
+    particular order, and must be sorted first, e.g.
+    ``sorted(iter_privileges_by_key(type, infos), key=lambda kv:
+    oid_sort_key(kv[0]))``.
+
+    By default, objects are matched by type and `oid`, which suits two
+    snapshots of the same database. To compare different databases, where
+    object identifiers differ, sort both streams by name and pass a
+    matching `sort_key`, e.g.
+    ``lambda k: (k.type.value, k.schema or '', k.name, k.arg_types or (),
+    k.column or '')``.
+
+    Parameters:
+        old: Pairs of :class:`~.types.ObjectKey` and privileges.
+        new: Pairs of :class:`~.types.ObjectKey` and privileges.
+        sort_key: Function returning the value both streams are sorted by.
+
+    Raises:
+        ValueError: if a stream is not sorted.
+    """
+    old_iter = _check_order(old, sort_key)
+    new_iter = _check_order(new, sort_key)
+
+    old_item = next(old_iter, None)
+    new_item = next(new_iter, None)
+
+    while old_item is not None or new_item is not None:
+        if new_item is None or (old_item is not None and old_item[0] < new_item[0]):
+            assert old_item is not None
+            _, key, old_privileges = old_item
+            yield from _diff_entries(key, old_privileges, ())
+            old_item = next(old_iter, None)
+        elif old_item is None or new_item[0] < old_item[0]:
+            _, key, new_privileges = new_item
+            yield from _diff_entries(key, (), new_privileges)
+            new_item = next(new_iter, None)
+        else:
+            _, key, new_privileges = new_item
+            yield from _diff_entries(key, old_item[2], new_privileges)
+            old_item = next(old_iter, None)
+            new_item = next(new_iter, None)
@@ -1,2 +1,15 @@
 class NoSuchObjectError(Exception):
     """Raised by functions in :mod:`.query` when an object does not exist."""
+
+
+class ApplyError(Exception):
+    """Raised by :func:`~.plan.apply_statements` when a statement fails."""
+
+    def __init__(self, sql: str, error: Exception) -> None:
+        super().__init__(f"{error} (statement: {sql})")
+
+        #: The statement that failed.
+        self.sql = sql
+
+        #: The error raised by the database driver.
+        self.error = error
@@ -0,0 +1,378 @@
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .parse import (
+    _KEYWORD_BITS,
+    _acl_masks,
+    _privileges_from_masks,
+    _split_acl_item,
+    _type_mask,
+    get_default_privileges,
+)
+from .types import (
+    ColumnInfo,
+    ObjectKey,
+    ParameterInfo,
+    PgObjectType,
+    Privileges,
+    RelationInfo,
+)
+
+__all__ = ("AclIndex",)
+
+AnyInfo = Union[RelationInfo, ColumnInfo, ParameterInfo]
+
+
+def _contains(postings: "array[int]", value: int) -> bool:
+    # Postings are appended in increasing order, so they are always sorted.
+    i = bisect_left(postings, value)
+    return i < len(postings) and postings[i] == value
+
+
+def _intersect(postings: List["array[int]"]) -> Iterator[int]:
+    postings = sorted(postings, key=len)
+    first, rest = postings[0], postings[1:]
+    for value in first:
+        if all(_contains(p, value) for p in rest):
+            yield value
+
+
+class AclIndex:
+    """In-memory index of the privileges on many objects.
+
+    Each ACL item is stored once as an entry of integers: the object, grantee
+    and grantor are stored as references to shared tables, and the privileges
+    as bit masks. Entries are indexed by object, grantee, grantor, and
+    privilege, so lookups and their intersections don't need to scan every
+    entry.
+
+    Objects are added with :meth:`add_infos` using the results of the
+    :mod:`.query` functions:
+
+    .. code-block:: pycon
+
+        >>> from pg_grant import PgObjectType
+        >>> from pg_grant import query as q
+        >>> from pg_grant.index import AclIndex
+        >>> index = AclIndex()
+        >>> index.add_infos(PgObjectType.TABLE, q.get_all_table_acls(conn))
+        >>> index.add_infos(PgObjectType.FUNCTION, q.get_all_function_acls(conn))
+        >>> index.objects(grantee="bob", privilege="SELECT")
+        [ObjectKey(type=<PgObjectType.TABLE: 'TABLE'>, name='table2', ...)]
+
+    When an object's ACL is ``None``, the privileges from
+    :func:`~.parse.get_default_privileges` are indexed instead, except for
+    columns and parameters which have no implicit privileges.
+    """
+
+    def __init__(self) -> None:
+        self._keys: List[ObjectKey] = []
+        self._key_ids: Dict[ObjectKey, int] = {}
+        self._roles: List[str] = []
+        self._role_ids: Dict[str, int] = {}
+
+        # Entries are stored column-wise to keep them compact.
+        self._entry_object: "array[int]" = array("I")
+        self._entry_grantee: "array[int]" = array("I")
+        self._entry_grantor: "array[int]" = array("I")
+        self._entry_privs: "array[int]" = array("I")
+        self._entry_privswgo: "array[int]" = array("I")
+
+        # Object postings, by object attribute.
+        self._by_type: Dict[PgObjectType, "array[int]"] = {}
+        self._by_schema: Dict[Optional[str], "array[int]"] = {}
+        self._by_name: Dict[str, "array[int]"] = {}
+        self._by_oid: Dict[int, "array[int]"] = {}
+
+        # Entry postings.
+        self._by_object: Dict[int, "array[int]"] = {}
+        self._by_grantee: Dict[int, "array[int]"] = {}
+        self._by_grantor: Dict[int, "array[int]"] = {}
+        self._by_privilege: Dict[int, "array[int]"] = {}
+
+        # ACL items are very repetitive, so only parse each one once.
+        self._item_cache: Dict[str, Tuple[int, int, int, int]] = {}
+
+    @classmethod
+    def from_infos(cls, type: PgObjectType, infos: Iterable[AnyInfo]) -> "AclIndex":
+        """Create an index from the results of a :mod:`.query` function."""
+        index = cls()
+        index.add_infos(type, infos)
+        return index
+
+    def __len__(self) -> int:
+        """Return the number of indexed ACL entries."""
+        return len(self._entry_object)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._key_ids
+
+    def __iter__(self) -> Iterator[ObjectKey]:
+        return iter(self._keys)
+
+    def add_infos(self, type: PgObjectType, infos: Iterable[AnyInfo]) -> None:
+        """Add the results of a :mod:`.query` function to the index.
+
+        Parameters:
+            type: The object type, e.g. :attr:`.PgObjectType.TABLE` for the
+                  results of :func:`~.query.get_all_table_acls` or
+                  :func:`~.query.get_all_column_acls`.
+            infos: Objects with ``acl`` attributes.
+
+        Raises:
+            ValueError: if an object is already in the index.
+        """
+        for info in infos:
+            key = ObjectKey.from_info(type, info)
+            owner = None if isinstance(info, ParameterInfo) else info.owner
+            self.add(key, info.acl, owner=owner)
+
+    def add(
+        self,
+        key: ObjectKey,
+        acl: Optional[Sequence[str]],
+        *,
+        owner: Optional[str] = None,
+    ) -> None:
+        """Add the ACL for a single object to the index.
+
+        If `acl` is ``None``, the default privileges for `owner` are added.
+
+        Raises:
+            ValueError: if the object is already in the index.
+        """
+        if key in self._key_ids:
+            raise ValueError(f"Object already in index: {key!r}")
+
+        object_id = self._add_key(key)
+        column = key.column is not None
+
+        if acl is not None:
+            cache = self._item_cache
+            for item in acl:
+                parsed = cache.get(item)
+                if parsed is None:
+                    grantee, grantor, codes = _split_acl_item(item)
+                    privs_mask, privswgo_mask = _acl_masks(codes)
+                    parsed = cache[item] = (
+                        self._role_id(grantee),
+                        self._role_id(grantor),
+                        privs_mask,
+                        privswgo_mask,
+                    )
+                self._add_entry(object_id, *parsed)
+        elif (
+            owner is not None and not column and key.type is not PgObjectType.PARAMETER
+        ):
+            for privileges in get_default_privileges(key.type, owner):
+                privs_mask = 0
+                for priv in privileges.privs:
+                    if priv == "ALL":
+                        privs_mask |= _type_mask(key.type)
+                    else:
+                        privs_mask |= _KEYWORD_BITS[priv]
+
+                self._add_entry(
+                    object_id,
+                    self._role_id(privileges.grantee),
+                    self._role_id(privileges.grantor),
+                    privs_mask,
+                    0,
+                )
+
+    def _add_key(self, key: ObjectKey) -> int:
+        object_id = self._key_ids[key] = len(self._keys)
+        self._keys.append(key)
+
+        self._by_type.setdefault(key.type, array("I")).append(object_id)
+        self._by_schema.setdefault(key.schema, array("I")).append(object_id)
+        self._by_name.setdefault(key.name, array("I")).append(object_id)
+        if key.oid is not None:
+            self._by_oid.setdefault(key.oid, array("I")).append(object_id)
+
+        return object_id
+
+    def _role_id(self, role: str) -> int:
+        role_id = self._role_ids.get(role)
+        if role_id is None:
+            role_id = self._role_ids[role] = len(self._roles)
+            self._roles.append(role)
+        return role_id
+
+    def _add_entry(
+        self,
+        object_id: int,
+        grantee_id: int,
+        grantor_id: int,
+        privs_mask: int,
+        privswgo_mask: int,
+    ) -> None:
+        entry_id = len(self._entry_object)
+
+        self._entry_object.append(object_id)
+        self._entry_grantee.append(grantee_id)
+        self._entry_grantor.append(grantor_id)
+        self._entry_privs.append(privs_mask)
+        self._entry_privswgo.append(privswgo_mask)
+
+        self._by_object.setdefault(object_id, array("I")).append(entry_id)
+        self._by_grantee.setdefault(grantee_id, array("I")).append(entry_id)
+        self._by_grantor.setdefault(grantor_id, array("I")).append(entry_id)
+
+        mask = privs_mask | privswgo_mask
+        while mask:
+            bit = mask & -mask
+            self._by_privilege.setdefault(bit, array("I")).append(entry_id)
+            mask ^= bit
+
+    def lookup(
+        self,
+        *,
+        type: Optional[PgObjectType] = None,
+        schema: Optional[str] = None,
+        name: Optional[str] = None,
+        oid: Optional[int] = None,
+    ) -> List[ObjectKey]:
+        """Return the keys of objects matching all of the given attributes."""
+        postings = self._object_postings(type=type, schema=schema, name=name, oid=oid)
+        if postings is None:
+            return list(self._keys)
+        return [self._keys[i] for i in _intersect(postings)]
+
+    def privileges(self, key: ObjectKey) -> List[Privileges]:
+        """Return the privileges on the object identified by `key`, like
+        :func:`~.parse.parse_acl` would.
+
+        Raises:
+            KeyError: if the object is not in the index.
+        """
+        object_id = self._key_ids[key]
+        return [
+            _privileges_from_masks(
+                self._roles[self._entry_grantee[i]],
+                self._roles[self._entry_grantor[i]],
+                self._entry_privs[i],
+                self._entry_privswgo[i],
+                key.type,
+                key.column,
+            )
+            for i in self._by_object.get(object_id, ())
+        ]
+
+    def grantees(self, key: ObjectKey) -> List[str]:
+        """Return the roles that hold privileges on the object identified by
+        `key`.
+
+        Raises:
+            KeyError: if the object is not in the index.
+        """
+        object_id = self._key_ids[key]
+        grantees = dict.fromkeys(
+            self._roles[self._entry_grantee[i]]
+            for i in self._by_object.get(object_id, ())
+        )
+        return list(grantees)
+
+    def objects(
+        self,
+        *,
+        grantee: Optional[str] = None,
+        grantor: Optional[str] = None,
+        privilege: Optional[str] = None,
+        grant_option: bool = False,
+        type: Optional[PgObjectType] = None,
+        schema: Optional[str] = None,
+    ) -> List[ObjectKey]:
+        """Return the keys of objects with ACL entries matching all of the
+        given arguments.
+
+        Parameters:
+            grantee: Role that received the privileges. Use ``'PUBLIC'`` for
+                     privileges granted to everyone.
+            grantor: Role that granted the privileges.
+            privilege: Privilege keyword, e.g. ``'SELECT'``.
+            grant_option: Only match privileges held with grant option. Requires
+                          `privilege`.
+            type: Object type.
+            schema: Object schema.
+        """
+        if grant_option and privilege is None:
+            raise TypeError("grant_option requires privilege")
+
+        postings = []
+
+        # Grantees and grantors share role ids, so a role may have postings
+        # as one but not the other.
+        if grantee is not None:
+            grantee_postings = self._role_postings(self._by_grantee, grantee)
+            if grantee_postings is None:
+                return []
+            postings.append(grantee_postings)
+
+        if grantor is not None:
+            grantor_postings = self._role_postings(self._by_grantor, grantor)
+            if grantor_postings is None:
+                return []
+            postings.append(grantor_postings)
+
+        bit = 0
+        if privilege is not None:
+            try:
+                bit = _KEYWORD_BITS[privilege]
+            except KeyError:
+                raise ValueError(f"Privilege not valid: {privilege}") from None
+            postings.append(self._by_privilege.get(bit, array("I")))
+
+        object_postings = self._object_postings(type=type, schema=schema)
+
+        if postings:
+            entries: Iterable[int] = _intersect(postings)
+        else:
+            entries = range(len(self._entry_object))
+
+        object_ids: Dict[int, None] = {}
+        for entry_id in entries:
+            if grant_option and not self._entry_privswgo[entry_id] & bit:
+                continue
+
+            object_id = self._entry_object[entry_id]
+            if object_id in object_ids:
+                continue
+
+            if object_postings is not None and not all(
+                _contains(p, object_id) for p in object_postings
+            ):
+                continue
+
+            object_ids[object_id] = None
+
+        return [self._keys[i] for i in object_ids]
+
+    def _role_postings(
+        self, by_role: Dict[int, "array[int]"], role: str
+    ) -> Optional["array[int]"]:
+        role_id = self._role_ids.get(role)
+        return None if role_id is None else by_role.get(role_id)
+
+    def _object_postings(
+        self,
+        *,
+        type: Optional[PgObjectType] = None,
+        schema: Optional[str] = None,
+        name: Optional[str] = None,
+        oid: Optional[int] = None,
+    ) -> Optional[List["array[int]"]]:
+        postings = []
+        empty: "array[int]" = array("I")
+
+        if type is not None:
+            postings.append(self._by_type.get(type, empty))
+        if schema is not None:
+            postings.append(self._by_schema.get(schema, empty))
+        if name is not None:
+            postings.append(self._by_name.get(name, empty))
+        if oid is not None:
+            postings.append(self._by_oid.get(oid, empty))
+
+        return postings or None
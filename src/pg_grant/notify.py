@@ -0,0 +1,261 @@
+import json
+import select
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+from attrs import define
+from sqlalchemy import Connection, text
+
+from .sql import _pg_preparer
+from .types import PgObjectType
+
+__all__ = (
+    "AclChange",
+    "install_notify_trigger",
+    "listen_acl_changes",
+    "uninstall_notify_trigger",
+)
+
+DEFAULT_CHANNEL = "pg_grant"
+
+_FUNCTION = "pg_grant_notify"
+_DDL_TRIGGER = "pg_grant_notify_ddl"
+_DROP_TRIGGER = "pg_grant_notify_drop"
+
+# Object types as named by pg_event_trigger_ddl_commands() (in lower case).
+# GRANT and REVOKE use the keywords from the command instead.
+_object_types = {
+    "table": PgObjectType.TABLE,
+    "table column": PgObjectType.TABLE,
+    "view": PgObjectType.TABLE,
+    "view column": PgObjectType.TABLE,
+    "materialized view": PgObjectType.TABLE,
+    "materialized view column": PgObjectType.TABLE,
+    "foreign table": PgObjectType.TABLE,
+    "foreign table column": PgObjectType.TABLE,
+    "sequence": PgObjectType.SEQUENCE,
+    "function": PgObjectType.FUNCTION,
+    "procedure": PgObjectType.FUNCTION,
+    "aggregate": PgObjectType.FUNCTION,
+    "routine": PgObjectType.FUNCTION,
+    "language": PgObjectType.LANGUAGE,
+    "schema": PgObjectType.SCHEMA,
+    "type": PgObjectType.TYPE,
+    "domain": PgObjectType.DOMAIN,
+    "foreign-data wrapper": PgObjectType.FOREIGN_DATA_WRAPPER,
+    "foreign data wrapper": PgObjectType.FOREIGN_DATA_WRAPPER,
+    "server": PgObjectType.FOREIGN_SERVER,
+    "foreign server": PgObjectType.FOREIGN_SERVER,
+    "database": PgObjectType.DATABASE,
+    "tablespace": PgObjectType.TABLESPACE,
+    "parameter": PgObjectType.PARAMETER,
+    "large object": PgObjectType.LARGE_OBJECT,
+    # ALTER DEFAULT PRIVILEGES uses the plural keywords.
+    "tables": PgObjectType.TABLE,
+    "sequences": PgObjectType.SEQUENCE,
+    "functions": PgObjectType.FUNCTION,
+    "routines": PgObjectType.FUNCTION,
+    "types": PgObjectType.TYPE,
+    "schemas": PgObjectType.SCHEMA,
+    "large objects": PgObjectType.LARGE_OBJECT,
+}
+
+
+@define
+class AclChange:
+    """A DDL command which may have changed privileges, as sent by the event
+    trigger from :func:`install_notify_trigger`.
+    """
+
+    #: Command tag, e.g. ``'GRANT'`` or ``'ALTER TABLE'``.
+    command: str
+
+    #: Object type, as named by PostgreSQL, e.g. ``'table'`` or ``'view'``.
+    object_type: Optional[str]
+
+    #: Schema of the object, if any.
+    schema: Optional[str]
+
+    #: Qualified name of the object, e.g. ``'public.users'``. This is
+    #: ``None`` for ``GRANT``, ``REVOKE``, and ``ALTER DEFAULT PRIVILEGES``,
+    #: for which PostgreSQL doesn't report the objects.
+    identity: Optional[str]
+
+    #: Row identifier of the object, if known.
+    oid: Optional[int]
+
+    #: Whether the object was dropped.
+    dropped: bool = False
+
+    @property
+    def type(self) -> Optional[PgObjectType]:
+        """Object type that privileges are granted on, if any."""
+        if self.object_type is None:
+            return None
+        return _object_types.get(self.object_type.lower())
+
+    @classmethod
+    def from_payload(cls, payload: str) -> "AclChange":
+        data: Dict[str, Any] = json.loads(payload)
+        oid = data.get("oid")
+        return cls(
+            command=data["command"],
+            object_type=data.get("object_type"),
+            schema=data.get("schema"),
+            identity=data.get("identity"),
+            oid=oid or None,
+            dropped=data.get("dropped", False),
+        )
+
+
+def _quote_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _quote_channel(channel: str) -> str:
+    # exec_driver_sql without parameters sends the SQL as is, so percent signs
+    # mustn't be doubled like the driver's own dialect would.
+    return _pg_preparer.quote(channel)
+
+
+def install_notify_trigger(
+    conn: Connection,
+    *,
+    channel: str = DEFAULT_CHANNEL,
+    schema: str = "public",
+    tags: Optional[Sequence[str]] = None,
+) -> None:
+    """Create event triggers that send a notification on `channel` for each
+    DDL command and dropped object, which :func:`listen_acl_changes` can
+    receive. Creating event triggers requires superuser privileges.
+
+    Each notification describes one object, so a command affecting several
+    objects sends several notifications.
+
+    Parameters:
+        conn: SQLAlchemy connection. The caller must commit the transaction.
+        channel: Notification channel.
+        schema: Schema for the trigger function.
+        tags: Optional. Command tags to notify for, e.g. ``['GRANT',
+              'REVOKE', 'ALTER DEFAULT PRIVILEGES', 'CREATE TABLE']``. By
+              default, all DDL commands are included, since commands like
+              ``ALTER TABLE ... OWNER TO`` also change privileges.
+    """
+    function = f"{_pg_preparer.quote_schema(schema)}.{_FUNCTION}"
+    channel_literal = _quote_literal(channel)
+
+    conn.execute(
+        text(
+            f"""
+            CREATE OR REPLACE FUNCTION {function}() RETURNS event_trigger AS $$
+            DECLARE
+              r record;
+            BEGIN
+              IF TG_EVENT = 'sql_drop' THEN
+                FOR r IN SELECT * FROM pg_event_trigger_dropped_objects() LOOP
+                  PERFORM pg_notify({channel_literal}, json_build_object(
+                    'command', TG_TAG,
+                    'object_type', r.object_type,
+                    'schema', r.schema_name,
+                    'identity', r.object_identity,
+                    'oid', r.objid,
+                    'dropped', true
+                  )::text);
+                END LOOP;
+              ELSE
+                FOR r IN SELECT * FROM pg_event_trigger_ddl_commands() LOOP
+                  PERFORM pg_notify({channel_literal}, json_build_object(
+                    'command', r.command_tag,
+                    'object_type', r.object_type,
+                    'schema', r.schema_name,
+                    'identity', r.object_identity,
+                    'oid', r.objid
+                  )::text);
+                END LOOP;
+              END IF;
+            END;
+            $$ LANGUAGE plpgsql
+            """
+        ).execution_options(no_parameters=True)
+    )
+
+    when = ""
+    if tags is not None:
+        when = " WHEN TAG IN ({})".format(", ".join(map(_quote_literal, tags)))
+
+    for trigger, event in (
+        (_DDL_TRIGGER, "ddl_command_end"),
+        (_DROP_TRIGGER, "sql_drop"),
+    ):
+        conn.execute(text(f"DROP EVENT TRIGGER IF EXISTS {trigger}"))
+        conn.execute(
+            text(
+                f"CREATE EVENT TRIGGER {trigger} ON {event}{when} "
+                f"EXECUTE FUNCTION {function}()"
+            ).execution_options(no_parameters=True)
+        )
+
+
+def uninstall_notify_trigger(conn: Connection, *, schema: str = "public") -> None:
+    """Drop the event triggers and function created by
+    :func:`install_notify_trigger`.
+    """
+    for trigger in (_DDL_TRIGGER, _DROP_TRIGGER):
+        conn.execute(text(f"DROP EVENT TRIGGER IF EXISTS {trigger}"))
+    function = f"{_pg_preparer.quote_schema(schema)}.{_FUNCTION}"
+    conn.execute(text(f"DROP FUNCTION IF EXISTS {function}()"))
+
+
+def _iter_payloads(driver_connection: Any, timeout: Optional[float]) -> Iterator[str]:
+    if callable(getattr(driver_connection, "notifies", None)):
+        # psycopg 3
+        while True:
+            received = False
+            for notify in driver_connection.notifies(timeout=timeout):
+                received = True
+                yield notify.payload
+            if not received:
+                return
+    else:
+        # psycopg2
+        while True:
+            driver_connection.poll()
+            while driver_connection.notifies:
+                yield driver_connection.notifies.pop(0).payload
+            if not select.select([driver_connection], [], [], timeout)[0]:
+                return
+
+
+def _listen(
+    conn: Connection, channel: str, timeout: Optional[float]
+) -> Iterator[AclChange]:
+    try:
+        driver_connection = conn.connection.driver_connection
+        for payload in _iter_payloads(driver_connection, timeout):
+            yield AclChange.from_payload(payload)
+    finally:
+        conn.exec_driver_sql(f"UNLISTEN {_quote_channel(channel)}")
+
+
+def listen_acl_changes(
+    conn: Connection,
+    *,
+    channel: str = DEFAULT_CHANNEL,
+    timeout: Optional[float] = None,
+) -> Iterator[AclChange]:
+    """Listen for notifications from the event triggers created by
+    :func:`install_notify_trigger` and return an iterator of the changes as
+    they arrive.
+
+    Listening starts immediately, so changes made before iterating are not
+    missed. The connection must be in autocommit mode (e.g. with
+    ``isolation_level='AUTOCOMMIT'``) and should not be used for anything else
+    while listening.
+
+    Parameters:
+        conn: SQLAlchemy connection using psycopg 3.2 or later, or psycopg2.
+        channel: Notification channel.
+        timeout: Optional. Stop after this many seconds without a
+                 notification. By default, listen forever.
+    """
+    conn.exec_driver_sql(f"LISTEN {_quote_channel(channel)}")
+    return _listen(conn, channel, timeout)
@@ -1,6 +1,50 @@
-from typing import List, Optional, Tuple, Union
-
-from .types import PgObjectType, Privileges
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+from .types import ColumnInfo, ParameterInfo, PgObjectType, Privileges, RelationInfo
+
+#: Privilege codes used in ACL items, mapped to their keywords.
+_PRIVILEGE_KEYWORDS = {
+    "r": "SELECT",
+    "w": "UPDATE",
+    "a": "INSERT",
+    "d": "DELETE",
+    "D": "TRUNCATE",
+    "x": "REFERENCES",
+    "t": "TRIGGER",
+    "X": "EXECUTE",
+    "U": "USAGE",
+    "C": "CREATE",
+    "c": "CONNECT",
+    "T": "TEMPORARY",
+    "s": "SET",
+    "A": "ALTER SYSTEM",
+}
+
+_ALL_CODES = "".join(_PRIVILEGE_KEYWORDS)
+_CODE_BITS = {code: 1 << i for i, code in enumerate(_ALL_CODES)}
+_KEYWORD_BITS = {kw: _CODE_BITS[code] for code, kw in _PRIVILEGE_KEYWORDS.items()}
+
+# The order matches the CONVERT_PRIV calls in parseAclItem.
+_TYPE_CODES = {
+    PgObjectType.TABLE: "rwaxdtD",
+    PgObjectType.SEQUENCE: "rwU",
+    PgObjectType.FUNCTION: "X",
+    PgObjectType.LANGUAGE: "U",
+    PgObjectType.SCHEMA: "CU",
+    PgObjectType.DATABASE: "CcT",
+    PgObjectType.TABLESPACE: "C",
+    PgObjectType.TYPE: "U",
+    PgObjectType.DOMAIN: "U",
+    PgObjectType.FOREIGN_DATA_WRAPPER: "U",
+    PgObjectType.FOREIGN_SERVER: "U",
+    PgObjectType.FOREIGN_TABLE: "r",
+    PgObjectType.LARGE_OBJECT: "rw",
+    PgObjectType.PARAMETER: "sA",
+}
+
+_COLUMN_CODES = "rwax"
 
 
 def _get_acl_username(acl: str) -> Tuple[int, str]:
@@ -37,6 +81,44 @@ def _get_acl_username(acl: str) -> Tuple[int, str]:
     return i, output
 
 
+# Privileges granted to PUBLIC by default, for the types which have any.
+#
+# "PostgreSQL grants default privileges on some types of objects to PUBLIC.
+# No privileges are granted to PUBLIC by default on tables, columns,
+# schemas or tablespaces. For other types, the default privileges granted
+# to PUBLIC are as follows: CONNECT and CREATE TEMP TABLE for databases;
+# EXECUTE privilege for functions; and USAGE privilege for languages."
+_DEFAULT_PUBLIC_PRIVILEGES: Mapping[PgObjectType, Tuple[str, ...]] = MappingProxyType(
+    {
+        PgObjectType.DATABASE: ("CONNECT", "TEMPORARY"),
+        PgObjectType.FUNCTION: ("EXECUTE",),
+        PgObjectType.LANGUAGE: ("USAGE",),
+        # Seems like there's a documentation bug, and that types get USAGE
+        # by default.
+        # https://stackoverflow.com/questions/46656644
+        PgObjectType.TYPE: ("USAGE",),
+        PgObjectType.DOMAIN: ("USAGE",),
+    }
+)
+
+# Grantee, grantor, and privileges of each item of a default ACL.
+_DefaultAcl = Tuple[Tuple[str, str, Tuple[str, ...]], ...]
+
+
+@lru_cache(maxsize=4096)
+def _default_acl(type: PgObjectType, owner: str) -> _DefaultAcl:
+    # "the owner has all privileges by default"
+    # "PostgreSQL treats the owner's privileges as having been granted by the
+    # owner to themselves"
+    acl: _DefaultAcl = ((owner, owner, ("ALL",)),)
+
+    public_privs = _DEFAULT_PUBLIC_PRIVILEGES.get(type)
+    if public_privs:
+        acl += (("PUBLIC", owner, public_privs),)
+
+    return acl
+
+
 def get_default_privileges(type: PgObjectType, owner: str) -> List[Privileges]:
     """Return a list of :class:`~pg_grant.types.Privileges` objects matching the
     default privileges for that type.
@@ -46,50 +128,131 @@ def get_default_privileges(type: PgObjectType, owner: str) -> List[Privileges]:
 
     .. seealso:: https://www.postgresql.org/docs/10/static/sql-grant.html
     """
+    return [
+        Privileges(grantee=grantee, grantor=grantor, privs=list(privs))
+        for grantee, grantor, privs in _default_acl(type, owner)
+    ]
 
-    # "the owner has all privileges by default"
-    # "PostgreSQL treats the owner's privileges as having been granted by the
-    # owner to themselves"
-    priv_list = [Privileges(grantee=owner, grantor=owner, privs=["ALL"])]
-
-    public_privs = None
-
-    # "PostgreSQL grants default privileges on some types of objects to PUBLIC.
-    # No privileges are granted to PUBLIC by default on tables, columns,
-    # schemas or tablespaces. For other types, the default privileges granted
-    # to PUBLIC are as follows: CONNECT and CREATE TEMP TABLE for databases;
-    # EXECUTE privilege for functions; and USAGE privilege for languages."
-    if type is PgObjectType.DATABASE:
-        public_privs = ["CONNECT", "TEMPORARY"]
-    elif type is PgObjectType.FUNCTION:
-        public_privs = ["EXECUTE"]
-    elif type is PgObjectType.LANGUAGE:
-        public_privs = ["USAGE"]
-    elif type is PgObjectType.TYPE:
-        # Seems like there's a documentation bug, and that types get USAGE by
-        # default.
-        # https://stackoverflow.com/questions/46656644
-        public_privs = ["USAGE"]
-    elif type is PgObjectType.DOMAIN:
-        public_privs = ["USAGE"]
 
-    if public_privs:
-        priv_list.append(
-            Privileges(grantee="PUBLIC", grantor=owner, privs=public_privs)
-        )
+def expand_acls(
+    infos: Iterable[Union[RelationInfo, ColumnInfo, ParameterInfo]],
+    type: Optional[PgObjectType] = None,
+) -> List[List[Privileges]]:
+    """Parse the ACLs of many objects from the :mod:`.query` functions at
+    once, using the default privileges for those whose ACL is ``None``, except
+    for columns and parameters which have no implicit privileges.
+
+    The default privileges are only created once per owner, so objects with
+    the same owner and a ``None`` ACL share the same list, which must not be
+    modified.
+
+    Parameters:
+        infos: Objects with ``acl`` attributes.
+        type: Optional. The type of all the objects. By default, the
+              ``type`` attribute of each object.
 
-    return priv_list
+    Returns:
+        A list of :class:`~.types.Privileges` for each object.
+
+    Raises:
+        ValueError: if the type of an object is unknown.
+    """
+    defaults: Dict[Tuple[PgObjectType, str], List[Privileges]] = {}
+    result = []
+
+    for info in infos:
+        info_type = type or info.type
+        if info_type is None:
+            raise ValueError("The object type is unknown.")
+
+        if info.acl is not None:
+            column = info.column if isinstance(info, ColumnInfo) else None
+            result.append(parse_acl(info.acl, info_type, column))
+        elif isinstance(info, (ColumnInfo, ParameterInfo)):
+            result.append([])
+        else:
+            key = info_type, info.owner
+            privileges = defaults.get(key)
+            if privileges is None:
+                privileges = defaults[key] = get_default_privileges(*key)
+            result.append(privileges)
+
+    return result
+
+
+def _split_acl_array(text: str) -> List[str]:
+    """Split the text form of an ``aclitem[]``, e.g.
+    ``'{alice=arwdDxt/alice,"\\"a b\\"=r/alice"}'``, into its items.
+
+    Port of the parts of ``array_in`` that apply to one-dimensional arrays.
+    """
+    if text.startswith("["):
+        # Dimension decoration, e.g. '[0:1]={...}'
+        text = text[text.index("=") + 1 :]
+
+    if not (text.startswith("{") and text.endswith("}")):
+        raise ValueError(f"ACL syntax error: not an array: {text!r}")
+
+    body = text[1:-1]
+    if not body:
+        return []
+
+    # Items are only quoted if they contain special characters, such as the
+    # quotes around a role name, so the common case is a simple split.
+    if '"' not in body and "\\" not in body and " " not in body:
+        items = body.split(",")
+        if "NULL" in items:
+            raise ValueError("ACL syntax error: NULL item.")
+        return items
+
+    items = []
+    i = 0
+    n = len(body)
+
+    while True:
+        item = []
+        quoted = False
+
+        while i < n and body[i] != ",":
+            char = body[i]
+            if char == '"':
+                quoted = True
+                i += 1
+                while i < n and body[i] != '"':
+                    if body[i] == "\\":
+                        i += 1
+                    item.append(body[i : i + 1])
+                    i += 1
+                if i == n:
+                    raise ValueError("ACL syntax error: unterminated quote.")
+            elif char == "\\":
+                i += 1
+                item.append(body[i : i + 1])
+            elif not char.isspace():
+                item.append(char)
+            i += 1
+
+        value = "".join(item)
+        if not quoted and value == "NULL":
+            raise ValueError("ACL syntax error: NULL item.")
+        items.append(value)
+
+        if i == n:
+            return items
+        i += 1
 
 
 def parse_acl(
-    acl: Union[List[str], Tuple[str, ...]],
+    acl: Union[List[str], Tuple[str, ...], str],
     type: Optional[PgObjectType] = None,
     subname: Optional[str] = None,
 ) -> List[Privileges]:
     """
 
     Parameters:
-        acl: ACL, e.g. ``['alice=arwdDxt/alice', 'bob=arwdDxt/alice']``
+        acl: ACL, e.g. ``['alice=arwdDxt/alice', 'bob=arwdDxt/alice']``, or
+             its text form as returned by PostgreSQL without decoding the
+             array, e.g. ``'{alice=arwdDxt/alice,bob=arwdDxt/alice}'``.
         type: Optional. If passed, all privileges may be reduced to ``['ALL']``.
         subname: Optional, e.g. for column privileges.
 
@@ -101,6 +264,8 @@ def parse_acl(
         This is a simple wrapper; :func:`.parse_acl_item` is called for each
         item in `acl`.
     """
+    if isinstance(acl, str):
+        acl = _split_acl_array(acl)
     return [parse_acl_item(i, type, subname) for i in acl]
 
 
@@ -154,6 +319,21 @@ def parse_acl_item(
     Returns:
         :class:`~.types.Privileges`
     """
+    grantee, grantor, codes = _split_acl_item(acl_item)
+    privs_mask, privswgo_mask = _acl_masks(codes)
+
+    return _privileges_from_masks(
+        grantee, grantor, privs_mask, privswgo_mask, type, subname
+    )
+
+
+@lru_cache(maxsize=65536)
+def _split_acl_item(acl_item: str) -> Tuple[str, str, str]:
+    """Split an ACL item into its grantee, grantor, and privilege codes.
+
+    Results are cached, so the same grantee and grantor strings are shared by
+    every :class:`~.types.Privileges` parsed from a repeated item.
+    """
     eq_pos, grantee = _get_acl_username(acl_item)
     assert acl_item[eq_pos] == "="
 
@@ -163,118 +343,102 @@ def parse_acl_item(
     slash_pos = acl_item.index("/", eq_pos)
     _, grantor = _get_acl_username(acl_item[slash_pos + 1 :])
 
-    privs = []
-    privs_with_grant_option = []
+    return grantee, grantor, acl_item[eq_pos + 1 : slash_pos]
 
-    all_with_grant_option = all_without_grant_option = True
 
-    priv = acl_item[eq_pos + 1 : slash_pos]
+@lru_cache(maxsize=4096)
+def _acl_masks(codes: str) -> Tuple[int, int]:
+    """Convert privilege codes, e.g. ``'ar*w'``, to a pair of bit masks for the
+    privileges without and with grant option.
 
-    def convert_priv(code: str, keyword: str) -> None:
-        nonlocal all_with_grant_option, all_without_grant_option
+    Unknown codes are ignored.
+    """
+    privs_mask = privswgo_mask = 0
 
-        pos = priv.find(code)
-        if pos >= 0:
-            if priv[pos + 1 : pos + 2] == "*":
-                s = keyword
-                if subname is not None:
-                    s += f" ({subname})"
+    for i, code in enumerate(codes):
+        bit = _CODE_BITS.get(code)
+        if bit is None:
+            continue
 
-                privs_with_grant_option.append(s)
-                all_without_grant_option = False
-            else:
-                s = keyword
-                if subname is not None:
-                    s += f" ({subname})"
+        # Like ``parseAclItem``, only the first occurrence of a code counts.
+        if (privs_mask | privswgo_mask) & bit:
+            continue
 
-                privs.append(s)
-                all_with_grant_option = False
+        if codes[i + 1 : i + 2] == "*":
+            privswgo_mask |= bit
         else:
-            all_with_grant_option = all_without_grant_option = False
+            privs_mask |= bit
+
+    return privs_mask, privswgo_mask
+
 
+def _type_codes(type: Optional[PgObjectType], column: bool = False) -> str:
+    """Return the privilege codes applicable to `type`, in the order used by
+    ``parseAclItem``.
+    """
     if type is None:
-        convert_priv("r", "SELECT")
-        convert_priv("w", "UPDATE")
-        convert_priv("a", "INSERT")
-        convert_priv("d", "DELETE")
-        convert_priv("D", "TRUNCATE")
-        convert_priv("x", "REFERENCES")
-        convert_priv("t", "TRIGGER")
-        convert_priv("X", "EXECUTE")
-        convert_priv("U", "USAGE")
-        convert_priv("C", "CREATE")
-        convert_priv("c", "CONNECT")
-        convert_priv("T", "TEMPORARY")
-        convert_priv("s", "SET")
-        convert_priv("A", "ALTER SYSTEM")
-
-        # Don't think anything can have all of them, but set all to False
-        # since we don't know type.
-        all_with_grant_option = all_without_grant_option = False
-    elif type in {PgObjectType.TABLE, PgObjectType.SEQUENCE}:
-        convert_priv("r", "SELECT")
-        convert_priv("w", "UPDATE")
-
-        if type is PgObjectType.SEQUENCE:
-            convert_priv("U", "USAGE")
-        else:
-            convert_priv("a", "INSERT")
-            convert_priv("x", "REFERENCES")
-
-            if subname is None:
-                convert_priv("d", "DELETE")
-                convert_priv("t", "TRIGGER")
-                convert_priv("D", "TRUNCATE")
-
-    elif type is PgObjectType.FUNCTION:
-        convert_priv("X", "EXECUTE")
-    elif type is PgObjectType.LANGUAGE:
-        convert_priv("U", "USAGE")
-    elif type is PgObjectType.SCHEMA:
-        convert_priv("C", "CREATE")
-        convert_priv("U", "USAGE")
-    elif type is PgObjectType.DATABASE:
-        convert_priv("C", "CREATE")
-        convert_priv("c", "CONNECT")
-        convert_priv("T", "TEMPORARY")
-    elif type is PgObjectType.TABLESPACE:
-        convert_priv("C", "CREATE")
-    elif type is PgObjectType.TYPE:
-        convert_priv("U", "USAGE")
-    elif type is PgObjectType.DOMAIN:
-        convert_priv("U", "USAGE")
-    elif type is PgObjectType.FOREIGN_DATA_WRAPPER:
-        convert_priv("U", "USAGE")
-    elif type is PgObjectType.FOREIGN_SERVER:
-        convert_priv("U", "USAGE")
-    elif type is PgObjectType.FOREIGN_TABLE:
-        convert_priv("r", "SELECT")
-    elif type is PgObjectType.LARGE_OBJECT:
-        convert_priv("r", "SELECT")
-        convert_priv("w", "UPDATE")
-    elif type is PgObjectType.PARAMETER:
-        convert_priv("s", "SET")
-        convert_priv("A", "ALTER SYSTEM")
-    else:
-        raise ValueError(f"Unknown type: {type}")
-
-    if all_with_grant_option:
-        privs = []
-        privs_with_grant_option = []
-        s = "ALL"
-
-        if subname is not None:
-            s += f" ({subname})"
-
-        privs_with_grant_option.append(s)
-    elif all_without_grant_option:
-        privs = []
-        privs_with_grant_option = []
-        s = "ALL"
-
-        if subname is not None:
-            s += f" ({subname})"
-
-        privs.append(s)
-
-    return Privileges(grantee, grantor, privs, privs_with_grant_option)
+        return _ALL_CODES
+
+    if column and type is PgObjectType.TABLE:
+        return _COLUMN_CODES
+
+    try:
+        return _TYPE_CODES[type]
+    except KeyError:
+        raise ValueError(f"Unknown type: {type}") from None
+
+
+def _type_mask(type: PgObjectType, column: bool = False) -> int:
+    """Return the bit mask of all privileges applicable to `type`."""
+    mask = 0
+    for code in _type_codes(type, column):
+        mask |= _CODE_BITS[code]
+    return mask
+
+
+def _privileges_from_masks(
+    grantee: str,
+    grantor: str,
+    privs_mask: int,
+    privswgo_mask: int,
+    type: Optional[PgObjectType] = None,
+    subname: Optional[str] = None,
+) -> Privileges:
+    privs, privswgo = _mask_keywords(privs_mask, privswgo_mask, type, subname)
+    return Privileges(grantee, grantor, list(privs), list(privswgo))
+
+
+@lru_cache(maxsize=4096)
+def _mask_keywords(
+    privs_mask: int,
+    privswgo_mask: int,
+    type: Optional[PgObjectType],
+    subname: Optional[str],
+) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Return the privilege keywords for a pair of bit masks. The keywords are
+    cached, so that equal privileges share the same strings.
+    """
+    codes = _type_codes(type, subname is not None)
+    suffix = "" if subname is None else f" ({subname})"
+
+    privs = []
+    privs_with_grant_option = []
+
+    for code in codes:
+        bit = _CODE_BITS[code]
+        if privswgo_mask & bit:
+            privs_with_grant_option.append(_PRIVILEGE_KEYWORDS[code] + suffix)
+        elif privs_mask & bit:
+            privs.append(_PRIVILEGE_KEYWORDS[code] + suffix)
+
+    # Don't think anything can have all of them, so only reduce to ALL when
+    # we know the type.
+    if type is not None:
+        if len(privs_with_grant_option) == len(codes):
+            privs = []
+            privs_with_grant_option = ["ALL" + suffix]
+        elif len(privs) == len(codes):
+            privs = ["ALL" + suffix]
+            privs_with_grant_option = []
+
+    return tuple(privs), tuple(privs_with_grant_option)
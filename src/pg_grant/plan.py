@@ -0,0 +1,340 @@
+from contextlib import nullcontext
+from itertools import islice
+from typing import (
+    Any,
+    ContextManager,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
+
+from attrs import Factory, define
+from sqlalchemy import ClauseElement, Connection, Executable, text
+from sqlalchemy.exc import DBAPIError
+
+from .exc import ApplyError
+from .sql import _GrantRevoke, _in_schema_keywords, _pg_dialect, _Revoke, _Target
+from .types import ObjectKey, PgObjectType
+
+__all__ = (
+    "ApplyResult",
+    "StatementFailure",
+    "apply_statements",
+    "coalesce_statements",
+)
+
+# Statements with the same group key only differ by target and grantee.
+_GroupKey = Tuple[Type[_GrantRevoke], PgObjectType, Tuple[str, ...], bool, bool]
+
+
+def _group_key(statement: _GrantRevoke) -> _GroupKey:
+    return (
+        type(statement),
+        statement._priv_type,
+        tuple(sorted(statement._privileges)),
+        statement._grant_option,
+        statement._quote_subname,
+    )
+
+
+def _chunks(items: Tuple[_Target, ...], size: int) -> Iterable[Tuple[_Target, ...]]:
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+def coalesce_statements(
+    statements: Iterable[Executable],
+    *,
+    catalog: Optional[Iterable[ObjectKey]] = None,
+    max_targets: int = 1000,
+) -> List[Executable]:
+    """Merge :func:`~.sql.grant` and :func:`~.sql.revoke` statements which
+    differ only by object or grantee into as few statements as possible, e.g.
+    ``GRANT SELECT ON TABLE a, b TO alice, bob``.
+
+    All of the REVOKE statements are returned before the GRANT statements, so
+    the statements must not both revoke and grant the same privilege for the
+    same object and grantee. This is true of the statements from
+    :func:`~.diff.diff_acls` and from :meth:`.Privileges.as_grant_statements`.
+    Other statements are returned first, in their original order.
+
+    Parameters:
+        statements: Statements to merge.
+        catalog: Optional. Keys of every table, sequence, and function in the
+                 database. When a statement applies to all of the tables,
+                 sequences, or functions in a schema, ``ON ALL TABLES IN
+                 SCHEMA`` (or similar) is used instead of listing them. Note
+                 that PostgreSQL includes views and foreign tables in ``ALL
+                 TABLES``. Functions use ``ALL ROUTINES``, which includes
+                 procedures and requires PostgreSQL 11 or later.
+        max_targets: Maximum number of objects in a single statement.
+    """
+    other: List[Executable] = []
+    groups: Dict[_GroupKey, Dict[_Target, Dict[str, None]]] = {}
+    # Keep the privileges in the order they were first given.
+    group_privileges: Dict[_GroupKey, Tuple[str, ...]] = {}
+
+    for statement in statements:
+        if not isinstance(statement, _GrantRevoke) or statement._in_schema:
+            other.append(statement)
+            continue
+
+        key = _group_key(statement)
+        group_privileges.setdefault(key, statement._privileges)
+        targets = groups.setdefault(key, {})
+        for target in statement._targets:
+            grantees = targets.setdefault(target, {})
+            grantees.update(dict.fromkeys(statement._grantees))
+
+    schema_objects: Dict[Tuple[PgObjectType, str], Set[Hashable]] = {}
+    if catalog is not None:
+        for obj in catalog:
+            if obj.type in _in_schema_keywords and obj.schema is not None:
+                if obj.column is None:
+                    schema_objects.setdefault((obj.type, obj.schema), set()).add(
+                        (obj.name, obj.arg_types)
+                    )
+
+    revokes: List[Executable] = []
+    grants: List[Executable] = []
+
+    for key, targets in groups.items():
+        cls, priv_type, _, grant_option, quote_subname = key
+        privileges = group_privileges[key]
+        result = revokes if issubclass(cls, _Revoke) else grants
+
+        by_grantees: Dict[Tuple[str, ...], List[_Target]] = {}
+        for target, grantees in targets.items():
+            by_grantees.setdefault(tuple(sorted(grantees)), []).append(target)
+
+        for grantee_tuple, grantee_targets in by_grantees.items():
+            if schema_objects and priv_type in _in_schema_keywords:
+                grantee_targets, schemas = _collapse_schemas(
+                    priv_type, grantee_targets, schema_objects
+                )
+                for schema_chunk in _chunks(schemas, max_targets):
+                    result.append(
+                        cls._coalesced(
+                            privileges,
+                            priv_type,
+                            schema_chunk,
+                            grantee_tuple,
+                            grant_option=grant_option,
+                            quote_subname=quote_subname,
+                            in_schema=True,
+                        )
+                    )
+
+            for chunk in _chunks(tuple(grantee_targets), max_targets):
+                result.append(
+                    cls._coalesced(
+                        privileges,
+                        priv_type,
+                        chunk,
+                        grantee_tuple,
+                        grant_option=grant_option,
+                        quote_subname=quote_subname,
+                    )
+                )
+
+    return other + revokes + grants
+
+
+def _collapse_schemas(
+    priv_type: PgObjectType,
+    targets: List[_Target],
+    schema_objects: Dict[Tuple[PgObjectType, str], Set[Hashable]],
+) -> Tuple[List[_Target], Tuple[_Target, ...]]:
+    """Split `targets` into those that remain, and the schemas whose objects
+    are all in `targets`.
+    """
+    by_schema: Dict[str, Set[Hashable]] = {}
+    for target in targets:
+        if isinstance(target.target, str) and target.schema is not None:
+            by_schema.setdefault(target.schema, set()).add(
+                (target.target, target.arg_types)
+            )
+
+    complete = [
+        schema
+        for schema, names in by_schema.items()
+        if names == schema_objects.get((priv_type, schema))
+    ]
+    if not complete:
+        return targets, ()
+
+    complete_set = set(complete)
+    remaining = [
+        t
+        for t in targets
+        if not isinstance(t.target, str) or t.schema not in complete_set
+    ]
+    schemas = tuple(_Target(schema, None, None) for schema in complete)
+    return remaining, schemas
+
+
+@define
+class StatementFailure:
+    """A statement which failed during :func:`apply_statements`."""
+
+    #: The statement that failed.
+    sql: str
+
+    #: The error raised by the database driver.
+    error: Exception
+
+
+@define
+class ApplyResult:
+    """Result of :func:`apply_statements`."""
+
+    #: Number of statements executed successfully.
+    executed: int = 0
+
+    #: Statements which failed, if `continue_on_error` was used.
+    failures: List[StatementFailure] = Factory(list)
+
+
+def _compile(statement: Executable) -> str:
+    # The SQL is sent without parameters, so the driver won't undo the doubled
+    # percent signs its own dialect would quote identifiers with.
+    assert isinstance(statement, ClauseElement)
+    return str(statement.compile(dialect=_pg_dialect))
+
+
+def _supports_pipeline(conn: Connection) -> bool:
+    driver_connection = conn.connection.driver_connection
+    if not hasattr(driver_connection, "pipeline"):
+        return False
+
+    try:
+        from psycopg import Pipeline
+    except ImportError:  # pragma: no cover
+        return False
+
+    return Pipeline.is_supported()
+
+
+def _execute(conn: Connection, sqls: Sequence[str], pipeline: bool) -> None:
+    if pipeline:
+        driver_connection: Any = conn.connection.driver_connection
+        with driver_connection.pipeline(), driver_connection.cursor() as cursor:
+            for sql in sqls:
+                cursor.execute(sql)
+    else:
+        # Without parameters, the driver doesn't interpret % in the statements
+        # and they can be sent together as one query.
+        conn.exec_driver_sql(
+            ";\n".join(sqls), execution_options={"no_parameters": True}
+        )
+
+
+def apply_statements(
+    conn: Connection,
+    statements: Iterable[Executable],
+    *,
+    chunk_size: int = 500,
+    transaction: Literal["savepoint", "chunk"] = "savepoint",
+    lock_timeout: Optional[Union[int, str]] = None,
+    pipeline: Optional[bool] = None,
+    continue_on_error: bool = False,
+) -> ApplyResult:
+    """Execute statements, such as those from :func:`coalesce_statements`, in
+    chunks instead of one round trip each.
+
+    Each chunk is sent to the server at once, either as a single query or,
+    with psycopg 3, using pipeline mode. If a chunk fails, it is rolled back
+    and its statements are executed one by one to find those which failed.
+
+    Parameters:
+        conn: SQLAlchemy connection.
+        statements: Statements to execute.
+        chunk_size: Number of statements per chunk.
+        transaction: ``'savepoint'`` to execute each chunk in a savepoint within
+                     the current transaction, which the caller must commit.
+                     ``'chunk'`` to commit each chunk in its own transaction,
+                     in which case no transaction may be in progress.
+        lock_timeout: Optional. Lock timeout for each transaction, in
+                      milliseconds or with units, e.g. ``'5s'``. Statements
+                      that wait longer for a lock fail instead of queueing
+                      behind long-running transactions.
+        pipeline: Whether to use pipeline mode. By default, it is used when
+                  available.
+        continue_on_error: Whether to continue after a statement fails. The
+                           failures are reported in the result.
+
+    Raises:
+        pg_grant.exc.ApplyError: if a statement fails and `continue_on_error`
+                                 is false. When ``transaction='chunk'``, the
+                                 previous chunks remain committed.
+
+    Returns:
+        :class:`ApplyResult`
+    """
+    if transaction not in {"savepoint", "chunk"}:
+        raise ValueError(f"Unknown transaction mode: {transaction}")
+
+    if pipeline is None:
+        pipeline = _supports_pipeline(conn)
+
+    errors: Tuple[Type[Exception], ...] = (DBAPIError, conn.dialect.loaded_dbapi.Error)
+    result = ApplyResult()
+
+    def set_lock_timeout() -> None:
+        if lock_timeout is not None:
+            # Like SET LOCAL, this only lasts until the end of the transaction.
+            conn.execute(
+                text("SELECT set_config('lock_timeout', :value, true)"),
+                {"value": str(lock_timeout)},
+            )
+
+    def apply_chunk(sqls: List[str]) -> None:
+        try:
+            with conn.begin_nested():
+                _execute(conn, sqls, pipeline=bool(pipeline))
+        except errors:
+            pass
+        else:
+            result.executed += len(sqls)
+            return
+
+        for sql in sqls:
+            try:
+                with conn.begin_nested():
+                    _execute(conn, [sql], pipeline=False)
+            except errors as exc:
+                if not continue_on_error:
+                    raise ApplyError(sql, exc) from exc
+                result.failures.append(StatementFailure(sql, exc))
+            else:
+                result.executed += 1
+
+    if transaction == "savepoint":
+        set_lock_timeout()
+
+    sqls = (_compile(statement) for statement in statements)
+    while True:
+        chunk = list(islice(sqls, chunk_size))
+        if not chunk:
+            break
+
+        with _chunk_transaction(conn, transaction):
+            if transaction == "chunk":
+                set_lock_timeout()
+            apply_chunk(chunk)
+
+    return result
+
+
+def _chunk_transaction(conn: Connection, transaction: str) -> ContextManager[Any]:
+    if transaction == "chunk":
+        return conn.begin()
+    return nullcontext()
@@ -1,28 +1,59 @@
 import sys
 import typing as t
 from enum import Enum
-from typing import Any, List, Mapping, Optional, Sequence, Tuple, TypeVar, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 from sqlalchemy import (
     ARRAY,
+    BigInteger,
     Connection,
+    Result,
+    RowMapping,
     Select,
     Text,
+    TypeDecorator,
+    and_,
+    any_,
     cast,
     column,
     func,
+    literal,
+    literal_column,
+    not_,
+    null,
+    or_,
     select,
     table,
     text,
 )
+from sqlalchemy.dialects.postgresql import REGCLASS
 from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import Cast, ColumnClause, ColumnElement
 
 from ._typing_sqlalchemy import ArgTypesInput
 from .exc import NoSuchObjectError
+from .parse import _acl_masks, _privileges_from_masks, _split_acl_array, _split_acl_item
 from .types import (
     ColumnInfo,
+    DefaultAclInfo,
     FunctionInfo,
+    LargeObjectAclGroup,
     ParameterInfo,
+    PgObjectType,
+    Privileges,
     RelationInfo,
     SchemaRelationInfo,
 )
@@ -51,8 +82,18 @@ __all__ = (
     "get_tablespace_acl",
     "get_all_type_acls",
     "get_type_acl",
+    "get_all_domain_acls",
+    "get_domain_acl",
+    "get_all_foreign_data_wrapper_acls",
+    "get_foreign_data_wrapper_acl",
+    "get_all_foreign_server_acls",
+    "get_foreign_server_acl",
     "get_all_parameter_acls",
     "get_parameter_acl",
+    "get_all_default_acls",
+    "get_effective_default_privileges",
+    "iter_large_object_acls",
+    "get_large_object_acl_groups",
 )
 
 pg_table_is_visible = func.pg_catalog.pg_table_is_visible
@@ -62,9 +103,61 @@ array_agg = func.array_agg
 unnest = func.unnest
 coalesce = func.coalesce
 canonical_type = func.pg_temp.pg_grant_canonical_type
+pg_get_userbyid = func.pg_catalog.pg_get_userbyid
 
+T = TypeVar("T")
 TP = TypeVar("TP", bound=Tuple[Any, ...])
 Connectable: TypeAlias = Union[Connection, Session]
+SchemaInput: TypeAlias = Union[str, Iterable[str]]
+
+
+class _AclArray(TypeDecorator[List[str]]):
+    """An ``aclitem[]`` fetched as text and split into items here, instead of
+    being cast to ``text[]`` and decoded by the driver.
+    """
+
+    impl = Text
+    cache_ok = True
+
+    def process_result_value(
+        self, value: Optional[str], dialect: Any
+    ) -> Optional[List[str]]:
+        return None if value is None else _split_acl_array(value)
+
+
+def _acl(acl_column: ColumnElement[Any]) -> Cast[List[str]]:
+    return cast(acl_column, _AclArray())
+
+
+def _owner(owner_column: ColumnClause[Any]) -> ColumnElement[str]:
+    # Looking up the name in the role cache is cheaper than joining pg_roles,
+    # and leaves the owner's oid in `owner_column` to select instead.
+    return pg_get_userbyid(owner_column)
+
+
+class _StringPool:
+    """Shares one copy of each string in the results of a scan, since names
+    such as schemas, tables, and owners repeat across many rows.
+    """
+
+    def __init__(self) -> None:
+        self._strings: Dict[str, str] = {}
+
+    def __call__(self, row: RowMapping) -> Dict[str, Any]:
+        strings = self._strings
+        values = {}
+        for key, value in row.items():
+            if isinstance(value, str):
+                value = strings.setdefault(value, value)
+            elif isinstance(value, (list, tuple)):
+                value = tuple([strings.setdefault(v, v) for v in value])
+            values[key] = value
+        return values
+
+
+def _infos(cls: Callable[..., T], result: Result[Any], **kwargs: Any) -> List[T]:
+    pool = _StringPool()
+    return [cls(**pool(row), **kwargs) for row in result.mappings()]
 
 
 class PgRelKind(Enum):
@@ -87,6 +180,14 @@ pg_class = table(
     column("relnamespace"),
     column("relkind"),
     column("relowner"),
+    column("relispartition"),
+    column("xmin"),
+)
+
+pg_inherits = table(
+    "pg_inherits",
+    column("inhrelid"),
+    column("inhparent"),
 )
 
 pg_namespace = table(
@@ -95,6 +196,7 @@ pg_namespace = table(
     column("nspname"),
     column("nspowner"),
     column("nspacl"),
+    column("xmin"),
 )
 
 pg_roles = table(
@@ -111,6 +213,7 @@ pg_proc = table(
     column("pronamespace"),
     column("proacl"),
     column("proowner"),
+    column("xmin"),
 )
 
 pg_type = table(
@@ -119,7 +222,9 @@ pg_type = table(
     column("typname"),
     column("typnamespace"),
     column("typowner"),
+    column("typtype"),
     column("typacl"),
+    column("xmin"),
 )
 
 pg_parameter_acl = table(
@@ -127,6 +232,7 @@ pg_parameter_acl = table(
     column("oid"),
     column("parname"),
     column("paracl"),
+    column("xmin"),
 )
 
 pg_language = table(
@@ -135,6 +241,7 @@ pg_language = table(
     column("lanname"),
     column("lanowner"),
     column("lanacl"),
+    column("xmin"),
 )
 
 pg_database = table(
@@ -143,6 +250,7 @@ pg_database = table(
     column("datname"),
     column("datdba"),
     column("datacl"),
+    column("xmin"),
 )
 
 pg_tablespace = table(
@@ -151,6 +259,49 @@ pg_tablespace = table(
     column("spcname"),
     column("spcowner"),
     column("spcacl"),
+    column("xmin"),
+)
+
+pg_foreign_data_wrapper = table(
+    "pg_foreign_data_wrapper",
+    column("oid"),
+    column("fdwname"),
+    column("fdwowner"),
+    column("fdwacl"),
+    column("xmin"),
+)
+
+pg_foreign_server = table(
+    "pg_foreign_server",
+    column("oid"),
+    column("srvname"),
+    column("srvowner"),
+    column("srvacl"),
+    column("xmin"),
+)
+
+pg_init_privs = table(
+    "pg_init_privs",
+    column("objoid"),
+    column("classoid"),
+    column("objsubid"),
+    column("initprivs"),
+)
+
+pg_default_acl = table(
+    "pg_default_acl",
+    column("oid"),
+    column("defaclrole"),
+    column("defaclnamespace"),
+    column("defaclobjtype"),
+    column("defaclacl"),
+)
+
+pg_largeobject_metadata = table(
+    "pg_largeobject_metadata",
+    column("oid"),
+    column("lomowner"),
+    column("lomacl"),
 )
 
 pg_attribute = table(
@@ -160,19 +311,16 @@ pg_attribute = table(
     column("attnum"),
     column("attisdropped"),
     column("attacl"),
+    column("xmin"),
 )
 
-_pg_class_stmt = (
-    select(
-        pg_class.c.oid,
-        pg_namespace.c.nspname.label("schema"),
-        pg_class.c.relname.label("name"),
-        pg_roles.c.rolname.label("owner"),
-        cast(pg_class.c.relacl, ARRAY(Text)).label("acl"),
-    )
-    .outerjoin(pg_namespace, pg_class.c.relnamespace == pg_namespace.c.oid)
-    .outerjoin(pg_roles, pg_class.c.relowner == pg_roles.c.oid)
-)
+_pg_class_stmt = select(
+    pg_class.c.oid,
+    pg_namespace.c.nspname.label("schema"),
+    pg_class.c.relname.label("name"),
+    _owner(pg_class.c.relowner).label("owner"),
+    _acl(pg_class.c.relacl).label("acl"),
+).outerjoin(pg_namespace, pg_class.c.relnamespace == pg_namespace.c.oid)
 
 _pg_attribute_stmt = (
     select(
@@ -180,13 +328,12 @@ _pg_attribute_stmt = (
         pg_namespace.c.nspname.label("schema"),
         pg_class.c.relname.label("table"),
         pg_attribute.c.attname.label("column"),
-        pg_roles.c.rolname.label("owner"),
-        cast(pg_attribute.c.attacl, ARRAY(Text)).label("acl"),
+        _owner(pg_class.c.relowner).label("owner"),
+        _acl(pg_attribute.c.attacl).label("acl"),
     )
     .select_from(pg_attribute)
     .join(pg_class, pg_attribute.c.attrelid == pg_class.c.oid)
     .outerjoin(pg_namespace, pg_class.c.relnamespace == pg_namespace.c.oid)
-    .outerjoin(pg_roles, pg_class.c.relowner == pg_roles.c.oid)
     .where(pg_attribute.c.attnum > 0)
     .where(~pg_attribute.c.attisdropped)
     .where(
@@ -212,81 +359,168 @@ _pg_proc_argtypes = (
     .scalar_subquery()
 )
 
-_pg_proc_stmt = (
+_pg_proc_stmt = select(
+    pg_proc.c.oid,
+    pg_namespace.c.nspname.label("schema"),
+    pg_proc.c.proname.label("name"),
+    _pg_proc_argtypes.label("arg_types"),
+    _owner(pg_proc.c.proowner).label("owner"),
+    _acl(pg_proc.c.proacl).label("acl"),
+).outerjoin(pg_namespace, pg_proc.c.pronamespace == pg_namespace.c.oid)
+
+_pg_lang_stmt = select(
+    pg_language.c.oid,
+    pg_language.c.lanname.label("name"),
+    _owner(pg_language.c.lanowner).label("owner"),
+    _acl(pg_language.c.lanacl).label("acl"),
+).select_from(pg_language)
+
+_pg_schema_stmt = select(
+    pg_namespace.c.oid,
+    pg_namespace.c.nspname.label("name"),
+    _owner(pg_namespace.c.nspowner).label("owner"),
+    _acl(pg_namespace.c.nspacl).label("acl"),
+).select_from(pg_namespace)
+
+_pg_db_stmt = select(
+    pg_database.c.oid,
+    pg_database.c.datname.label("name"),
+    _owner(pg_database.c.datdba).label("owner"),
+    _acl(pg_database.c.datacl).label("acl"),
+).select_from(pg_database)
+
+_pg_tablespace_stmt = select(
+    pg_tablespace.c.oid,
+    pg_tablespace.c.spcname.label("name"),
+    _owner(pg_tablespace.c.spcowner).label("owner"),
+    _acl(pg_tablespace.c.spcacl).label("acl"),
+).select_from(pg_tablespace)
+
+_pg_type_stmt = (
     select(
-        pg_proc.c.oid,
+        pg_type.c.oid,
         pg_namespace.c.nspname.label("schema"),
-        pg_proc.c.proname.label("name"),
-        _pg_proc_argtypes.label("arg_types"),
-        pg_roles.c.rolname.label("owner"),
-        cast(pg_proc.c.proacl, ARRAY(Text)).label("acl"),
+        pg_type.c.typname.label("name"),
+        _owner(pg_type.c.typowner).label("owner"),
+        _acl(pg_type.c.typacl).label("acl"),
     )
-    .outerjoin(pg_namespace, pg_proc.c.pronamespace == pg_namespace.c.oid)
-    .outerjoin(pg_roles, pg_proc.c.proowner == pg_roles.c.oid)
+    .select_from(pg_type)
+    .outerjoin(pg_namespace, pg_type.c.typnamespace == pg_namespace.c.oid)
 )
 
-_pg_lang_stmt = (
-    select(
-        pg_language.c.oid,
-        pg_language.c.lanname.label("name"),
-        pg_roles.c.rolname.label("owner"),
-        cast(pg_language.c.lanacl, ARRAY(Text)).label("acl"),
-    )
-    .select_from(pg_language)
-    .outerjoin(pg_roles, pg_language.c.lanowner == pg_roles.c.oid)
-)
+_pg_fdw_stmt = select(
+    pg_foreign_data_wrapper.c.oid,
+    pg_foreign_data_wrapper.c.fdwname.label("name"),
+    _owner(pg_foreign_data_wrapper.c.fdwowner).label("owner"),
+    _acl(pg_foreign_data_wrapper.c.fdwacl).label("acl"),
+).select_from(pg_foreign_data_wrapper)
 
-_pg_schema_stmt = (
-    select(
-        pg_namespace.c.oid,
-        pg_namespace.c.nspname.label("name"),
-        pg_roles.c.rolname.label("owner"),
-        cast(pg_namespace.c.nspacl, ARRAY(Text)).label("acl"),
-    )
-    .select_from(pg_namespace)
-    .outerjoin(pg_roles, pg_namespace.c.nspowner == pg_roles.c.oid)
-)
+_pg_server_stmt = select(
+    pg_foreign_server.c.oid,
+    pg_foreign_server.c.srvname.label("name"),
+    _owner(pg_foreign_server.c.srvowner).label("owner"),
+    _acl(pg_foreign_server.c.srvacl).label("acl"),
+).select_from(pg_foreign_server)
 
-_pg_db_stmt = (
-    select(
-        pg_database.c.oid,
-        pg_database.c.datname.label("name"),
-        pg_roles.c.rolname.label("owner"),
-        cast(pg_database.c.datacl, ARRAY(Text)).label("acl"),
-    )
-    .select_from(pg_database)
-    .outerjoin(pg_roles, pg_database.c.datdba == pg_roles.c.oid)
+_pg_parameter_stmt = select(
+    pg_parameter_acl.c.oid,
+    pg_parameter_acl.c.parname.label("name"),
+    _acl(pg_parameter_acl.c.paracl).label("acl"),
 )
 
-_pg_tablespace_stmt = (
+
+_pg_largeobject_stmt = (
     select(
-        pg_tablespace.c.oid,
-        pg_tablespace.c.spcname.label("name"),
-        pg_roles.c.rolname.label("owner"),
-        cast(pg_tablespace.c.spcacl, ARRAY(Text)).label("acl"),
+        pg_largeobject_metadata.c.oid,
+        cast(pg_largeobject_metadata.c.oid, Text).label("name"),
+        _owner(pg_largeobject_metadata.c.lomowner).label("owner"),
+        _acl(pg_largeobject_metadata.c.lomacl).label("acl"),
     )
-    .select_from(pg_tablespace)
-    .outerjoin(pg_roles, pg_tablespace.c.spcowner == pg_roles.c.oid)
+    .select_from(pg_largeobject_metadata)
+    .order_by(pg_largeobject_metadata.c.oid)
 )
 
-_pg_type_stmt = (
+# Object types in pg_default_acl.defaclobjtype
+_default_acl_types = {
+    "r": PgObjectType.TABLE,
+    "S": PgObjectType.SEQUENCE,
+    "f": PgObjectType.FUNCTION,
+    "T": PgObjectType.TYPE,
+    "n": PgObjectType.SCHEMA,
+    "L": PgObjectType.LARGE_OBJECT,
+}
+_default_acl_codes = {type: code for code, type in _default_acl_types.items()}
+_default_acl_codes[PgObjectType.DOMAIN] = "T"
+
+# acldefault() uses its own codes, e.g. "S" is a foreign server there.
+_acldefault_codes = {"r": "r", "S": "s", "f": "f", "T": "T", "n": "n", "L": "L"}
+
+_pg_default_acl_stmt = (
     select(
-        pg_type.c.oid,
+        pg_default_acl.c.oid,
+        _owner(pg_default_acl.c.defaclrole).label("role"),
         pg_namespace.c.nspname.label("schema"),
-        pg_type.c.typname.label("name"),
-        pg_roles.c.rolname.label("owner"),
-        cast(pg_type.c.typacl, ARRAY(Text)).label("acl"),
+        # need to cast for PostgreSQL < 13 on psycopg3
+        cast(pg_default_acl.c.defaclobjtype, Text).label("type"),
+        _acl(pg_default_acl.c.defaclacl).label("acl"),
     )
-    .select_from(pg_type)
-    .outerjoin(pg_namespace, pg_type.c.typnamespace == pg_namespace.c.oid)
-    .outerjoin(pg_roles, pg_type.c.typowner == pg_roles.c.oid)
+    .select_from(pg_default_acl)
+    .outerjoin(pg_namespace, pg_default_acl.c.defaclnamespace == pg_namespace.c.oid)
 )
 
-_pg_parameter_stmt = select(
-    pg_parameter_acl.c.oid,
-    pg_parameter_acl.c.parname.label("name"),
-    cast(pg_parameter_acl.c.paracl, ARRAY(Text)).label("acl"),
-)
+
+def _with_init_privs(
+    stmt: Select[TP],
+    catalog: str,
+    oid_column: ColumnElement[Any],
+    acl_column: ColumnElement[Any],
+    subid_column: Optional[ColumnElement[Any]] = None,
+) -> Select[TP]:
+    """Add the initial privileges of each object from ``pg_init_privs`` as
+    ``init_acl``, leaving out objects whose ACL is the same, like ``pg_dump``.
+    Both are NULL for objects which have default privileges.
+    """
+    initprivs = (
+        select(pg_init_privs.c.initprivs)
+        .where(
+            pg_init_privs.c.objoid == oid_column,
+            pg_init_privs.c.classoid == cast(catalog, REGCLASS),
+            pg_init_privs.c.objsubid
+            == (subid_column if subid_column is not None else 0),
+        )
+        .scalar_subquery()
+    )
+    return stmt.add_columns(_acl(initprivs).label("init_acl")).where(
+        acl_column.is_distinct_from(initprivs)
+    )
+
+
+def _names_clause(
+    column: ColumnElement[Any], names: SchemaInput, like: bool = False
+) -> ColumnElement[bool]:
+    if isinstance(names, str):
+        return column.like(names) if like else column == names
+    value = any_(literal(list(names), ARRAY(Text)))
+    return column.like(value) if like else column == value
+
+
+def _filter_schemas(
+    stmt: Select[TP],
+    schema: Optional[SchemaInput] = None,
+    schema_like: Optional[SchemaInput] = None,
+    schema_regex: Optional[str] = None,
+) -> Select[TP]:
+    """Limit `stmt` to schemas matching any of the filters, using one
+    ``= ANY(...)``, ``LIKE ANY(...)``, or ``~`` predicate for each.
+    """
+    clauses = []
+    if schema is not None:
+        clauses.append(_names_clause(pg_namespace.c.nspname, schema))
+    if schema_like is not None:
+        clauses.append(_names_clause(pg_namespace.c.nspname, schema_like, like=True))
+    if schema_regex is not None:
+        clauses.append(pg_namespace.c.nspname.regexp_match(schema_regex))
+    return stmt.where(or_(*clauses)) if clauses else stmt
 
 
 def _filter_pg_class_stmt(
@@ -345,10 +579,17 @@ def _filter_pg_proc_stmt(
 
 
 def _filter_pg_type_stmt(
-    schema: Optional[str] = None, type_name: Optional[str] = None
+    schema: Optional[str] = None,
+    type_name: Optional[str] = None,
+    domain: Optional[bool] = None,
 ) -> Select[Any]:
     stmt = _pg_type_stmt
 
+    if domain is not None:
+        # need to cast for PostgreSQL < 13 on psycopg3
+        typtype = cast(pg_type.c.typtype, Text)
+        stmt = stmt.where(typtype == "d" if domain else typtype != "d")
+
     if schema is not None:
         stmt = stmt.where(pg_namespace.c.nspname == schema)
 
@@ -378,6 +619,23 @@ def _table_stmt(
     )
 
 
+def _collapse_partitions(stmt: Select[TP]) -> Select[TP]:
+    """Leave out partitions with the same owner and ACL as their parent."""
+    parent = pg_class.alias("parent")
+    same_as_parent = (
+        select(pg_inherits.c.inhrelid)
+        .select_from(pg_inherits)
+        .join(parent, pg_inherits.c.inhparent == parent.c.oid)
+        .where(
+            pg_inherits.c.inhrelid == pg_class.c.oid,
+            parent.c.relowner == pg_class.c.relowner,
+            parent.c.relacl.is_not_distinct_from(pg_class.c.relacl),
+        )
+        .exists()
+    )
+    return stmt.where(not_(and_(pg_class.c.relispartition, same_as_parent)))
+
+
 def _sequence_stmt(
     schema: Optional[str] = None, sequence_name: Optional[str] = None
 ) -> Select[Any]:
@@ -386,21 +644,43 @@ def _sequence_stmt(
 
 
 def get_all_table_acls(
-    conn: Connectable, schema: Optional[str] = None
+    conn: Connectable,
+    schema: Optional[SchemaInput] = None,
+    *,
+    schema_like: Optional[SchemaInput] = None,
+    schema_regex: Optional[str] = None,
+    init_privs: bool = False,
+    collapse_partitions: bool = False,
 ) -> List[SchemaRelationInfo]:
     """Get privileges for all tables, views, materialized views, and foreign
     tables.
 
-    Specify `schema` to limit the results to that schema.
+    Specify `schema` to limit the results to that schema, or to any of a
+    collection of schemas. Specify `schema_like` to limit them to schemas
+    matching a ``LIKE`` pattern or any of a collection of patterns, and
+    `schema_regex` for a POSIX regular expression. When several are given,
+    objects in a schema matching any of them are returned. The filters are
+    applied by the server in a single query.
+
+    If `init_privs` is true, only objects whose privileges changed since
+    they were created are returned, like ``pg_dump`` does: objects whose ACL
+    is the same as their initial privileges in ``pg_init_privs`` (usually
+    objects created by an extension), or is ``None`` if they have none, are
+    left out. The initial privileges are in ``init_acl``.
+
+    If `collapse_partitions` is true, partitions with the same owner and ACL
+    as their parent table are left out, so that only the partitions whose
+    privileges differ are returned. Requires PostgreSQL 10 or later.
 
     Returns:
         List of :class:`~.types.SchemaRelationInfo` objects.
     """
-    stmt = _table_stmt(schema=schema)
-    return [
-        SchemaRelationInfo(**t.cast("Mapping[str, Any]", row))
-        for row in conn.execute(stmt).mappings()
-    ]
+    stmt = _filter_schemas(_table_stmt(), schema, schema_like, schema_regex)
+    if collapse_partitions:
+        stmt = _collapse_partitions(stmt)
+    if init_privs:
+        stmt = _with_init_privs(stmt, "pg_class", pg_class.c.oid, pg_class.c.relacl)
+    return _infos(SchemaRelationInfo, conn.execute(stmt), type=PgObjectType.TABLE)
 
 
 def get_table_acl(
@@ -419,25 +699,39 @@ def get_table_acl(
     row = conn.execute(stmt).mappings().one_or_none()
     if row is None:
         raise NoSuchObjectError(name)
-    return SchemaRelationInfo(**t.cast("Mapping[str, Any]", row))
+    return SchemaRelationInfo(
+        **t.cast("Mapping[str, Any]", row), type=PgObjectType.TABLE
+    )
 
 
 def get_all_column_acls(
-    conn: Connectable, schema: Optional[str] = None
+    conn: Connectable,
+    schema: Optional[SchemaInput] = None,
+    *,
+    schema_like: Optional[SchemaInput] = None,
+    schema_regex: Optional[str] = None,
+    init_privs: bool = False,
 ) -> List[ColumnInfo]:
     """Get privileges for all table, view, materialized view, and foreign
     table columns.
 
-    Specify `schema` to limit the results to that schema.
+    Specify `schema` to limit the results to that schema, or to any of a
+    collection of schemas. For `schema_like`, `schema_regex`, and
+    `init_privs`, see :func:`get_all_table_acls`.
 
     Returns:
         List of :class:`~.types.ColumnInfo` objects.
     """
-    stmt = _filter_pg_class_stmt(_pg_attribute_stmt, schema=schema)
-    return [
-        ColumnInfo(**t.cast("Mapping[str, Any]", row))
-        for row in conn.execute(stmt).mappings()
-    ]
+    stmt = _filter_schemas(_pg_attribute_stmt, schema, schema_like, schema_regex)
+    if init_privs:
+        stmt = _with_init_privs(
+            stmt,
+            "pg_class",
+            pg_attribute.c.attrelid,
+            pg_attribute.c.attacl,
+            pg_attribute.c.attnum,
+        )
+    return _infos(ColumnInfo, conn.execute(stmt))
 
 
 def get_column_acls(
@@ -456,22 +750,30 @@ def get_column_acls(
     rows = conn.execute(stmt).mappings().all()
     if not rows:
         raise NoSuchObjectError(table_name)
-    return [ColumnInfo(**t.cast("Mapping[str, Any]", row)) for row in rows]
+    pool = _StringPool()
+    return [ColumnInfo(**pool(row)) for row in rows]
 
 
 def get_all_sequence_acls(
-    conn: Connectable, schema: Optional[str] = None
+    conn: Connectable,
+    schema: Optional[SchemaInput] = None,
+    *,
+    schema_like: Optional[SchemaInput] = None,
+    schema_regex: Optional[str] = None,
+    init_privs: bool = False,
 ) -> List[SchemaRelationInfo]:
     """Unless `schema` is given, returns all sequences from all schemas.
 
+    `schema` can also be a collection of schemas. For `schema_like`,
+    `schema_regex`, and `init_privs`, see :func:`get_all_table_acls`.
+
     Returns:
         List of :class:`~.types.SchemaRelationInfo` objects.
     """
-    stmt = _sequence_stmt(schema=schema)
-    return [
-        SchemaRelationInfo(**t.cast("Mapping[str, Any]", row))
-        for row in conn.execute(stmt).mappings()
-    ]
+    stmt = _filter_schemas(_sequence_stmt(), schema, schema_like, schema_regex)
+    if init_privs:
+        stmt = _with_init_privs(stmt, "pg_class", pg_class.c.oid, pg_class.c.relacl)
+    return _infos(SchemaRelationInfo, conn.execute(stmt), type=PgObjectType.SEQUENCE)
 
 
 def get_sequence_acl(
@@ -487,7 +789,9 @@ def get_sequence_acl(
     row = conn.execute(stmt).mappings().one_or_none()
     if row is None:
         raise NoSuchObjectError(sequence)
-    return SchemaRelationInfo(**t.cast("Mapping[str, Any]", row))
+    return SchemaRelationInfo(
+        **t.cast("Mapping[str, Any]", row), type=PgObjectType.SEQUENCE
+    )
 
 
 def _make_canonical_type_function(conn: Connectable) -> None:
@@ -518,19 +822,26 @@ def _make_canonical_type_function(conn: Connectable) -> None:
 
 
 def get_all_function_acls(
-    conn: Connectable, schema: Optional[str] = None
+    conn: Connectable,
+    schema: Optional[SchemaInput] = None,
+    *,
+    schema_like: Optional[SchemaInput] = None,
+    schema_regex: Optional[str] = None,
+    init_privs: bool = False,
 ) -> List[FunctionInfo]:
     """Unless `schema` is given, returns all functions from all schemas.
 
+    `schema` can also be a collection of schemas. For `schema_like`,
+    `schema_regex`, and `init_privs`, see :func:`get_all_table_acls`.
+
     Returns:
         List of :class:`~.types.FunctionInfo` objects.
     """
     _make_canonical_type_function(conn)
-    stmt = _filter_pg_proc_stmt(schema=schema)
-    return [
-        FunctionInfo(**t.cast("Mapping[str, Any]", row))
-        for row in conn.execute(stmt).mappings()
-    ]
+    stmt = _filter_schemas(_filter_pg_proc_stmt(), schema, schema_like, schema_regex)
+    if init_privs:
+        stmt = _with_init_privs(stmt, "pg_proc", pg_proc.c.oid, pg_proc.c.proacl)
+    return _infos(FunctionInfo, conn.execute(stmt))
 
 
 def get_function_acl(
@@ -562,15 +873,20 @@ def get_function_acl(
     return FunctionInfo(**t.cast("Mapping[str, Any]", row))
 
 
-def get_all_language_acls(conn: Connectable) -> List[RelationInfo]:
-    """
+def get_all_language_acls(
+    conn: Connectable, *, init_privs: bool = False
+) -> List[RelationInfo]:
+    """For `init_privs`, see :func:`get_all_table_acls`.
+
     Returns:
         List of :class:`~.types.RelationInfo` objects.
     """
-    return [
-        RelationInfo(**t.cast("Mapping[str, Any]", row))
-        for row in conn.execute(_pg_lang_stmt).mappings()
-    ]
+    stmt = _pg_lang_stmt
+    if init_privs:
+        stmt = _with_init_privs(
+            stmt, "pg_language", pg_language.c.oid, pg_language.c.lanacl
+        )
+    return _infos(RelationInfo, conn.execute(stmt), type=PgObjectType.LANGUAGE)
 
 
 def get_language_acl(conn: Connectable, language: str) -> RelationInfo:
@@ -582,18 +898,23 @@ def get_language_acl(conn: Connectable, language: str) -> RelationInfo:
     row = conn.execute(stmt).mappings().one_or_none()
     if row is None:
         raise NoSuchObjectError(language)
-    return RelationInfo(**t.cast("Mapping[str, Any]", row))
+    return RelationInfo(**t.cast("Mapping[str, Any]", row), type=PgObjectType.LANGUAGE)
 
 
-def get_all_schema_acls(conn: Connectable) -> List[RelationInfo]:
-    """
+def get_all_schema_acls(
+    conn: Connectable, *, init_privs: bool = False
+) -> List[RelationInfo]:
+    """For `init_privs`, see :func:`get_all_table_acls`.
+
     Returns:
         List of :class:`~.types.RelationInfo` objects.
     """
-    return [
-        RelationInfo(**t.cast("Mapping[str, Any]", row))
-        for row in conn.execute(_pg_schema_stmt).mappings()
-    ]
+    stmt = _pg_schema_stmt
+    if init_privs:
+        stmt = _with_init_privs(
+            stmt, "pg_namespace", pg_namespace.c.oid, pg_namespace.c.nspacl
+        )
+    return _infos(RelationInfo, conn.execute(stmt), type=PgObjectType.SCHEMA)
 
 
 def get_schema_acl(conn: Connectable, schema: str) -> RelationInfo:
@@ -605,7 +926,7 @@ def get_schema_acl(conn: Connectable, schema: str) -> RelationInfo:
     row = conn.execute(stmt).mappings().one_or_none()
     if row is None:
         raise NoSuchObjectError(schema)
-    return RelationInfo(**t.cast("Mapping[str, Any]", row))
+    return RelationInfo(**t.cast("Mapping[str, Any]", row), type=PgObjectType.SCHEMA)
 
 
 def get_all_database_acls(conn: Connectable) -> List[RelationInfo]:
@@ -613,10 +934,7 @@ def get_all_database_acls(conn: Connectable) -> List[RelationInfo]:
     Returns:
         List of :class:`~.types.RelationInfo` objects.
     """
-    return [
-        RelationInfo(**t.cast("Mapping[str, Any]", row))
-        for row in conn.execute(_pg_db_stmt).mappings()
-    ]
+    return _infos(RelationInfo, conn.execute(_pg_db_stmt), type=PgObjectType.DATABASE)
 
 
 def get_database_acl(conn: Connectable, database: str) -> RelationInfo:
@@ -628,7 +946,7 @@ def get_database_acl(conn: Connectable, database: str) -> RelationInfo:
     row = conn.execute(stmt).mappings().one_or_none()
     if row is None:
         raise NoSuchObjectError(database)
-    return RelationInfo(**t.cast("Mapping[str, Any]", row))
+    return RelationInfo(**t.cast("Mapping[str, Any]", row), type=PgObjectType.DATABASE)
 
 
 def get_all_tablespace_acls(conn: Connectable) -> List[RelationInfo]:
@@ -636,10 +954,9 @@ def get_all_tablespace_acls(conn: Connectable) -> List[RelationInfo]:
     Returns:
         List of :class:`~.types.RelationInfo` objects.
     """
-    return [
-        RelationInfo(**t.cast("Mapping[str, Any]", row))
-        for row in conn.execute(_pg_tablespace_stmt).mappings()
-    ]
+    return _infos(
+        RelationInfo, conn.execute(_pg_tablespace_stmt), type=PgObjectType.TABLESPACE
+    )
 
 
 def get_tablespace_acl(conn: Connectable, tablespace: str) -> RelationInfo:
@@ -651,22 +968,35 @@ def get_tablespace_acl(conn: Connectable, tablespace: str) -> RelationInfo:
     row = conn.execute(stmt).mappings().one_or_none()
     if row is None:
         raise NoSuchObjectError(tablespace)
-    return RelationInfo(**t.cast("Mapping[str, Any]", row))
+    return RelationInfo(
+        **t.cast("Mapping[str, Any]", row), type=PgObjectType.TABLESPACE
+    )
 
 
 def get_all_type_acls(
-    conn: Connectable, schema: Optional[str] = None
+    conn: Connectable,
+    schema: Optional[SchemaInput] = None,
+    *,
+    schema_like: Optional[SchemaInput] = None,
+    schema_regex: Optional[str] = None,
+    init_privs: bool = False,
 ) -> List[SchemaRelationInfo]:
     """Unless `schema` is given, returns all types from all schemas.
 
+    Domains are not included, see :func:`get_all_domain_acls`.
+
+    `schema` can also be a collection of schemas. For `schema_like`,
+    `schema_regex`, and `init_privs`, see :func:`get_all_table_acls`.
+
     Returns:
         List of :class:`~.types.SchemaRelationInfo` objects.
     """
-    stmt = _filter_pg_type_stmt(schema=schema)
-    return [
-        SchemaRelationInfo(**t.cast("Mapping[str, Any]", row))
-        for row in conn.execute(stmt).mappings()
-    ]
+    stmt = _filter_schemas(
+        _filter_pg_type_stmt(domain=False), schema, schema_like, schema_regex
+    )
+    if init_privs:
+        stmt = _with_init_privs(stmt, "pg_type", pg_type.c.oid, pg_type.c.typacl)
+    return _infos(SchemaRelationInfo, conn.execute(stmt), type=PgObjectType.TYPE)
 
 
 def get_type_acl(
@@ -681,7 +1011,112 @@ def get_type_acl(
     row = conn.execute(stmt).mappings().one_or_none()
     if row is None:
         raise NoSuchObjectError(type_name)
-    return SchemaRelationInfo(**t.cast("Mapping[str, Any]", row))
+    return SchemaRelationInfo(
+        **t.cast("Mapping[str, Any]", row), type=PgObjectType.TYPE
+    )
+
+
+def get_all_domain_acls(
+    conn: Connectable,
+    schema: Optional[SchemaInput] = None,
+    *,
+    schema_like: Optional[SchemaInput] = None,
+    schema_regex: Optional[str] = None,
+    init_privs: bool = False,
+) -> List[SchemaRelationInfo]:
+    """Unless `schema` is given, returns all domains from all schemas.
+
+    `schema` can also be a collection of schemas. For `schema_like`,
+    `schema_regex`, and `init_privs`, see :func:`get_all_table_acls`.
+
+    Returns:
+        List of :class:`~.types.SchemaRelationInfo` objects.
+    """
+    stmt = _filter_schemas(
+        _filter_pg_type_stmt(domain=True), schema, schema_like, schema_regex
+    )
+    if init_privs:
+        stmt = _with_init_privs(stmt, "pg_type", pg_type.c.oid, pg_type.c.typacl)
+    return _infos(SchemaRelationInfo, conn.execute(stmt), type=PgObjectType.DOMAIN)
+
+
+def get_domain_acl(
+    conn: Connectable, domain: str, schema: Optional[str] = None
+) -> SchemaRelationInfo:
+    """If `schema` is not given, the domain must be visible in the search path.
+
+    Returns:
+         :class:`~.types.SchemaRelationInfo`
+    """
+    stmt = _filter_pg_type_stmt(schema=schema, type_name=domain, domain=True)
+    row = conn.execute(stmt).mappings().one_or_none()
+    if row is None:
+        raise NoSuchObjectError(domain)
+    return SchemaRelationInfo(
+        **t.cast("Mapping[str, Any]", row), type=PgObjectType.DOMAIN
+    )
+
+
+def get_all_foreign_data_wrapper_acls(
+    conn: Connectable, *, init_privs: bool = False
+) -> List[RelationInfo]:
+    """For `init_privs`, see :func:`get_all_table_acls`.
+
+    Returns:
+        List of :class:`~.types.RelationInfo` objects.
+    """
+    stmt = _pg_fdw_stmt
+    if init_privs:
+        fdw = pg_foreign_data_wrapper
+        stmt = _with_init_privs(
+            stmt, "pg_foreign_data_wrapper", fdw.c.oid, fdw.c.fdwacl
+        )
+    return _infos(
+        RelationInfo, conn.execute(stmt), type=PgObjectType.FOREIGN_DATA_WRAPPER
+    )
+
+
+def get_foreign_data_wrapper_acl(conn: Connectable, fdw: str) -> RelationInfo:
+    """
+    Returns:
+         :class:`~.types.RelationInfo`
+    """
+    stmt = _pg_fdw_stmt.where(pg_foreign_data_wrapper.c.fdwname == fdw)
+    row = conn.execute(stmt).mappings().one_or_none()
+    if row is None:
+        raise NoSuchObjectError(fdw)
+    return RelationInfo(
+        **t.cast("Mapping[str, Any]", row), type=PgObjectType.FOREIGN_DATA_WRAPPER
+    )
+
+
+def get_all_foreign_server_acls(
+    conn: Connectable, *, init_privs: bool = False
+) -> List[RelationInfo]:
+    """For `init_privs`, see :func:`get_all_table_acls`.
+
+    Returns:
+        List of :class:`~.types.RelationInfo` objects.
+    """
+    stmt = _pg_server_stmt
+    if init_privs:
+        srv = pg_foreign_server
+        stmt = _with_init_privs(stmt, "pg_foreign_server", srv.c.oid, srv.c.srvacl)
+    return _infos(RelationInfo, conn.execute(stmt), type=PgObjectType.FOREIGN_SERVER)
+
+
+def get_foreign_server_acl(conn: Connectable, server: str) -> RelationInfo:
+    """
+    Returns:
+         :class:`~.types.RelationInfo`
+    """
+    stmt = _pg_server_stmt.where(pg_foreign_server.c.srvname == server)
+    row = conn.execute(stmt).mappings().one_or_none()
+    if row is None:
+        raise NoSuchObjectError(server)
+    return RelationInfo(
+        **t.cast("Mapping[str, Any]", row), type=PgObjectType.FOREIGN_SERVER
+    )
 
 
 def get_all_parameter_acls(conn: Connectable) -> List[ParameterInfo]:
@@ -690,10 +1125,7 @@ def get_all_parameter_acls(conn: Connectable) -> List[ParameterInfo]:
     Returns:
         List of :class:`~.types.ParameterInfo` objects
     """
-    return [
-        ParameterInfo(**t.cast("Mapping[str, Any]", row))
-        for row in conn.execute(_pg_parameter_stmt).mappings()
-    ]
+    return _infos(ParameterInfo, conn.execute(_pg_parameter_stmt))
 
 
 def get_parameter_acl(conn: Connectable, parameter: str) -> Optional[ParameterInfo]:
@@ -708,3 +1140,164 @@ def get_parameter_acl(conn: Connectable, parameter: str) -> Optional[ParameterIn
     if row is None:
         return None
     return ParameterInfo(**t.cast("Mapping[str, Any]", row))
+
+
+def iter_large_object_acls(
+    conn: Connectable, *, batch_size: int = 1000
+) -> Iterator[RelationInfo]:
+    """Iterate over the privileges of all large objects, in order of their
+    identifier. The name of each large object is its identifier.
+
+    Rows are fetched `batch_size` at a time using a server-side cursor, so
+    that any number of large objects can be scanned in constant memory. The
+    connection can't be used for anything else until iteration is finished.
+
+    Returns:
+        Iterator of :class:`~.types.RelationInfo` objects.
+    """
+    result = conn.execute(
+        _pg_largeobject_stmt,
+        execution_options={"stream_results": True, "yield_per": batch_size},
+    )
+    pool = _StringPool()
+    for row in result.mappings():
+        yield RelationInfo(**pool(row), type=PgObjectType.LARGE_OBJECT)
+
+
+def get_large_object_acl_groups(conn: Connectable) -> List[LargeObjectAclGroup]:
+    """Group large objects by owner and privileges on the server, so that
+    only one row is returned for each distinct ACL.
+
+    Returns:
+        List of :class:`~.types.LargeObjectAclGroup` objects.
+    """
+    lom = pg_largeobject_metadata
+    acl = _acl(lom.c.lomacl)
+    stmt = (
+        select(
+            _owner(lom.c.lomowner).label("owner"),
+            acl.label("acl"),
+            func.count().label("count"),
+            # oid has no min or max aggregate before PostgreSQL 14
+            func.min(cast(lom.c.oid, BigInteger)).label("min_oid"),
+            func.max(cast(lom.c.oid, BigInteger)).label("max_oid"),
+        )
+        .group_by(lom.c.lomowner, acl)
+        .order_by(literal_column("min_oid"))
+    )
+    return _infos(LargeObjectAclGroup, conn.execute(stmt))
+
+
+def get_all_default_acls(
+    conn: Connectable, schema: Optional[str] = None
+) -> List[DefaultAclInfo]:
+    """Get the default privileges set with ``ALTER DEFAULT PRIVILEGES``.
+
+    Specify `schema` to limit the results to that schema. Default privileges
+    for all schemas are always included.
+
+    Returns:
+        List of :class:`~.types.DefaultAclInfo` objects.
+    """
+    stmt = _pg_default_acl_stmt
+    if schema is not None:
+        stmt = stmt.where(
+            (pg_default_acl.c.defaclnamespace == 0) | (pg_namespace.c.nspname == schema)
+        )
+
+    pool = _StringPool()
+    result = []
+    for row in conn.execute(stmt).mappings():
+        values = pool(row)
+        values["type"] = _default_acl_types[values["type"]]
+        result.append(DefaultAclInfo(**values))
+    return result
+
+
+def get_effective_default_privileges(
+    conn: Connectable,
+    type: PgObjectType,
+    role: str,
+    schema: Optional[str] = None,
+) -> List[Privileges]:
+    """Return the privileges that a new object would get if `role` created
+    it, from the built-in default privileges and those set with ``ALTER
+    DEFAULT PRIVILEGES`` for all schemas and for `schema`.
+
+    Like PostgreSQL, privileges for `schema` are added to those for all
+    schemas, which replace the built-in default privileges.
+
+    Parameters:
+        conn: SQLAlchemy connection or ORM session.
+        type: The type of the new object: one of
+              :attr:`~.PgObjectType.TABLE`, :attr:`~.PgObjectType.SEQUENCE`,
+              :attr:`~.PgObjectType.FUNCTION`, :attr:`~.PgObjectType.TYPE`,
+              :attr:`~.PgObjectType.DOMAIN`, :attr:`~.PgObjectType.SCHEMA`,
+              or :attr:`~.PgObjectType.LARGE_OBJECT`.
+        role: The role creating the object, which will own it.
+        schema: Optional. The schema of the new object.
+
+    Raises:
+        NoSuchObjectError: if `role` doesn't exist.
+        ValueError: if `type` doesn't have default privileges.
+    """
+    try:
+        code = _default_acl_codes[type]
+    except KeyError:
+        raise ValueError(f"No default privileges for type: {type}") from None
+
+    builtin_code = _acldefault_codes[code]
+    objtype = cast(pg_default_acl.c.defaclobjtype, Text) == code
+
+    def rule(namespace: ColumnElement[bool]) -> Any:
+        return (
+            select(_acl(pg_default_acl.c.defaclacl))
+            .where(pg_default_acl.c.defaclrole == pg_roles.c.oid)
+            .where(objtype)
+            .where(namespace)
+            .scalar_subquery()
+        )
+
+    schema_rule: Any = cast(null(), _AclArray())
+    if schema is not None and type is not PgObjectType.SCHEMA:
+        schema_oid = (
+            select(pg_namespace.c.oid)
+            .where(pg_namespace.c.nspname == schema)
+            .scalar_subquery()
+        )
+        schema_rule = rule(pg_default_acl.c.defaclnamespace == schema_oid)
+
+    stmt = select(
+        _acl(
+            func.acldefault(
+                literal_column(f"'{builtin_code}'::\"char\""), pg_roles.c.oid
+            )
+        ),
+        rule(pg_default_acl.c.defaclnamespace == 0),
+        schema_rule,
+    ).where(pg_roles.c.rolname == role)
+
+    row = conn.execute(stmt).one_or_none()
+    if row is None:
+        raise NoSuchObjectError(role)
+    builtin, global_acl, schema_acl = row
+
+    # Port of aclmerge: privileges are combined by grantee and grantor.
+    masks: Dict[Tuple[str, str], Tuple[int, int]] = {}
+    for acl in (builtin if global_acl is None else global_acl, schema_acl or ()):
+        for item in acl:
+            grantee, grantor, codes = _split_acl_item(item)
+            privs_mask, privswgo_mask = _acl_masks(codes)
+            held, grant_option = masks.get((grantee, grantor), (0, 0))
+            masks[grantee, grantor] = (
+                held | privs_mask | privswgo_mask,
+                grant_option | privswgo_mask,
+            )
+
+    return [
+        _privileges_from_masks(
+            grantee, grantor, held & ~grant_option, grant_option, type
+        )
+        for (grantee, grantor), (held, grant_option) in masks.items()
+        if held
+    ]
@@ -0,0 +1,261 @@
+import typing as t
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from attrs import define
+from sqlalchemy import func, select, true
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+
+from . import query as q
+from .parse import _KEYWORD_BITS, _privileges_from_masks, get_default_privileges
+from .snapshot import _check_kinds, _row_key, _scans
+from .types import ObjectKey, PgObjectType, Privileges
+
+__all__ = (
+    "OidAclInfo",
+    "OidAclItem",
+    "PUBLIC_OID",
+    "RoleMap",
+    "get_all_oid_acls",
+    "get_role_map",
+)
+
+#: The oid used for ``PUBLIC`` in ACL items.
+PUBLIC_OID = 0
+
+
+class RoleMap(Mapping):  # type: ignore[type-arg]
+    """Names of roles by oid, from :func:`get_role_map`.
+
+    Parameters:
+        names: Mapping of role oid to name.
+    """
+
+    def __init__(self, names: t.Mapping[int, str]) -> None:
+        self._names = dict(names)
+        self._oids = {name: oid for oid, name in self._names.items()}
+
+    def __getitem__(self, oid: int) -> str:
+        return self._names[oid]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def name(self, oid: int) -> str:
+        """Return the name of a role, ``'PUBLIC'`` for :data:`PUBLIC_OID`, or
+        the oid as a string for a role which doesn't exist, like PostgreSQL
+        shows dropped roles in ACLs.
+        """
+        if oid == PUBLIC_OID:
+            return "PUBLIC"
+        return self._names.get(oid, str(oid))
+
+    def oid(self, name: str) -> int:
+        """Return the oid of a role, the inverse of :meth:`name`.
+
+        Raises:
+            KeyError: if there is no role with that name.
+        """
+        if name == "PUBLIC":
+            return PUBLIC_OID
+        try:
+            return self._oids[name]
+        except KeyError:
+            if name.isdigit():
+                return int(name)
+            raise
+
+
+def get_role_map(conn: q.Connectable) -> RoleMap:
+    """Load the names of all roles.
+
+    Parameters:
+        conn: SQLAlchemy connection or ORM session.
+    """
+    stmt = select(q.pg_roles.c.oid, q.pg_roles.c.rolname)
+    return RoleMap({oid: name for oid, name in conn.execute(stmt)})
+
+
+@define(frozen=True)
+class OidAclItem:
+    """An ACL item with roles identified by oid and privileges as bit masks."""
+
+    #: Oid of the role the privileges are granted to, or :data:`PUBLIC_OID`.
+    grantee: int
+
+    #: Oid of the role which granted the privileges.
+    grantor: int
+
+    #: Privileges without grant option.
+    privs_mask: int
+
+    #: Privileges with grant option.
+    privswgo_mask: int
+
+    def privileges(
+        self,
+        roles: RoleMap,
+        type: Optional[PgObjectType] = None,
+        subname: Optional[str] = None,
+    ) -> Privileges:
+        """Return the :class:`~.types.Privileges`, like
+        :func:`~.parse.parse_acl_item`, looking up role names in `roles`.
+        """
+        return _privileges_from_masks(
+            roles.name(self.grantee),
+            roles.name(self.grantor),
+            self.privs_mask,
+            self.privswgo_mask,
+            type,
+            subname,
+        )
+
+
+@define(kw_only=True)
+class OidAclInfo:
+    """Holds the privileges of an object with roles identified by oid, as
+    queried using :func:`get_all_oid_acls`.
+    """
+
+    #: The object.
+    key: ObjectKey
+
+    #: Oid of the owner, or ``None`` for parameters.
+    owner: Optional[int]
+
+    #: Access control list.
+    acl: Optional[Tuple[OidAclItem, ...]]
+
+    def privileges(self, roles: RoleMap) -> List[Privileges]:
+        """Return the privileges, looking up role names in `roles`.
+
+        Default privileges are used if the ACL is ``None``, except for
+        columns and parameters which have no implicit privileges.
+        """
+        if self.acl is not None:
+            return [
+                item.privileges(roles, self.key.type, self.key.column)
+                for item in self.acl
+            ]
+        if self.owner is None or self.key.column is not None:
+            return []
+        return get_default_privileges(self.key.type, roles.name(self.owner))
+
+
+def get_all_oid_acls(
+    conn: q.Connectable, kinds: Optional[Iterable[str]] = None
+) -> List[OidAclInfo]:
+    """Return the owners and ACLs of all objects with roles identified by
+    oid, which stays the same when a role is renamed.
+
+    The server expands each ACL with ``aclexplode``, so only role oids are
+    transferred, not names. Equal ACL items share one :class:`OidAclItem`, so
+    the result takes less memory than that of the :mod:`.query` functions.
+    Role names are only looked up when needed, e.g. by
+    :meth:`OidAclInfo.privileges`.
+
+    .. code-block:: pycon
+
+        >>> from pg_grant.roles import get_all_oid_acls, get_role_map
+        >>> infos = get_all_oid_acls(conn, ["table"])
+        >>> infos[0].privileges(get_role_map(conn))
+        [Privileges(grantee='alice', grantor='alice', privs=['ALL'], privswgo=[])]
+
+    Parameters:
+        conn: SQLAlchemy connection or ORM session.
+        kinds: Optional. Kinds of object to include, as for
+               :func:`~.snapshot.take_snapshot`.
+    """
+    result = []
+    items: Dict[OidAclItem, OidAclItem] = {}
+
+    for kind in _check_kinds(kinds):
+        scan = _scans[kind]
+        assert scan.acl is not None
+        if scan.setup is not None:
+            scan.setup(conn)
+
+        exploded = (
+            func.aclexplode(scan.acl)
+            .table_valued(
+                "grantee",
+                "grantor",
+                "privilege_type",
+                "is_grantable",
+                with_ordinality="n",
+            )
+            .render_derived(name="a")
+        )
+        arrays = (
+            select(
+                *[
+                    func.array_agg(aggregate_order_by(c, exploded.c.n)).label(c.key)
+                    for c in exploded.c
+                    if c.key != "n"
+                ]
+            )
+            .select_from(exploded)
+            .lateral("e")
+        )
+
+        columns = [
+            c for c in scan.stmt.selected_columns if c.key not in ("owner", "acl")
+        ]
+        if scan.owner is not None:
+            columns.append(scan.owner.label("owner"))
+        columns.append(scan.acl.is_(None).label("acl_is_null"))
+
+        stmt = scan.stmt.with_only_columns(*columns, *arrays.c).join(arrays, true())
+        for row in conn.execute(stmt).mappings():
+            acl = None
+            if not row["acl_is_null"]:
+                acl = _oid_acl(
+                    items,
+                    row["grantee"] or (),
+                    row["grantor"] or (),
+                    row["privilege_type"] or (),
+                    row["is_grantable"] or (),
+                )
+
+            result.append(
+                OidAclInfo(
+                    key=_row_key(scan, t.cast("t.Mapping[str, Any]", row)),
+                    owner=row.get("owner"),
+                    acl=acl,
+                )
+            )
+
+    return result
+
+
+def _oid_acl(
+    items: Dict[OidAclItem, OidAclItem],
+    grantees: Iterable[int],
+    grantors: Iterable[int],
+    privilege_types: Iterable[str],
+    grantable: Iterable[bool],
+) -> Tuple[OidAclItem, ...]:
+    """Combine the rows of ``aclexplode`` into ACL items, in order.
+
+    Unknown privilege types, e.g. from a newer server, are ignored.
+    """
+    masks: Dict[Tuple[int, int], Tuple[int, int]] = {}
+    for grantee, grantor, keyword, is_grantable in zip(
+        grantees, grantors, privilege_types, grantable
+    ):
+        privs_mask, privswgo_mask = masks.get((grantee, grantor), (0, 0))
+        bit = _KEYWORD_BITS.get(keyword, 0)
+        if is_grantable:
+            privswgo_mask |= bit
+        else:
+            privs_mask |= bit
+        masks[grantee, grantor] = privs_mask, privswgo_mask
+
+    acl = []
+    for (grantee, grantor), (privs_mask, privswgo_mask) in masks.items():
+        item = OidAclItem(grantee, grantor, privs_mask, privswgo_mask)
+        acl.append(items.setdefault(item, item))
+    return tuple(acl)
@@ -0,0 +1,520 @@
+import typing as t
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
+
+from attrs import Factory, define
+from sqlalchemy import (
+    ColumnElement,
+    Select,
+    Text,
+    any_,
+    cast,
+    func,
+    literal,
+    literal_column,
+    null,
+    select,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, OID, aggregate_order_by
+
+from . import query as q
+from .types import (
+    ColumnInfo,
+    FunctionInfo,
+    ObjectKey,
+    ParameterInfo,
+    PgObjectType,
+    RelationInfo,
+    SchemaRelationInfo,
+)
+
+__all__ = (
+    "AclSnapshot",
+    "DEFAULT_KINDS",
+    "ObjectChange",
+    "compare_fingerprints",
+    "get_acl_fingerprints",
+    "get_acl_summary",
+    "take_snapshot",
+)
+
+AnyInfo = Union[RelationInfo, ColumnInfo, ParameterInfo]
+
+
+def _version(*columns: ColumnElement[Any]) -> ColumnElement[str]:
+    """Combine the xmin of catalog rows into a version string, which changes
+    whenever one of the rows is updated.
+    """
+    if len(columns) == 1:
+        return cast(columns[0], Text)
+    return func.concat_ws(":", *[cast(c, Text) for c in columns])
+
+
+@define(frozen=True)
+class _Scan:
+    """How to scan one kind of object for a snapshot."""
+
+    type: PgObjectType
+    info: Type[Any]
+    stmt: Select[Any]
+    # Catalog columns identifying a row, matching `key` for the info objects.
+    ident: Tuple[ColumnElement[Any], ...]
+    key: Callable[[Any], Hashable]
+    version: ColumnElement[str]
+    # Column to filter on when fetching changed rows, and how to get its value
+    # from the identifier.
+    fetch_column: ColumnElement[Any]
+    fetch_value: Callable[[Hashable], int] = lambda ident: t.cast(int, ident)
+    setup: Optional[Callable[[q.Connectable], None]] = None
+    # Catalog column with the owner's oid, if the object has an owner.
+    owner: Optional[ColumnElement[Any]] = None
+    # Catalog column with the ACL, as aclitem[].
+    acl: Optional[ColumnElement[Any]] = None
+
+
+def _oid_key(info: Any) -> Hashable:
+    return t.cast(Hashable, info.oid)
+
+
+_scans: Dict[str, _Scan] = {
+    "table": _Scan(
+        PgObjectType.TABLE,
+        SchemaRelationInfo,
+        q._table_stmt(),
+        (q.pg_class.c.oid,),
+        _oid_key,
+        _version(q.pg_class.c.xmin, q.pg_namespace.c.xmin),
+        q.pg_class.c.oid,
+        owner=q.pg_class.c.relowner,
+        acl=q.pg_class.c.relacl,
+    ),
+    "column": _Scan(
+        PgObjectType.TABLE,
+        ColumnInfo,
+        q._pg_attribute_stmt,
+        (q.pg_attribute.c.attrelid, q.pg_attribute.c.attname),
+        lambda info: (info.table_oid, info.column),
+        _version(q.pg_attribute.c.xmin, q.pg_class.c.xmin, q.pg_namespace.c.xmin),
+        q.pg_attribute.c.attrelid,
+        lambda ident: t.cast(Tuple[int, str], ident)[0],
+        owner=q.pg_class.c.relowner,
+        acl=q.pg_attribute.c.attacl,
+    ),
+    "sequence": _Scan(
+        PgObjectType.SEQUENCE,
+        SchemaRelationInfo,
+        q._sequence_stmt(),
+        (q.pg_class.c.oid,),
+        _oid_key,
+        _version(q.pg_class.c.xmin, q.pg_namespace.c.xmin),
+        q.pg_class.c.oid,
+        owner=q.pg_class.c.relowner,
+        acl=q.pg_class.c.relacl,
+    ),
+    "function": _Scan(
+        PgObjectType.FUNCTION,
+        FunctionInfo,
+        q._filter_pg_proc_stmt(),
+        (q.pg_proc.c.oid,),
+        _oid_key,
+        _version(q.pg_proc.c.xmin, q.pg_namespace.c.xmin),
+        q.pg_proc.c.oid,
+        setup=q._make_canonical_type_function,
+        owner=q.pg_proc.c.proowner,
+        acl=q.pg_proc.c.proacl,
+    ),
+    "language": _Scan(
+        PgObjectType.LANGUAGE,
+        RelationInfo,
+        q._pg_lang_stmt,
+        (q.pg_language.c.oid,),
+        _oid_key,
+        _version(q.pg_language.c.xmin),
+        q.pg_language.c.oid,
+        owner=q.pg_language.c.lanowner,
+        acl=q.pg_language.c.lanacl,
+    ),
+    "schema": _Scan(
+        PgObjectType.SCHEMA,
+        RelationInfo,
+        q._pg_schema_stmt,
+        (q.pg_namespace.c.oid,),
+        _oid_key,
+        _version(q.pg_namespace.c.xmin),
+        q.pg_namespace.c.oid,
+        owner=q.pg_namespace.c.nspowner,
+        acl=q.pg_namespace.c.nspacl,
+    ),
+    "database": _Scan(
+        PgObjectType.DATABASE,
+        RelationInfo,
+        q._pg_db_stmt,
+        (q.pg_database.c.oid,),
+        _oid_key,
+        _version(q.pg_database.c.xmin),
+        q.pg_database.c.oid,
+        owner=q.pg_database.c.datdba,
+        acl=q.pg_database.c.datacl,
+    ),
+    "tablespace": _Scan(
+        PgObjectType.TABLESPACE,
+        RelationInfo,
+        q._pg_tablespace_stmt,
+        (q.pg_tablespace.c.oid,),
+        _oid_key,
+        _version(q.pg_tablespace.c.xmin),
+        q.pg_tablespace.c.oid,
+        owner=q.pg_tablespace.c.spcowner,
+        acl=q.pg_tablespace.c.spcacl,
+    ),
+    "type": _Scan(
+        PgObjectType.TYPE,
+        SchemaRelationInfo,
+        q._filter_pg_type_stmt(domain=False),
+        (q.pg_type.c.oid,),
+        _oid_key,
+        _version(q.pg_type.c.xmin, q.pg_namespace.c.xmin),
+        q.pg_type.c.oid,
+        owner=q.pg_type.c.typowner,
+        acl=q.pg_type.c.typacl,
+    ),
+    "domain": _Scan(
+        PgObjectType.DOMAIN,
+        SchemaRelationInfo,
+        q._filter_pg_type_stmt(domain=True),
+        (q.pg_type.c.oid,),
+        _oid_key,
+        _version(q.pg_type.c.xmin, q.pg_namespace.c.xmin),
+        q.pg_type.c.oid,
+        owner=q.pg_type.c.typowner,
+        acl=q.pg_type.c.typacl,
+    ),
+    "foreign_data_wrapper": _Scan(
+        PgObjectType.FOREIGN_DATA_WRAPPER,
+        RelationInfo,
+        q._pg_fdw_stmt,
+        (q.pg_foreign_data_wrapper.c.oid,),
+        _oid_key,
+        _version(q.pg_foreign_data_wrapper.c.xmin),
+        q.pg_foreign_data_wrapper.c.oid,
+        owner=q.pg_foreign_data_wrapper.c.fdwowner,
+        acl=q.pg_foreign_data_wrapper.c.fdwacl,
+    ),
+    "foreign_server": _Scan(
+        PgObjectType.FOREIGN_SERVER,
+        RelationInfo,
+        q._pg_server_stmt,
+        (q.pg_foreign_server.c.oid,),
+        _oid_key,
+        _version(q.pg_foreign_server.c.xmin),
+        q.pg_foreign_server.c.oid,
+        owner=q.pg_foreign_server.c.srvowner,
+        acl=q.pg_foreign_server.c.srvacl,
+    ),
+    "parameter": _Scan(
+        PgObjectType.PARAMETER,
+        ParameterInfo,
+        q._pg_parameter_stmt,
+        (q.pg_parameter_acl.c.oid,),
+        _oid_key,
+        _version(q.pg_parameter_acl.c.xmin),
+        q.pg_parameter_acl.c.oid,
+        acl=q.pg_parameter_acl.c.paracl,
+    ),
+}
+
+#: Kinds of object included in a snapshot by default. ``'parameter'`` is
+#: excluded because it requires PostgreSQL 15 or later.
+DEFAULT_KINDS = tuple(kind for kind in _scans if kind != "parameter")
+
+
+@define
+class ObjectChange:
+    """An object which was added, changed, or removed between snapshots."""
+
+    #: Kind of object, e.g. ``'table'`` or ``'column'``.
+    kind: str
+
+    #: The object in the previous snapshot, or ``None`` if it was added.
+    old: Optional[AnyInfo]
+
+    #: The object in the new snapshot, or ``None`` if it was removed.
+    new: Optional[AnyInfo]
+
+    @property
+    def key(self) -> ObjectKey:
+        """Key of the object, for use with :mod:`.diff` or :mod:`.index`."""
+        info = self.new if self.new is not None else self.old
+        assert info is not None
+        return ObjectKey.from_info(_scans[self.kind].type, info)
+
+
+# Objects of one kind by identifier, with the version of their catalog rows.
+_Entries = Dict[Hashable, Tuple[str, AnyInfo]]
+
+
+def _ident(row: Sequence[Any]) -> Hashable:
+    return row[0] if len(row) == 1 else tuple(row)
+
+
+@define
+class AclSnapshot:
+    """ACLs of database objects, which can be refreshed by fetching only the
+    objects whose catalog rows changed since the snapshot was taken.
+
+    Changes are detected using the ``xmin`` system column of the catalog rows,
+    which changes whenever a row is updated, e.g. by ``GRANT``, ``REVOKE``,
+    ``ALTER ... OWNER TO`` or ``ALTER ... RENAME``. Objects are also fetched
+    again when their schema (or table, for columns) changes. Renaming the
+    owner role isn't detected, since role rows aren't readable by everyone.
+
+    .. seealso:: :func:`take_snapshot`
+    """
+
+    #: Kinds of object in the snapshot.
+    kinds: Tuple[str, ...]
+
+    _entries: Dict[str, _Entries] = Factory(dict)
+
+    def infos(self, kind: str) -> List[AnyInfo]:
+        """Return the objects of `kind` in the snapshot, like the matching
+        ``get_all_*`` function of :mod:`.query`.
+        """
+        if kind not in self.kinds:
+            raise ValueError(f"Kind not in snapshot: {kind}")
+        return [info for _, info in self._entries.get(kind, {}).values()]
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+    def refresh(self, conn: q.Connectable) -> List[ObjectChange]:
+        """Update the snapshot in place and return the objects which were
+        added, changed, or removed since it was taken or last refreshed.
+
+        Only the identifier and version of each catalog row are read, plus the
+        full rows of new and updated objects. An object whose catalog rows
+        were updated without changing its ACL, name, or owner is not returned.
+        """
+        changes: List[ObjectChange] = []
+        for kind in self.kinds:
+            changes.extend(self._refresh_kind(conn, kind))
+        return changes
+
+    def _refresh_kind(self, conn: q.Connectable, kind: str) -> List[ObjectChange]:
+        scan = _scans[kind]
+        entries = self._entries.setdefault(kind, {})
+
+        light = scan.stmt.with_only_columns(*scan.ident, scan.version)
+        versions = {_ident(row[:-1]): row[-1] for row in conn.execute(light)}
+
+        changes = [
+            ObjectChange(kind, info, None)
+            for ident, (_, info) in entries.items()
+            if ident not in versions
+        ]
+        for ident in [ident for ident in entries if ident not in versions]:
+            del entries[ident]
+
+        stale = {
+            ident
+            for ident, version in versions.items()
+            if ident not in entries or entries[ident][0] != version
+        }
+        if not stale:
+            return changes
+
+        for ident, version, info in _fetch(conn, scan, stale):
+            if ident not in stale:
+                continue
+            stale.discard(ident)
+
+            previous = entries.get(ident)
+            entries[ident] = version, info
+            if previous is None:
+                changes.append(ObjectChange(kind, None, info))
+            elif previous[1] != info:
+                changes.append(ObjectChange(kind, previous[1], info))
+
+        # Anything left was dropped after the versions were read.
+        for ident in stale:
+            previous = entries.pop(ident, None)
+            if previous is not None:
+                changes.append(ObjectChange(kind, previous[1], None))
+
+        return changes
+
+
+def _fetch(
+    conn: q.Connectable, scan: _Scan, idents: Iterable[Hashable]
+) -> Iterable[Tuple[Hashable, str, AnyInfo]]:
+    """Fetch the full rows for `idents`, with their current version."""
+    if scan.setup is not None:
+        scan.setup(conn)
+
+    values: Set[int] = {scan.fetch_value(ident) for ident in idents}
+    stmt = scan.stmt.add_columns(scan.version.label("_version")).where(
+        scan.fetch_column == any_(literal(sorted(values), ARRAY(OID)))
+    )
+
+    for row in conn.execute(stmt).mappings():
+        data = dict(row)
+        version = data.pop("_version")
+        info = scan.info(**data, type=scan.type)
+        yield scan.key(info), version, info
+
+
+def _check_kinds(kinds: Optional[Iterable[str]]) -> Tuple[str, ...]:
+    kinds = DEFAULT_KINDS if kinds is None else tuple(kinds)
+    for kind in kinds:
+        if kind not in _scans:
+            raise ValueError(f"Unknown kind: {kind}")
+    return kinds
+
+
+def take_snapshot(
+    conn: q.Connectable, kinds: Optional[Iterable[str]] = None
+) -> AclSnapshot:
+    """Take a snapshot of the ACLs of database objects. Use
+    :meth:`AclSnapshot.refresh` to find what changed later.
+
+    Parameters:
+        conn: SQLAlchemy connection or ORM session.
+        kinds: Optional. Kinds of object to include, from ``'table'``,
+               ``'column'``, ``'sequence'``, ``'function'``, ``'language'``,
+               ``'schema'``, ``'database'``, ``'tablespace'``, ``'type'``,
+               ``'domain'``, ``'foreign_data_wrapper'``, ``'foreign_server'``,
+               and ``'parameter'``. By default, :data:`DEFAULT_KINDS`.
+    """
+    snapshot = AclSnapshot(_check_kinds(kinds))
+    snapshot.refresh(conn)
+    return snapshot
+
+
+# Columns which identify an object across databases, unlike its oid.
+_non_identity_columns = {"oid", "table_oid", "owner", "acl"}
+
+
+def _fingerprint(scan: _Scan) -> ColumnElement[str]:
+    """Text of the owner and ACL of an object, which the server hashes."""
+    cols = scan.stmt.selected_columns
+    parts = [cols[name] for name in ("owner", "acl") if name in cols]
+    return func.concat_ws(":", *[cast(c, Text) for c in parts])
+
+
+def _row_key(scan: _Scan, row: Mapping[str, Any]) -> ObjectKey:
+    return ObjectKey(
+        type=scan.type,
+        name=row["table"] if "table" in row else row["name"],
+        schema=row.get("schema"),
+        arg_types=row.get("arg_types"),
+        column=row.get("column"),
+        oid=row["table_oid"] if "table_oid" in row else row["oid"],
+    )
+
+
+def get_acl_fingerprints(
+    conn: q.Connectable, kinds: Optional[Iterable[str]] = None
+) -> Dict[ObjectKey, str]:
+    """Return a hash of the owner and ACL of each object, computed by the
+    server, so that objects can be compared without transferring or parsing
+    their ACLs.
+
+    Keys compare equal by name (see :class:`.ObjectKey`), so the result for
+    one database can be compared with that of another using
+    :func:`compare_fingerprints`. Then, only the objects whose hash differs
+    need to be fetched with :mod:`.query`.
+
+    Parameters:
+        conn: SQLAlchemy connection or ORM session.
+        kinds: Optional. Kinds of object to include, as for
+               :func:`take_snapshot`.
+    """
+    result = {}
+
+    for kind in _check_kinds(kinds):
+        scan = _scans[kind]
+        if scan.setup is not None:
+            scan.setup(conn)
+
+        cols = scan.stmt.selected_columns
+        stmt = scan.stmt.with_only_columns(
+            *[c for c in cols if c.key != "owner" and c.key != "acl"],
+            func.md5(_fingerprint(scan)).label("_hash"),
+        )
+        for row in conn.execute(stmt).mappings():
+            result[_row_key(scan, t.cast("Mapping[str, Any]", row))] = row["_hash"]
+
+    return result
+
+
+def get_acl_summary(
+    conn: q.Connectable, kinds: Optional[Iterable[str]] = None
+) -> Dict[Tuple[str, Optional[str]], str]:
+    """Return a hash of the names, owners, and ACLs of all objects of each
+    kind in each schema. Objects without a schema (e.g. languages) are under
+    ``None``.
+
+    Comparing the summaries of two databases shows which kinds and schemas
+    differ, which can then be compared using :func:`get_acl_fingerprints`.
+
+    Parameters:
+        conn: SQLAlchemy connection or ORM session.
+        kinds: Optional. Kinds of object to include, as for
+               :func:`take_snapshot`.
+
+    Returns:
+        Dictionary of hashes by ``(kind, schema)``.
+    """
+    result = {}
+
+    for kind in _check_kinds(kinds):
+        scan = _scans[kind]
+        if scan.setup is not None:
+            scan.setup(conn)
+
+        cols = scan.stmt.selected_columns
+        identity = [c for c in cols if c.key not in _non_identity_columns]
+        row_text = func.concat_ws(
+            ":", *[cast(c, Text) for c in identity], _fingerprint(scan)
+        )
+        schema = cols["schema"] if "schema" in cols else null()
+        rows = scan.stmt.with_only_columns(
+            schema.label("schema"), row_text.label("row")
+        ).subquery()
+
+        stmt = select(
+            rows.c.schema,
+            func.md5(
+                func.string_agg(
+                    rows.c.row, aggregate_order_by(literal_column("','"), rows.c.row)
+                )
+            ),
+        ).group_by(rows.c.schema)
+
+        for schema_name, digest in conn.execute(stmt):
+            result[kind, schema_name] = digest
+
+    return result
+
+
+def compare_fingerprints(
+    a: Mapping[Hashable, str], b: Mapping[Hashable, str]
+) -> Set[Any]:
+    """Return the keys whose hash differs between two results of
+    :func:`get_acl_fingerprints` or :func:`get_acl_summary`, including those
+    that are only in one of them.
+    """
+    return {key for key in a.keys() | b.keys() if a.get(key) != b.get(key)}
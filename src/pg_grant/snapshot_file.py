@@ -0,0 +1,478 @@
+import hashlib
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+from collections.abc import Mapping
+from types import TracebackType
+from typing import (
+    IO,
+    Any,
+    BinaryIO,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
+
+from .parse import (
+    _acl_masks,
+    _privileges_from_masks,
+    _split_acl_item,
+    get_default_privileges,
+)
+from .snapshot import AclSnapshot, _scans
+from .types import (
+    ColumnInfo,
+    ObjectKey,
+    ParameterInfo,
+    PgObjectType,
+    Privileges,
+    RelationInfo,
+)
+
+__all__ = (
+    "SnapshotFile",
+    "SnapshotWriter",
+)
+
+AnyInfo = Union[RelationInfo, ColumnInfo, ParameterInfo]
+StrPath = Union[str, "os.PathLike[str]"]
+
+_MAGIC = b"PGGRANT\x00"
+_VERSION = 1
+
+# magic, version, reserved, string count, object count, entry count, and the
+# offsets of the objects, entries, string offsets, string data, and index.
+_header = struct.Struct("<8sHHIIIQQQQQ")
+
+# type, flags, reserved, name, schema, column, arg_types, owner, oid, first
+# entry, entry count. Names are indices in the string table.
+_object = struct.Struct("<BBHIIIIIIII")
+
+# grantee, grantor, privileges mask, privileges with grant option mask
+_entry = struct.Struct("<IIHH")
+
+# key hash, object number
+_index = struct.Struct("<QI")
+
+_NONE = 0xFFFFFFFF
+_FLAG_DEFAULT_ACL = 1
+
+_types = list(PgObjectType)
+_type_ids = {type: i for i, type in enumerate(_types)}
+
+# Separates function argument types in the string table.
+_ARG_SEP = "\x1f"
+
+
+def _key_hash(key: ObjectKey) -> int:
+    parts = [
+        key.type.value,
+        key.name,
+        "\x00" if key.schema is None else key.schema,
+        "\x00" if key.arg_types is None else _ARG_SEP.join(key.arg_types),
+        "\x00" if key.column is None else key.column,
+    ]
+    digest = hashlib.blake2b("\x1e".join(parts).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class SnapshotWriter:
+    """Write the ACLs of many objects to a compact file, which can be opened
+    quickly with :class:`SnapshotFile`.
+
+    Objects and ACL entries are written as they are added. Names and roles are
+    stored once, in a string table, and privileges as bit masks. Only the
+    string table and an index entry per object are kept in memory.
+
+    .. code-block:: pycon
+
+        >>> from pg_grant import PgObjectType
+        >>> from pg_grant import query as q
+        >>> from pg_grant.snapshot_file import SnapshotWriter
+        >>> with SnapshotWriter("acls.snapshot") as writer:
+        ...     writer.add_infos(PgObjectType.TABLE, q.get_all_table_acls(conn))
+
+    Parameters:
+        path: Path of the file to write.
+    """
+
+    def __init__(self, path: StrPath) -> None:
+        self._path = path
+        self._fp: BinaryIO = open(path, "wb")
+        self._objects: IO[bytes] = tempfile.TemporaryFile()
+        self._strings: Dict[str, int] = {}
+        # The first object number for each key hash, and any other objects
+        # whose keys have the same hash.
+        self._hashes: Dict[int, int] = {}
+        self._collisions: List[Tuple[int, int]] = []
+        self._object_count = 0
+        self._entry_count = 0
+        self._item_cache: Dict[str, Tuple[int, int, int, int]] = {}
+        self._closed = False
+
+        # The header is written when the file is closed.
+        self._fp.write(bytes(_header.size))
+
+    def __enter__(self) -> "SnapshotWriter":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._abort()
+
+    def _string(self, value: Optional[str]) -> int:
+        if value is None:
+            return _NONE
+        string_id = self._strings.get(value)
+        if string_id is None:
+            string_id = self._strings[value] = len(self._strings)
+        return string_id
+
+    def add(
+        self, key: ObjectKey, acl: Optional[Sequence[str]], *, owner: Optional[str]
+    ) -> None:
+        """Add the ACL of a single object.
+
+        If `acl` is ``None``, the object has default privileges, which are
+        computed from `owner` when the file is read.
+
+        Raises:
+            ValueError: if the object was already added.
+        """
+        if self._closed:
+            raise ValueError("Snapshot file is closed.")
+
+        arg_types = None if key.arg_types is None else _ARG_SEP.join(key.arg_types)
+        fields = (
+            _type_ids[key.type],
+            self._string(key.name),
+            self._string(key.schema),
+            self._string(key.column),
+            self._string(arg_types),
+        )
+
+        key_hash = _key_hash(key)
+        number = self._object_count
+        first = self._hashes.setdefault(key_hash, number)
+        if first != number:
+            numbers = [first, *(n for h, n in self._collisions if h == key_hash)]
+            if any(self._key_fields(n) == fields for n in numbers):
+                raise ValueError(f"Object already in snapshot: {key!r}")
+            self._collisions.append((key_hash, number))
+
+        first_entry = self._entry_count
+        cache = self._item_cache
+
+        for item in acl or ():
+            parsed = cache.get(item)
+            if parsed is None:
+                grantee, grantor, codes = _split_acl_item(item)
+                parsed = cache[item] = (
+                    self._string(grantee),
+                    self._string(grantor),
+                    *_acl_masks(codes),
+                )
+            self._fp.write(_entry.pack(*parsed))
+            self._entry_count += 1
+
+        type_id, name, schema, column, str_arg_types = fields
+        self._object_count += 1
+        self._objects.write(
+            _object.pack(
+                type_id,
+                _FLAG_DEFAULT_ACL if acl is None else 0,
+                0,
+                name,
+                schema,
+                column,
+                str_arg_types,
+                self._string(owner),
+                key.oid or 0,
+                first_entry,
+                self._entry_count - first_entry,
+            )
+        )
+
+    def _key_fields(self, number: int) -> Tuple[int, ...]:
+        """Read back the type and string ids of an object's key."""
+        objects = self._objects
+        objects.seek(number * _object.size)
+        record = _object.unpack(objects.read(_object.size))
+        objects.seek(0, os.SEEK_END)
+        return (record[0], *record[3:7])
+
+    def add_infos(self, type: PgObjectType, infos: Iterable[AnyInfo]) -> None:
+        """Add the results of a :mod:`.query` function.
+
+        Parameters:
+            type: The object type, e.g. :attr:`.PgObjectType.TABLE` for the
+                  results of :func:`~.query.get_all_table_acls` or
+                  :func:`~.query.get_all_column_acls`.
+            infos: Objects with ``acl`` attributes.
+        """
+        for info in infos:
+            owner = None if isinstance(info, ParameterInfo) else info.owner
+            self.add(ObjectKey.from_info(type, info), info.acl, owner=owner)
+
+    def add_snapshot(self, snapshot: AclSnapshot) -> None:
+        """Add every object in an :class:`~.snapshot.AclSnapshot`."""
+        for kind in snapshot.kinds:
+            self.add_infos(_scans[kind].type, snapshot.infos(kind))
+
+    def close(self) -> None:
+        """Finish writing the file."""
+        if self._closed:
+            return
+        self._closed = True
+
+        fp = self._fp
+        try:
+            off_objects = fp.tell()
+            self._objects.seek(0)
+            shutil.copyfileobj(self._objects, fp)
+            self._objects.close()
+
+            off_entries = _header.size
+
+            off_string_offsets = fp.tell()
+            data = [s.encode() for s in self._strings]
+            offset = 0
+            for encoded in data:
+                fp.write(struct.pack("<Q", offset))
+                offset += len(encoded)
+            fp.write(struct.pack("<Q", offset))
+
+            off_string_data = fp.tell()
+            for encoded in data:
+                fp.write(encoded)
+
+            off_index = fp.tell()
+            index = sorted([*self._hashes.items(), *self._collisions])
+            for record in index:
+                fp.write(_index.pack(*record))
+
+            fp.seek(0)
+            fp.write(
+                _header.pack(
+                    _MAGIC,
+                    _VERSION,
+                    0,
+                    len(data),
+                    self._object_count,
+                    self._entry_count,
+                    off_objects,
+                    off_entries,
+                    off_string_offsets,
+                    off_string_data,
+                    off_index,
+                )
+            )
+        finally:
+            fp.close()
+
+    def _abort(self) -> None:
+        self._closed = True
+        self._objects.close()
+        self._fp.close()
+        os.unlink(self._path)
+
+
+class SnapshotFile(Mapping):  # type: ignore[type-arg]
+    """A file written by :class:`SnapshotWriter`, opened with :mod:`mmap` so
+    that opening it is fast regardless of its size. Objects are only read when
+    they are accessed.
+
+    This is a mapping of :class:`~.types.ObjectKey` to lists of
+    :class:`~.types.Privileges`, like the result of
+    :func:`~.diff.privileges_by_key`, so it can be used with
+    :func:`~.diff.diff_acls`. Default privileges are returned for objects
+    without an ACL, except for columns and parameters.
+
+    .. code-block:: pycon
+
+        >>> from pg_grant.snapshot_file import SnapshotFile
+        >>> with SnapshotFile("acls.snapshot") as snapshot:
+        ...     snapshot[key]
+        [Privileges(grantee='alice', grantor='alice', privs=['ALL'], privswgo=[])]
+
+    Parameters:
+        path: Path of the file to open.
+
+    Raises:
+        ValueError: if the file isn't a snapshot file.
+    """
+
+    def __init__(self, path: StrPath) -> None:
+        with open(path, "rb") as fp:
+            size = os.fstat(fp.fileno()).st_size
+            if size < _header.size:
+                raise ValueError("Not a snapshot file.")
+            self._mmap = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (
+            magic,
+            version,
+            _,
+            self._string_count,
+            self._object_count,
+            _,
+            self._off_objects,
+            self._off_entries,
+            self._off_string_offsets,
+            self._off_string_data,
+            self._off_index,
+        ) = _header.unpack_from(self._mmap)
+
+        if magic != _MAGIC:
+            self._mmap.close()
+            raise ValueError("Not a snapshot file.")
+        if version != _VERSION:
+            self._mmap.close()
+            raise ValueError(f"Unsupported snapshot file version: {version}")
+
+        self._string_cache: Dict[int, str] = {}
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def __enter__(self) -> "SnapshotFile":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _string(self, string_id: int) -> Optional[str]:
+        if string_id == _NONE:
+            return None
+        value = self._string_cache.get(string_id)
+        if value is None:
+            start, end = struct.unpack_from(
+                "<QQ", self._mmap, self._off_string_offsets + string_id * 8
+            )
+            offset = self._off_string_data
+            value = self._string_cache[string_id] = self._mmap[
+                offset + start : offset + end
+            ].decode()
+        return value
+
+    def _record(self, i: int) -> Tuple[int, ...]:
+        return _object.unpack_from(self._mmap, self._off_objects + i * _object.size)
+
+    def _key(self, record: Tuple[int, ...]) -> ObjectKey:
+        type_id, _, _, name, schema, column, arg_types, _, oid = record[:9]
+        str_arg_types = self._string(arg_types)
+        return ObjectKey(
+            type=_types[type_id],
+            name=self._string(name),  # type: ignore[arg-type]
+            schema=self._string(schema),
+            column=self._string(column),
+            arg_types=(
+                None
+                if str_arg_types is None
+                else str_arg_types.split(_ARG_SEP)
+                if str_arg_types
+                else ()
+            ),
+            oid=oid or None,
+        )
+
+    def _find(self, key: ObjectKey) -> Tuple[int, ...]:
+        key_hash = _key_hash(key)
+        lo, hi = 0, self._object_count
+        base = self._off_index
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if _index.unpack_from(self._mmap, base + mid * _index.size)[0] < key_hash:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        for i in range(lo, self._object_count):
+            found_hash, number = _index.unpack_from(self._mmap, base + i * _index.size)
+            if found_hash != key_hash:
+                break
+            record = self._record(number)
+            if self._key(record) == key:
+                return record
+
+        raise KeyError(key)
+
+    def __len__(self) -> int:
+        return self._object_count  # type: ignore[no-any-return]
+
+    def __iter__(self) -> Iterator[ObjectKey]:
+        for i in range(self._object_count):
+            yield self._key(self._record(i))
+
+    def __getitem__(self, key: ObjectKey) -> List[Privileges]:
+        return self._privileges(key, self._find(key))
+
+    def items(  # type: ignore[override]
+        self,
+    ) -> Iterator[Tuple[ObjectKey, List[Privileges]]]:
+        """Iterate over the objects and their privileges, in the order they
+        were written.
+        """
+        for i in range(self._object_count):
+            record = self._record(i)
+            key = self._key(record)
+            yield key, self._privileges(key, record)
+
+    def owner(self, key: ObjectKey) -> Optional[str]:
+        """Return the owner of an object.
+
+        Raises:
+            KeyError: if the object is not in the file.
+        """
+        return self._string(self._find(key)[7])
+
+    def _privileges(self, key: ObjectKey, record: Tuple[int, ...]) -> List[Privileges]:
+        flags, owner, first_entry, entry_count = (
+            record[1],
+            record[7],
+            record[9],
+            record[10],
+        )
+
+        if flags & _FLAG_DEFAULT_ACL:
+            str_owner = self._string(owner)
+            if (
+                str_owner is None
+                or key.column is not None
+                or key.type is PgObjectType.PARAMETER
+            ):
+                return []
+            return get_default_privileges(key.type, str_owner)
+
+        result = []
+        offset = self._off_entries + first_entry * _entry.size
+        for i in range(entry_count):
+            grantee, grantor, privs, privswgo = _entry.unpack_from(
+                self._mmap, offset + i * _entry.size
+            )
+            result.append(
+                _privileges_from_masks(
+                    self._string(grantee),  # type: ignore[arg-type]
+                    self._string(grantor),  # type: ignore[arg-type]
+                    privs,
+                    privswgo,
+                    key.type,
+                    key.column,
+                )
+            )
+        return result
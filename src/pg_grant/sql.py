@@ -1,14 +1,32 @@
 import re
 import sys
-from typing import Any, ClassVar, List, Literal, Optional, Tuple, Union, cast, overload
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    NamedTuple,
+    Optional,
+    TextIO,
+    Tuple,
+    Union,
+    cast,
+    overload,
+)
 
 from sqlalchemy import FromClause, Sequence, inspect
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.sql.compiler import SQLCompiler
 from sqlalchemy.sql.expression import ClauseElement, Executable
+from sqlalchemy.sql.visitors import InternalTraversal
 
 from ._typing_sqlalchemy import AnyTarget, ArgTypesInput, TableTarget
-from .types import PgObjectType
+from .types import ObjectKey, PgObjectType, Privileges
 
 if sys.version_info >= (3, 10):
     from typing import TypeAlias
@@ -17,7 +35,11 @@ else:
 
 __all__ = (
     "grant",
+    "iter_privilege_sql",
+    "render_grant",
+    "render_revoke",
     "revoke",
+    "write_script",
 )
 
 _re_valid_priv = re.compile(
@@ -26,6 +48,17 @@ _re_valid_priv = re.compile(
 )
 
 
+@lru_cache(maxsize=1024)
+def _split_privilege(priv: str) -> Tuple[str, Optional[str]]:
+    """Split a privilege into its keyword and subname, e.g. ``'SELECT (user)'``
+    into ``('SELECT', 'user')``.
+    """
+    match = _re_valid_priv.match(priv)
+    if match is None:
+        raise ValueError(f"Privilege not valid: {priv}")
+    return match.group(1), match.group(2)
+
+
 def _as_table(element: Any) -> FromClause:
     """Allow a Table or ORM model to be used as a table name."""
     insp = inspect(element, raiseerr=False)
@@ -41,17 +74,51 @@ def _as_table(element: Any) -> FromClause:
 PrivilegesInput: TypeAlias = Union[List[str], Tuple[str], Literal["ALL"]]
 
 
+class _Target(NamedTuple):
+    target: AnyTarget
+    schema: Optional[str]
+    arg_types: Optional[Tuple[str, ...]]
+
+
+# Object types which may be used with ON ALL ... IN SCHEMA. ALL FUNCTIONS
+# skips procedures, which are also of type FUNCTION here, so use ROUTINES.
+_in_schema_keywords = {
+    PgObjectType.TABLE: "TABLES",
+    PgObjectType.SEQUENCE: "SEQUENCES",
+    PgObjectType.FUNCTION: "ROUTINES",
+}
+
+# The PostgreSQL dialect for SQL that isn't formatted by a driver, e.g. str()
+# and scripts. Drivers with the "pyformat" paramstyle (the default) need
+# percent signs in identifiers to be doubled, which would otherwise change
+# the name of the object.
+_pg_dialect = postgresql.dialect(paramstyle="named")  # type: ignore[no-untyped-call]
+_pg_preparer = _pg_dialect.identifier_preparer
+
+
 class _GrantRevoke(Executable, ClauseElement):
     keyword: ClassVar[Optional[str]] = None
 
+    # The attributes are all hashable, so they can be part of the cache key
+    # directly. This lets SQLAlchemy reuse compiled statements.
+    _traverse_internals = [
+        ("_privileges", InternalTraversal.dp_plain_obj),
+        ("_priv_type", InternalTraversal.dp_plain_obj),
+        ("_targets", InternalTraversal.dp_plain_obj),
+        ("_grantees", InternalTraversal.dp_plain_obj),
+        ("_grant_option", InternalTraversal.dp_boolean),
+        ("_quote_subname", InternalTraversal.dp_boolean),
+        ("_in_schema", InternalTraversal.dp_boolean),
+    ]
+
     _privileges: Tuple[str, ...]
     _priv_type: PgObjectType
-    _target: AnyTarget
-    _grantee: str
+    _targets: Tuple[_Target, ...]
+    _grantees: Tuple[str, ...]
     _grant_option: bool
-    _schema: Optional[str]
-    _arg_types: Optional[Tuple[str, ...]]
     _quote_subname: bool
+    # When True, _targets holds schema names for ON ALL ... IN SCHEMA
+    _in_schema: bool
 
     def __init__(
         self,
@@ -70,119 +137,292 @@ class _GrantRevoke(Executable, ClauseElement):
 
         self._privileges = tuple(privileges)
         self._priv_type = type
-        self._target = target
-        self._grantee = grantee
+        self._targets = (
+            _Target(target, schema, None if arg_types is None else tuple(arg_types)),
+        )
+        self._grantees = (grantee,)
+        self._grant_option = grant_option
+        self._quote_subname = quote_subname
+        self._in_schema = False
+
+    @classmethod
+    def _coalesced(
+        cls,
+        privileges: Tuple[str, ...],
+        type: PgObjectType,
+        targets: Tuple[_Target, ...],
+        grantees: Tuple[str, ...],
+        *,
+        grant_option: bool,
+        quote_subname: bool,
+        in_schema: bool = False,
+    ) -> "_GrantRevoke":
+        """Create a statement for several targets and grantees at once.
+
+        If `in_schema` is true, the targets are schema names and the statement
+        applies to all objects of `type` in them.
+        """
+        if in_schema and type not in _in_schema_keywords:
+            raise ValueError(f"Type not supported with ALL IN SCHEMA: {type}")
+
+        self = cls.__new__(cls)
+        self._privileges = privileges
+        self._priv_type = type
+        self._targets = targets
+        self._grantees = grantees
         self._grant_option = grant_option
-        self._schema = schema
-        self._arg_types = None if arg_types is None else tuple(arg_types)
         self._quote_subname = quote_subname
+        self._in_schema = in_schema
+        return self
+
+    def __str__(self) -> str:
+        # These statements are only valid for PostgreSQL, so str() shouldn't
+        # use the default dialect's quoting.
+        return str(self.compile(dialect=_pg_dialect))
 
 
 class _Grant(_GrantRevoke):
-    inherit_cache = False
+    inherit_cache = True
 
     keyword = "GRANT"
 
 
 class _Revoke(_GrantRevoke):
-    inherit_cache = False
+    inherit_cache = True
 
     keyword = "REVOKE"
 
 
-@compiles(_GrantRevoke)  # type: ignore[no-untyped-call,misc]
-def _pg_grant(element: _Grant, compiler: SQLCompiler, **kw: Any) -> str:
-    target = element._target
-    schema = element._schema
-    arg_types = element._arg_types
-    priv_type = element._priv_type
-
-    preparer = compiler.preparer
+def _format_name(
+    quote: Callable[[str], str],
+    priv_type: PgObjectType,
+    target: str,
+    schema: Optional[str],
+    arg_types: Optional[Tuple[str, ...]],
+) -> str:
+    """Format a target given by name, e.g. ``s."user"`` or ``f(integer)``."""
+    if not isinstance(priv_type, PgObjectType):
+        raise ValueError(f"Unknown type: {priv_type}")
 
-    privs = []
+    if priv_type is not PgObjectType.FUNCTION and arg_types is not None:
+        raise ValueError("arg_types argument not supported unless type is FUNCTION.")
 
-    for priv in element._privileges:
-        match = _re_valid_priv.match(priv)
-        if match is None:
-            raise ValueError(f"Privilege not valid: {priv}")
+    if schema is not None:
+        name = quote(schema) + "." + quote(target)
+    else:
+        name = quote(target)
 
-        subname = match.group(2)
+    if priv_type is PgObjectType.FUNCTION:
+        if arg_types is None:
+            raise ValueError(
+                "Must use an empty sequence if function has no arguments, not None."
+            )
 
-        if subname is not None:
-            if element._quote_subname:
-                subname = preparer.quote(subname)
+        str_arg_types = ", ".join([quote(t) for t in arg_types])
+        return f"{name}({str_arg_types})"
 
-            privs.append(f"{match.group(1)} ({subname})")
-        else:
-            privs.append(match.group(1))
+    return name
 
-    priv = ", ".join(privs)
 
-    str_target = None
+def _format_target(
+    compiler: SQLCompiler, priv_type: PgObjectType, element: _Target
+) -> str:
+    target, schema, arg_types = element
+    preparer = compiler.preparer
 
     if isinstance(target, str):
-        if schema is not None:
-            str_target = preparer.quote_schema(schema) + "." + preparer.quote(target)
-        else:
-            str_target = preparer.quote(target)
-    else:
-        if schema is not None:
-            raise ValueError("schema argument not supported unless target is a string.")
+        return _format_name(preparer.quote, priv_type, target, schema, arg_types)
+
+    if schema is not None:
+        raise ValueError("schema argument not supported unless target is a string.")
 
     if priv_type is not PgObjectType.FUNCTION and arg_types is not None:
         raise ValueError("arg_types argument not supported unless type is FUNCTION.")
 
     if priv_type is PgObjectType.TABLE:
-        if str_target is not None:
-            target = str_target
-        else:
-            target = compiler.process(_as_table(target), ashint=True)
+        return compiler.process(_as_table(target), ashint=True)
     elif priv_type is PgObjectType.SEQUENCE:
-        if str_target is not None:
-            target = str_target
-        else:
-            target = preparer.format_sequence(target)  # type: ignore[no-untyped-call]
-    elif priv_type is PgObjectType.TYPE:
-        if str_target is None:
-            target = compiler.process(target)  # type: ignore[arg-type]
-        else:
-            target = str_target
-    elif priv_type is PgObjectType.FUNCTION:
-        if str_target is None:
-            target = compiler.process(target)  # type: ignore[arg-type]
-        else:
-            if arg_types is None:
-                raise ValueError(
-                    "Must use an empty sequence if function has "
-                    "no arguments, not None."
-                )
-
-            str_arg_types = ", ".join([preparer.quote(t) for t in arg_types])
-            target = f"{str_target}({str_arg_types})"
+        return preparer.format_sequence(target)  # type: ignore[no-untyped-call]
     elif isinstance(priv_type, PgObjectType):
-        if str_target is None:
-            target = compiler.process(target)  # type: ignore[arg-type]
-        else:
-            target = str_target
+        return compiler.process(target)  # type: ignore[arg-type]
     else:
         raise ValueError(f"Unknown type: {priv_type}")
 
-    is_grant = element.keyword == "GRANT"
 
-    grantee = element._grantee
+def _format_statement(
+    quote: Callable[[str], str],
+    keyword: str,
+    privileges: Tuple[str, ...],
+    on: str,
+    grantees: Tuple[str, ...],
+    *,
+    grant_option: bool,
+    quote_subname: bool,
+) -> str:
+    privs = []
 
-    if grantee.upper() != "PUBLIC":
-        grantee = compiler.preparer.quote(grantee)
+    for priv in privileges:
+        priv_keyword, subname = _split_privilege(priv)
+
+        if subname is not None:
+            if quote_subname:
+                subname = quote(subname)
+
+            privs.append(f"{priv_keyword} ({subname})")
+        else:
+            privs.append(priv_keyword)
+
+    is_grant = keyword == "GRANT"
+
+    str_grantees = ", ".join(
+        grantee if grantee.upper() == "PUBLIC" else quote(grantee)
+        for grantee in grantees
+    )
+
+    return "{}{} {} ON {} {} {}{}".format(
+        keyword,
+        " GRANT OPTION FOR" if grant_option and not is_grant else "",
+        ", ".join(privs),
+        on,
+        "TO" if is_grant else "FROM",
+        str_grantees,
+        " WITH GRANT OPTION" if grant_option and is_grant else "",
+    )
 
-    return "{}{} {} ON {} {} {} {}{}".format(
+
+@compiles(_GrantRevoke)  # type: ignore[no-untyped-call,misc]
+def _pg_grant(element: _Grant, compiler: SQLCompiler, **kw: Any) -> str:
+    priv_type = element._priv_type
+
+    preparer = compiler.preparer
+
+    if element._in_schema:
+        schemas = ", ".join(
+            preparer.quote_schema(t.target)  # type: ignore[arg-type]
+            for t in element._targets
+        )
+        on = f"ALL {_in_schema_keywords[priv_type]} IN SCHEMA {schemas}"
+    else:
+        targets = ", ".join(
+            _format_target(compiler, priv_type, t) for t in element._targets
+        )
+        on = f"{priv_type.value} {targets}"
+
+    assert element.keyword is not None
+    return _format_statement(
+        preparer.quote,
         element.keyword,
-        " GRANT OPTION FOR" if element._grant_option and not is_grant else "",
-        priv,
-        priv_type.value,
+        element._privileges,
+        on,
+        element._grantees,
+        grant_option=element._grant_option,
+        quote_subname=element._quote_subname,
+    )
+
+
+# Identifier quoting doesn't depend on the connection, so the results can be
+# shared between all renders.
+@lru_cache(maxsize=65536)
+def _quote(ident: str) -> str:
+    return _pg_preparer.quote(ident)
+
+
+def _render(
+    keyword: str,
+    privileges: PrivilegesInput,
+    type: PgObjectType,
+    target: str,
+    grantee: str,
+    *,
+    grant_option: bool,
+    schema: Optional[str],
+    arg_types: Optional[ArgTypesInput],
+    quote_subname: bool,
+) -> str:
+    if not isinstance(target, str):
+        raise ValueError("target must be a string.")
+
+    if privileges == "ALL":
+        privileges = ("ALL",)
+
+    name = _format_name(
+        _quote,
+        type,
+        target,
+        schema,
+        None if arg_types is None else tuple(arg_types),
+    )
+
+    return _format_statement(
+        _quote,
+        keyword,
+        tuple(privileges),
+        f"{type.value} {name}",
+        (grantee,),
+        grant_option=grant_option,
+        quote_subname=quote_subname,
+    )
+
+
+def render_grant(
+    privileges: PrivilegesInput,
+    type: PgObjectType,
+    target: str,
+    grantee: str,
+    *,
+    grant_option: bool = False,
+    schema: Optional[str] = None,
+    arg_types: Optional[ArgTypesInput] = None,
+    quote_subname: bool = True,
+) -> str:
+    """Return the SQL for a GRANT statement without compiling a SQLAlchemy
+    construct, which is much faster when generating many statements, e.g. for
+    a migration script.
+
+    The arguments are the same as for :func:`grant`, except that `target` must
+    be a string. The result is the same as ``str(grant(...))``.
+    """
+    return _render(
+        "GRANT",
+        privileges,
+        type,
+        target,
+        grantee,
+        grant_option=grant_option,
+        schema=schema,
+        arg_types=arg_types,
+        quote_subname=quote_subname,
+    )
+
+
+def render_revoke(
+    privileges: PrivilegesInput,
+    type: PgObjectType,
+    target: str,
+    grantee: str,
+    *,
+    grant_option: bool = False,
+    schema: Optional[str] = None,
+    arg_types: Optional[ArgTypesInput] = None,
+    quote_subname: bool = True,
+) -> str:
+    """Return the SQL for a REVOKE statement without compiling a SQLAlchemy
+    construct, which is much faster when generating many statements, e.g. for
+    a migration script.
+
+    The arguments are the same as for :func:`revoke`, except that `target`
+    must be a string. The result is the same as ``str(revoke(...))``.
+    """
+    return _render(
+        "REVOKE",
+        privileges,
+        type,
         target,
-        "TO" if is_grant else "FROM",
         grantee,
-        " WITH GRANT OPTION" if element._grant_option and is_grant else "",
+        grant_option=grant_option,
+        schema=schema,
+        arg_types=arg_types,
+        quote_subname=quote_subname,
     )
 
 
@@ -425,3 +665,85 @@ def revoke(
         arg_types=arg_types,
         quote_subname=quote_subname,
     )
+
+
+def iter_privilege_sql(
+    entries: Iterable[Tuple[ObjectKey, Privileges]], *, revoke: bool = False
+) -> Iterator[str]:
+    """Render the statements that grant (or revoke) privileges on objects, like
+    :meth:`.Privileges.as_grant_statements` but as SQL strings using
+    :func:`render_grant` and :func:`render_revoke`.
+
+    Parameters:
+        entries: Pairs of an object key and privileges on that object. They
+                 are consumed lazily, so this may be a generator.
+        revoke: Whether to revoke the privileges instead of granting them.
+    """
+    render = render_revoke if revoke else render_grant
+
+    for key, p in entries:
+        for privs, grant_option in ((p.privs, False), (p.privswgo, True)):
+            if not privs:
+                continue
+
+            yield render(
+                privs,
+                key.type,
+                key.name,
+                p.grantee,
+                # Revoking the privileges fully also revokes the grant option.
+                grant_option=grant_option and not revoke,
+                schema=key.schema,
+                arg_types=key.arg_types,
+            )
+
+
+def write_script(
+    fp: TextIO,
+    statements: Iterable[Union[str, Executable]],
+    *,
+    transaction: bool = True,
+    batch_size: Optional[int] = None,
+) -> int:
+    """Write statements to a SQL script one at a time, so that scripts with
+    millions of statements can be generated without holding them in memory.
+
+    Parameters:
+        fp: File-like object to write to.
+        statements: SQL strings (e.g. from :func:`iter_privilege_sql`) or
+                    statements to compile with the PostgreSQL dialect (e.g.
+                    from :func:`grant` or :func:`~.plan.coalesce_statements`).
+        transaction: Whether to wrap the statements in ``BEGIN`` and
+                     ``COMMIT``.
+        batch_size: Optional. Number of statements per transaction. By
+                    default, the script runs in a single transaction. Without
+                    `transaction`, batches are separated by a blank line.
+
+    Returns:
+        The number of statements written.
+    """
+    if batch_size is not None and batch_size < 1:
+        raise ValueError("batch_size must be positive.")
+
+    count = 0
+
+    for statement in statements:
+        if count == 0 or (batch_size is not None and count % batch_size == 0):
+            if count:
+                fp.write("COMMIT;\n\n" if transaction else "\n")
+            if transaction:
+                fp.write("BEGIN;\n")
+
+        if not isinstance(statement, str):
+            assert isinstance(statement, ClauseElement)
+            # psql reads the script as is, so percent signs mustn't be doubled.
+            statement = str(statement.compile(dialect=_pg_dialect))
+
+        fp.write(statement)
+        fp.write(";\n")
+        count += 1
+
+    if transaction and count:
+        fp.write("COMMIT;\n")
+
+    return count
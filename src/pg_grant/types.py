@@ -1,5 +1,15 @@
 from enum import Enum
-from typing import TYPE_CHECKING, Any, List, NoReturn, Optional, Tuple, overload
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Iterable,
+    List,
+    NoReturn,
+    Optional,
+    Tuple,
+    Union,
+    overload,
+)
 
 from attrs import Factory, converters, define, field
 
@@ -181,6 +191,7 @@ class Privileges:
             schema: Optional[str] = ...,
             arg_types: Optional[ArgTypesInput] = ...,
             quote_subname: bool = ...,
+            grant_option: bool = ...,
         ) -> List[ExecutableType]:
             ...
 
@@ -193,6 +204,7 @@ class Privileges:
             schema: None = ...,
             arg_types: None = ...,
             quote_subname: bool = ...,
+            grant_option: bool = ...,
         ) -> List[ExecutableType]:
             ...
 
@@ -205,6 +217,7 @@ class Privileges:
             schema: None = ...,
             arg_types: None = ...,
             quote_subname: bool = ...,
+            grant_option: bool = ...,
         ) -> List[ExecutableType]:
             ...
 
@@ -217,6 +230,7 @@ class Privileges:
             schema: Optional[str] = ...,
             arg_types: ArgTypesInput,
             quote_subname: bool = ...,
+            grant_option: bool = ...,
         ) -> List[ExecutableType]:
             ...
 
@@ -228,15 +242,21 @@ class Privileges:
             schema: Optional[str] = None,
             arg_types: Optional[ArgTypesInput] = None,
             quote_subname: bool = True,
+            grant_option: bool = False,
         ) -> List[ExecutableType]:
             """Return array of :func:`~.sql.revoke` statements that can be executed
             to revoke these privileges. Refer to the function documentation for the
             meaning of `target` and additional keyword arguments.
 
+            If `grant_option` is true, only the grant options of the
+            `privswgo` privileges are revoked, using ``REVOKE GRANT OPTION
+            FOR``. The privileges themselves are kept, and `privs` is ignored.
+            This downgrades the privileges in a single statement.
+
             .. note::
 
-                The statement for the `privswgo` privileges will revoke them
-                fully, not only their grant options.
+                By default, the statement for the `privswgo` privileges will
+                revoke them fully, not only their grant options.
 
             .. note:: This requires installing with the ``sqlalchemy`` extra.
             """
@@ -244,7 +264,7 @@ class Privileges:
 
             statements: List[ExecutableType] = []
 
-            if self.privs:
+            if self.privs and not grant_option:
                 statements.append(
                     revoke(
                         self.privs,
@@ -264,6 +284,7 @@ class Privileges:
                         type,
                         target,
                         self.grantee,
+                        grant_option=grant_option,
                         schema=schema,
                         arg_types=arg_types,
                         quote_subname=quote_subname,
@@ -293,10 +314,58 @@ class Privileges:
             schema: Optional[str] = None,
             arg_types: Optional[Any] = None,
             quote_subname: bool = True,
+            grant_option: bool = False,
         ) -> NoReturn:
             raise RuntimeError("Missing sqlalchemy extra")
 
 
+# The ACL that privileges were parsed from, and the privileges.
+_CachedPrivileges = Tuple[Optional[Tuple[str, ...]], List[Privileges]]
+
+
+def _cached_privileges(
+    info: Union["RelationInfo", "ColumnInfo", "ParameterInfo"],
+    type: Optional[PgObjectType],
+    column: Optional[str] = None,
+) -> List[Privileges]:
+    cached = info._privileges
+    if cached is not None and cached[0] is info.acl:
+        return cached[1]
+
+    if type is None:
+        raise ValueError("The object type is unknown.")
+
+    from .parse import get_default_privileges, parse_acl
+
+    privileges: List[Privileges]
+    if info.acl is not None:
+        privileges = parse_acl(info.acl, type, column)
+    elif isinstance(info, ParameterInfo) or column is not None:
+        privileges = []
+    else:
+        privileges = get_default_privileges(type, info.owner)
+
+    info._privileges = (info.acl, privileges)
+    return privileges
+
+
+def _init_privileges(
+    info: Union["RelationInfo", "ColumnInfo"],
+    type: Optional[PgObjectType],
+    column: Optional[str] = None,
+) -> List[Privileges]:
+    if type is None:
+        raise ValueError("The object type is unknown.")
+
+    from .parse import get_default_privileges, parse_acl
+
+    if info.init_acl is not None:
+        return parse_acl(info.init_acl, type, column)
+    if column is not None:
+        return []
+    return get_default_privileges(type, info.owner)
+
+
 @define(kw_only=True)
 class RelationInfo:
     """Holds object information and privileges as queried using the
@@ -314,6 +383,40 @@ class RelationInfo:
     #: Access control list.
     acl: Optional[Tuple[str, ...]] = field(converter=converters.optional(tuple))
 
+    #: Initial access control list from ``pg_init_privs``, as queried with
+    #: ``init_privs=True``, or ``None`` if there is none.
+    init_acl: Optional[Tuple[str, ...]] = field(
+        default=None, converter=converters.optional(tuple)
+    )
+
+    #: Type of the object, as set by the :mod:`.query` functions.
+    type: Optional[PgObjectType] = field(default=None, eq=False)
+
+    _privileges: Optional[_CachedPrivileges] = field(
+        default=None, init=False, eq=False, repr=False
+    )
+
+    @property
+    def privileges(self) -> List[Privileges]:
+        """The parsed :attr:`acl`, or the default privileges if it is
+        ``None``. Parsed on first access; the list is shared between accesses.
+
+        Raises:
+            ValueError: if :attr:`type` is ``None``.
+        """
+        return _cached_privileges(self, self.type)
+
+    @property
+    def init_privileges(self) -> List[Privileges]:
+        """The parsed :attr:`init_acl`, or the default privileges if it is
+        ``None``. Compare with :attr:`privileges` to find the changes made
+        after the object was created, e.g. by an extension.
+
+        Raises:
+            ValueError: if :attr:`type` is ``None``.
+        """
+        return _init_privileges(self, self.type)
+
 
 @define(kw_only=True)
 class SchemaRelationInfo(RelationInfo):
@@ -332,6 +435,9 @@ class FunctionInfo(SchemaRelationInfo):
     #: Data types of the function arguments.
     arg_types: Tuple[str, ...] = field(converter=tuple)
 
+    #: Type of the object.
+    type: Optional[PgObjectType] = field(default=PgObjectType.FUNCTION, eq=False)
+
 
 @define(kw_only=True)
 class ColumnInfo:
@@ -356,6 +462,31 @@ class ColumnInfo:
     #: Column access control list.
     acl: Optional[Tuple[str, ...]] = field(converter=converters.optional(tuple))
 
+    #: Initial column access control list from ``pg_init_privs``, as queried
+    #: with ``init_privs=True``, or ``None`` if there is none.
+    init_acl: Optional[Tuple[str, ...]] = field(
+        default=None, converter=converters.optional(tuple)
+    )
+
+    #: Type of the table.
+    type: Optional[PgObjectType] = field(default=PgObjectType.TABLE, eq=False)
+
+    _privileges: Optional[_CachedPrivileges] = field(
+        default=None, init=False, eq=False, repr=False
+    )
+
+    @property
+    def privileges(self) -> List[Privileges]:
+        """The parsed :attr:`acl`, or an empty list if it is ``None``.
+        Parsed on first access; the list is shared between accesses.
+        """
+        return _cached_privileges(self, self.type, self.column)
+
+    @property
+    def init_privileges(self) -> List[Privileges]:
+        """The parsed :attr:`init_acl`, or an empty list if it is ``None``."""
+        return _init_privileges(self, self.type, self.column)
+
 
 @define(kw_only=True)
 class ParameterInfo:
@@ -370,3 +501,121 @@ class ParameterInfo:
 
     #: Access control list.
     acl: Optional[Tuple[str, ...]] = field(converter=converters.optional(tuple))
+
+    #: Type of the object.
+    type: Optional[PgObjectType] = field(default=PgObjectType.PARAMETER, eq=False)
+
+    _privileges: Optional[_CachedPrivileges] = field(
+        default=None, init=False, eq=False, repr=False
+    )
+
+    @property
+    def privileges(self) -> List[Privileges]:
+        """The parsed :attr:`acl`, or an empty list if it is ``None``.
+        Parsed on first access; the list is shared between accesses.
+        """
+        return _cached_privileges(self, self.type)
+
+
+@define(kw_only=True)
+class DefaultAclInfo:
+    """Holds default privileges set with ``ALTER DEFAULT PRIVILEGES``, as
+    queried using :func:`~.query.get_all_default_acls`."""
+
+    #: Row identifier.
+    oid: int
+
+    #: The role whose new objects get these privileges.
+    role: str
+
+    #: The schema the privileges apply in, or ``None`` for all schemas.
+    schema: Optional[str]
+
+    #: The type of object the privileges apply to.
+    type: PgObjectType
+
+    #: Access control list. For all schemas, this replaces the built-in
+    #: default privileges; for a schema, it's added to them.
+    acl: Tuple[str, ...] = field(converter=tuple)
+
+
+@define(kw_only=True)
+class LargeObjectAclGroup:
+    """Large objects with the same owner and privileges, as queried using
+    :func:`~.query.get_large_object_acl_groups`."""
+
+    #: Owner of the large objects.
+    owner: str
+
+    #: Access control list.
+    acl: Optional[Tuple[str, ...]] = field(converter=converters.optional(tuple))
+
+    #: Number of large objects.
+    count: int
+
+    #: Lowest identifier of the large objects.
+    min_oid: int
+
+    #: Highest identifier of the large objects.
+    max_oid: int
+
+
+def _optional_tuple(value: Optional[Iterable[str]]) -> Optional[Tuple[str, ...]]:
+    return None if value is None else tuple(value)
+
+
+@define(frozen=True, kw_only=True)
+class ObjectKey:
+    """Identifies a database object that privileges can be granted on.
+
+    Keys are hashable and compare equal by their names, so a key built from
+    code (e.g. for a desired state) matches one built from a query result.
+    The `oid` is informational and does not take part in comparisons.
+    """
+
+    #: Type of the object.
+    type: PgObjectType
+
+    #: Name of the object. For columns, this is the name of the table.
+    name: str
+
+    #: The name of the schema that contains this object, if any.
+    schema: Optional[str] = None
+
+    #: Data types of the function arguments, if the object is a function.
+    arg_types: Optional[Tuple[str, ...]] = field(
+        default=None, converter=_optional_tuple
+    )
+
+    #: Name of the column, for column privileges.
+    column: Optional[str] = None
+
+    #: Row identifier. For columns, this is the table identifier.
+    oid: Optional[int] = field(default=None, eq=False)
+
+    @classmethod
+    def from_info(
+        cls,
+        type: PgObjectType,
+        info: Union[RelationInfo, ColumnInfo, ParameterInfo],
+    ) -> "ObjectKey":
+        """Create a key for an object returned by the :mod:`.query` submodule."""
+        if isinstance(info, ColumnInfo):
+            return cls(
+                type=type,
+                name=info.table,
+                schema=info.schema,
+                column=info.column,
+                oid=info.table_oid,
+            )
+
+        schema = info.schema if isinstance(info, SchemaRelationInfo) else None
+        arg_types = info.arg_types if isinstance(info, FunctionInfo) else None
+
+        return cls(
+            type=type,
+            name=info.name,
+            schema=schema,
+            arg_types=arg_types,
+            oid=info.oid,
+        )
@@ -55,3 +55,16 @@ CREATE TYPE bug_status AS ENUM ('new', 'open', 'closed');
 CREATE TYPE thing AS ENUM ('spam', 'eggs');
 
 GRANT USAGE ON TYPE thing TO bob;
+
+CREATE DOMAIN positive AS integer CHECK (VALUE > 0);
+CREATE DOMAIN nonempty AS text CHECK (VALUE <> '');
+
+GRANT USAGE ON DOMAIN positive TO bob;
+
+CREATE FOREIGN DATA WRAPPER fdw1;
+CREATE FOREIGN DATA WRAPPER fdw2;
+CREATE SERVER server1 FOREIGN DATA WRAPPER fdw1;
+CREATE SERVER server2 FOREIGN DATA WRAPPER fdw2;
+
+GRANT USAGE ON FOREIGN DATA WRAPPER fdw2 TO bob;
+GRANT USAGE ON FOREIGN SERVER server2 TO bob WITH GRANT OPTION;
@@ -86,3 +86,13 @@ def test_get_all_column_acls(connection):
 def test_no_such_object(connection):
     with pytest.raises(NoSuchObjectError):
         get_column_acls(connection, "table3")
+
+
+def test_get_all_column_acls_shared_strings(connection):
+    """Repeated names in the results are the same objects."""
+    column_acls = [c for c in get_all_column_acls(connection) if c.table == "table2"]
+    assert len(column_acls) == 2
+    first, second = column_acls
+    assert first.schema is second.schema
+    assert first.table is second.table
+    assert first.owner is second.owner
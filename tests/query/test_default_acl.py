@@ -0,0 +1,89 @@
+import pytest
+from sqlalchemy import text
+
+from pg_grant import NoSuchObjectError, PgObjectType, Privileges
+from pg_grant.diff import privileges_by_key
+from pg_grant.query import (
+    get_all_default_acls,
+    get_effective_default_privileges,
+    get_table_acl,
+)
+from pg_grant.types import DefaultAclInfo
+
+
+@pytest.fixture
+def default_acls(connection):
+    with connection.begin() as trans:
+        connection.execute(
+            text(
+                "ALTER DEFAULT PRIVILEGES FOR ROLE alice "
+                "REVOKE ALL ON TABLES FROM alice"
+            )
+        )
+        connection.execute(
+            text(
+                "ALTER DEFAULT PRIVILEGES FOR ROLE alice "
+                "GRANT SELECT ON TABLES TO alice, bob"
+            )
+        )
+        connection.execute(
+            text(
+                "ALTER DEFAULT PRIVILEGES FOR ROLE alice IN SCHEMA public "
+                "GRANT INSERT ON TABLES TO charlie"
+            )
+        )
+        yield
+        trans.rollback()
+
+
+def test_get_all_default_acls(connection, default_acls):
+    acls = {(a.schema, a.type): a for a in get_all_default_acls(connection)}
+    assert acls.keys() == {(None, PgObjectType.TABLE), ("public", PgObjectType.TABLE)}
+
+    schema_acl = acls["public", PgObjectType.TABLE]
+    assert isinstance(schema_acl, DefaultAclInfo)
+    assert schema_acl.role == "alice"
+    assert schema_acl.acl == ("charlie=a/alice",)
+    assert set(acls[None, PgObjectType.TABLE].acl) == {"alice=r/alice", "bob=r/alice"}
+
+    assert len(get_all_default_acls(connection, schema="other")) == 1
+
+
+def test_get_effective_default_privileges(connection, default_acls):
+    predicted = get_effective_default_privileges(
+        connection, PgObjectType.TABLE, "alice", "public"
+    )
+    assert sorted(predicted, key=lambda p: p.grantee) == [
+        Privileges("alice", "alice", ["SELECT"]),
+        Privileges("bob", "alice", ["SELECT"]),
+        Privileges("charlie", "alice", ["INSERT"]),
+    ]
+
+    connection.execute(text("CREATE TABLE default_acl1 (id integer)"))
+    table = get_table_acl(connection, "default_acl1", "public")
+    (actual,) = privileges_by_key(PgObjectType.TABLE, [table]).values()
+    assert sorted(actual, key=lambda p: p.grantee) == sorted(
+        predicted, key=lambda p: p.grantee
+    )
+
+
+def test_get_effective_default_privileges_builtin(connection):
+    assert get_effective_default_privileges(
+        connection, PgObjectType.FUNCTION, "alice", "public"
+    ) == [
+        Privileges("PUBLIC", "alice", ["EXECUTE"]),
+        Privileges("alice", "alice", ["ALL"]),
+    ]
+
+    # acldefault() uses "s" for sequences and "S" for foreign servers.
+    assert get_effective_default_privileges(
+        connection, PgObjectType.SEQUENCE, "alice", "public"
+    ) == [Privileges("alice", "alice", ["ALL"])]
+
+
+def test_get_effective_default_privileges_invalid(connection):
+    with pytest.raises(NoSuchObjectError):
+        get_effective_default_privileges(connection, PgObjectType.TABLE, "nobody")
+
+    with pytest.raises(ValueError):
+        get_effective_default_privileges(connection, PgObjectType.DATABASE, "alice")
@@ -0,0 +1,48 @@
+import pytest
+
+from pg_grant import NoSuchObjectError, PgObjectType
+from pg_grant.query import get_all_domain_acls, get_all_type_acls, get_domain_acl
+
+expected_acls = {
+    "public": {
+        # nonempty has default privileges, so None is returned.
+        "nonempty": None,
+        "positive": ("=U/alice", "alice=U/alice", "bob=U/alice"),
+    },
+}
+
+
+@pytest.mark.parametrize("name, acls", expected_acls["public"].items())
+def test_get_domain_acl_visible(connection, name, acls):
+    """Find visible (i.e. in search path) domains matching ``name``."""
+    domain = get_domain_acl(connection, name)
+    assert domain.acl == acls
+    assert domain.type is PgObjectType.DOMAIN
+
+
+@pytest.mark.parametrize("name, acls", expected_acls["public"].items())
+def test_get_domain_acl_schema(connection, name, acls):
+    domain = get_domain_acl(connection, name, "public")
+    assert domain.acl == acls
+
+
+def test_get_all_domain_acls(connection):
+    domains = {(x.schema, x.name): x.acl for x in get_all_domain_acls(connection)}
+    for name, acls in expected_acls["public"].items():
+        assert domains["public", name] == acls
+
+    # information_schema has domains too.
+    assert get_all_domain_acls(connection, "public") == [
+        x for x in get_all_domain_acls(connection) if x.schema == "public"
+    ]
+
+
+def test_domains_not_in_types(connection):
+    names = {x.name for x in get_all_type_acls(connection, "public")}
+    assert "thing" in names
+    assert not names & expected_acls["public"].keys()
+
+
+def test_no_such_object(connection):
+    with pytest.raises(NoSuchObjectError):
+        get_domain_acl(connection, "thing")
@@ -0,0 +1,30 @@
+import pytest
+
+from pg_grant import NoSuchObjectError
+from pg_grant.query import (
+    get_all_foreign_data_wrapper_acls,
+    get_foreign_data_wrapper_acl,
+)
+
+expected_acls = {
+    # fdw1 has default privileges, so None is returned.
+    "fdw1": None,
+    "fdw2": ("alice=U/alice", "bob=U/alice"),
+}
+
+
+@pytest.mark.parametrize("name, acls", expected_acls.items())
+def test_get_foreign_data_wrapper_acl(connection, name, acls):
+    fdw = get_foreign_data_wrapper_acl(connection, name)
+    assert fdw.acl == acls
+    assert fdw.owner == "alice"
+
+
+def test_get_all_foreign_data_wrapper_acls(connection):
+    fdws = {x.name: x.acl for x in get_all_foreign_data_wrapper_acls(connection)}
+    assert fdws == expected_acls
+
+
+def test_no_such_object(connection):
+    with pytest.raises(NoSuchObjectError):
+        get_foreign_data_wrapper_acl(connection, "server1")
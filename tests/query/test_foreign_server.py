@@ -0,0 +1,27 @@
+import pytest
+
+from pg_grant import NoSuchObjectError
+from pg_grant.query import get_all_foreign_server_acls, get_foreign_server_acl
+
+expected_acls = {
+    # server1 has default privileges, so None is returned.
+    "server1": None,
+    "server2": ("alice=U/alice", "bob=U*/alice"),
+}
+
+
+@pytest.mark.parametrize("name, acls", expected_acls.items())
+def test_get_foreign_server_acl(connection, name, acls):
+    server = get_foreign_server_acl(connection, name)
+    assert server.acl == acls
+    assert server.owner == "alice"
+
+
+def test_get_all_foreign_server_acls(connection):
+    servers = {x.name: x.acl for x in get_all_foreign_server_acls(connection)}
+    assert servers == expected_acls
+
+
+def test_no_such_object(connection):
+    with pytest.raises(NoSuchObjectError):
+        get_foreign_server_acl(connection, "fdw1")
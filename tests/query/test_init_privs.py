@@ -0,0 +1,37 @@
+from sqlalchemy import text
+
+from pg_grant import PgObjectType, Privileges
+from pg_grant.query import get_all_function_acls, get_all_table_acls, get_all_type_acls
+
+
+def test_init_privs_unchanged(connection):
+    # initdb records the initial privileges of system objects.
+    assert get_all_function_acls(connection, "pg_catalog", init_privs=True) == []
+    assert get_all_type_acls(connection, "pg_catalog", init_privs=True) == []
+
+
+def test_init_privs_changed(connection):
+    with connection.begin() as trans:
+        connection.execute(
+            text("GRANT EXECUTE ON FUNCTION pg_catalog.pg_ls_dir(text) TO bob")
+        )
+        (function,) = get_all_function_acls(connection, "pg_catalog", init_privs=True)
+        assert (function.name, function.arg_types) == ("pg_ls_dir", ("text",))
+        assert function.init_acl is not None
+        assert any(item.startswith("bob=X/") for item in function.acl)
+        assert not any(item.startswith("bob=") for item in function.init_acl)
+
+        added = [p for p in function.privileges if p not in function.init_privileges]
+        assert added == [Privileges("bob", added[0].grantor, ["ALL"])]
+        trans.rollback()
+
+
+def test_init_privs_user_objects(connection):
+    tables = {
+        x.name: x for x in get_all_table_acls(connection, "public", init_privs=True)
+    }
+    # Tables with default privileges are left out.
+    assert "table1" not in tables
+    assert tables["table2"].init_acl is None
+    assert tables["table2"].init_privileges == [Privileges("alice", "alice", ["ALL"])]
+    assert tables["table2"].type is PgObjectType.TABLE
@@ -0,0 +1,32 @@
+from sqlalchemy import text
+
+from pg_grant import PgObjectType
+from pg_grant.query import get_large_object_acl_groups, iter_large_object_acls
+
+
+def test_large_object_acls(connection):
+    with connection.begin() as trans:
+        oids = [
+            connection.execute(text("SELECT lo_create(0)")).scalar_one()
+            for _ in range(5)
+        ]
+        for oid in oids[:2]:
+            connection.execute(text(f"GRANT SELECT ON LARGE OBJECT {oid} TO bob"))
+
+        objects = [
+            o for o in iter_large_object_acls(connection, batch_size=2) if o.oid in oids
+        ]
+        assert [o.oid for o in objects] == sorted(oids)
+        assert objects[0].name == str(objects[0].oid)
+        assert objects[0].type is PgObjectType.LARGE_OBJECT
+
+        acls = {o.oid: o.acl for o in objects}
+        assert [acls[oid] is None for oid in oids] == [False, False, True, True, True]
+
+        groups = {g.acl: g for g in get_large_object_acl_groups(connection)}
+        granted = groups["alice=rw/alice", "bob=r/alice"]
+        assert (granted.owner, granted.count) == ("alice", 2)
+        assert (granted.min_oid, granted.max_oid) == (min(oids[:2]), max(oids[:2]))
+        assert groups[None].count >= 3
+
+        trans.rollback()
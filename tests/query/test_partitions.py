@@ -0,0 +1,30 @@
+from sqlalchemy import text
+
+from pg_grant.query import get_all_table_acls
+
+
+def test_collapse_partitions(connection):
+    with connection.begin() as trans:
+        connection.execute(
+            text("CREATE TABLE measurement (day date) PARTITION BY RANGE (day)")
+        )
+        for month in range(1, 5):
+            start, end = f"2024-{month:02}-01", f"2024-{month + 1:02}-01"
+            connection.execute(
+                text(
+                    f"CREATE TABLE measurement_{month} PARTITION OF measurement "
+                    f"FOR VALUES FROM ('{start}') TO ('{end}')"
+                )
+            )
+            connection.execute(text(f"GRANT SELECT ON measurement_{month} TO bob"))
+        connection.execute(text("GRANT SELECT ON measurement TO bob"))
+        connection.execute(text("GRANT INSERT ON measurement_4 TO bob"))
+
+        names = {x.name for x in get_all_table_acls(connection, "public")}
+        assert names >= {"measurement", "measurement_1", "measurement_4"}
+
+        tables = get_all_table_acls(connection, "public", collapse_partitions=True)
+        names = {x.name for x in tables}
+        assert {"measurement", "measurement_4", "table1"} <= names
+        assert not names & {"measurement_1", "measurement_2", "measurement_3"}
+        trans.rollback()
@@ -0,0 +1,52 @@
+import pytest
+from sqlalchemy import text
+
+from pg_grant.query import (
+    get_all_column_acls,
+    get_all_function_acls,
+    get_all_sequence_acls,
+    get_all_table_acls,
+    get_all_type_acls,
+)
+
+
+@pytest.fixture
+def tenant_schemas(connection):
+    with connection.begin() as trans:
+        for name in ["tenant_1", "tenant_2", "tenant_10", "other"]:
+            connection.execute(text(f"CREATE SCHEMA {name}"))
+            connection.execute(text(f"CREATE TABLE {name}.t (id integer)"))
+            connection.execute(text(f"CREATE SEQUENCE {name}.s"))
+        yield
+        trans.rollback()
+
+
+def schemas(infos):
+    return {info.schema for info in infos}
+
+
+@pytest.mark.parametrize(
+    "kwargs, expected",
+    [
+        ({"schema": "tenant_1"}, {"tenant_1"}),
+        ({"schema": ["tenant_1", "other"]}, {"tenant_1", "other"}),
+        ({"schema": ()}, set()),
+        ({"schema_like": "tenant\\_%"}, {"tenant_1", "tenant_2", "tenant_10"}),
+        ({"schema_like": ["tenant\\_1%", "oth%"]}, {"tenant_1", "tenant_10", "other"}),
+        ({"schema_regex": "^tenant_[0-9]$"}, {"tenant_1", "tenant_2"}),
+        (
+            {"schema": "other", "schema_regex": "^tenant_1"},
+            {"tenant_1", "tenant_10", "other"},
+        ),
+    ],
+)
+def test_schema_filters(connection, tenant_schemas, kwargs, expected):
+    assert schemas(get_all_table_acls(connection, **kwargs)) == expected
+    assert schemas(get_all_sequence_acls(connection, **kwargs)) == expected
+    assert schemas(get_all_column_acls(connection, **kwargs)) == expected
+
+
+def test_schema_collection(connection):
+    names = ["public", "pg_catalog"]
+    assert schemas(get_all_function_acls(connection, names)) == set(names)
+    assert schemas(get_all_type_acls(connection, schema_like=names)) == set(names)
@@ -1,6 +1,6 @@
 import pytest
 
-from pg_grant import NoSuchObjectError
+from pg_grant import NoSuchObjectError, PgObjectType, Privileges
 from pg_grant.query import get_all_table_acls, get_table_acl
 
 expected_acls = {
@@ -69,3 +69,9 @@ def test_get_all_table_acls(connection):
 def test_no_such_object(connection):
     with pytest.raises(NoSuchObjectError):
         get_table_acl(connection, "table3")
+
+
+def test_get_table_acl_privileges(connection):
+    table = get_table_acl(connection, "table1")
+    assert table.type is PgObjectType.TABLE
+    assert table.privileges == [Privileges("alice", "alice", ["ALL"])]
@@ -0,0 +1,243 @@
+import threading
+
+import pytest
+from sqlalchemy import text
+
+from pg_grant import NoSuchObjectError
+from pg_grant.cache import AclCache, _identity_name
+from pg_grant.notify import AclChange
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def loader(value=None, error=None):
+    calls = []
+
+    def load():
+        calls.append(None)
+        if error is not None:
+            raise error
+        return value
+
+    return load, calls
+
+
+def test_cache_ttl(clock):
+    cache = AclCache(ttl=10, clock=clock)
+    load, calls = loader("a")
+
+    assert cache._get(("table", None, "t"), load) == "a"
+    clock.now = 9
+    assert cache._get(("table", None, "t"), load) == "a"
+    assert len(calls) == 1
+
+    clock.now = 10
+    assert cache._get(("table", None, "t"), load) == "a"
+    assert len(calls) == 2
+
+    stats = cache.stats
+    assert (stats.hits, stats.misses, stats.coalesced) == (1, 2, 0)
+    assert stats.hit_rate == pytest.approx(1 / 3)
+
+
+def test_cache_negative(clock):
+    cache = AclCache(ttl=10, negative_ttl=1, clock=clock)
+    load, calls = loader(error=NoSuchObjectError("t"))
+
+    for _ in range(2):
+        with pytest.raises(NoSuchObjectError, match="t"):
+            cache._get(("table", None, "t"), load)
+    assert len(calls) == 1
+
+    clock.now = 1
+    with pytest.raises(NoSuchObjectError):
+        cache._get(("table", None, "t"), load)
+    assert len(calls) == 2
+
+
+def test_cache_other_errors_not_cached(clock):
+    cache = AclCache(clock=clock)
+    load, calls = loader(error=RuntimeError())
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            cache._get(("table", None, "t"), load)
+    assert len(calls) == 2
+    assert len(cache) == 0
+
+
+def test_cache_lru(clock):
+    cache = AclCache(maxsize=2, clock=clock)
+    for name in ["a", "b", "a", "c"]:
+        cache._get(("table", None, name), lambda: name)
+
+    assert len(cache) == 2
+    assert cache.stats.evictions == 1
+
+    load, calls = loader("b")
+    cache._get(("table", None, "b"), load)
+    assert len(calls) == 1
+
+
+def test_cache_single_flight():
+    cache = AclCache()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def load():
+        calls.append(None)
+        started.set()
+        release.wait(5)
+        return "a"
+
+    results = []
+
+    def worker():
+        results.append(cache._get(("table", None, "t"), load))
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    while cache.stats.coalesced < 4:
+        pass
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["a"] * 5
+    assert len(calls) == 1
+
+
+def test_cache_invalidate(clock):
+    cache = AclCache(clock=clock)
+    keys = [
+        ("table", "s", "t"),
+        ("table", None, "t"),
+        ("table", "other", "t"),
+        ("column", "s", "t"),
+        ("function", "s", ("f", ())),
+        ("schema", None, "s"),
+    ]
+    for key in keys:
+        cache._get(key, lambda: None)
+
+    assert cache.invalidate("table", schema="s") == 2
+    assert cache.invalidate(name="f") == 1
+    assert len(cache) == 3
+
+    assert cache.handle_change(AclChange("GRANT", "TABLE", None, None, None)) == 2
+    assert len(cache) == 1
+    assert cache.handle_change(AclChange("ALTER SCHEMA", "schema", None, "s", 1)) == 1
+
+    cache._get(("table", None, "t"), lambda: None)
+    cache.clear()
+    assert len(cache) == 0
+
+
+@pytest.mark.parametrize(
+    "identity, schema, name",
+    [
+        ("public.t", "public", "t"),
+        ("public.t.id", "public", "t"),
+        ('"My Schema"."T ""x"""', "My Schema", 'T "x"'),
+        ("public.f(integer, text)", "public", "f"),
+        ("plpgsql", None, "plpgsql"),
+        (None, "public", None),
+        ("other.t", "public", None),
+    ],
+)
+def test_identity_name(identity, schema, name):
+    assert _identity_name(identity, schema) == name
+
+
+def test_cache_handle_change_identity(clock):
+    cache = AclCache(clock=clock)
+    keys = [
+        ("table", "s", "t"),
+        ("table", None, "t"),
+        ("table", "s", "u"),
+        ("column", "s", "t"),
+        ("table", "other", "t"),
+        ("function", "s", ("f", ("int4",))),
+        ("function", "s", ("g", ())),
+    ]
+    for key in keys:
+        cache._get(key, lambda: None)
+
+    change = AclChange("ALTER TABLE", "table", "s", "s.t", 1)
+    assert cache.handle_change(change) == 3
+    assert cache.handle_change(AclChange("ALTER TABLE", "table", "s", "s.t", 1)) == 0
+
+    change = AclChange("ALTER FUNCTION", "function", "s", "s.f(integer)", 2)
+    assert cache.handle_change(change) == 1
+    assert len(cache) == 3
+
+    # Without an identity, every entry of the kind in the schema is removed.
+    assert cache.handle_change(AclChange("GRANT", "TABLE", "s", None, None)) == 1
+    assert len(cache) == 2
+
+
+def test_cache_handle_change_unknown_type(clock):
+    cache = AclCache(clock=clock)
+    cache._get(("table", "s", "t"), lambda: None)
+    cache._get(("function", "s", ("f", ())), lambda: None)
+
+    assert cache.handle_change(AclChange("CREATE INDEX", "index", "s", "s.i", 1)) == 2
+    assert len(cache) == 0
+
+
+def test_cache_invalidate_during_load(clock):
+    cache = AclCache(clock=clock)
+
+    def load():
+        cache.invalidate()
+        return "stale"
+
+    assert cache._get(("table", None, "t"), load) == "stale"
+    assert len(cache) == 0
+
+
+def test_cache_invalid_maxsize():
+    with pytest.raises(ValueError):
+        AclCache(maxsize=0)
+
+
+def test_cache_get_table_acl(connection):
+    cache = AclCache()
+
+    with connection.begin() as trans:
+        assert cache.get_table_acl(connection, "table1").acl is None
+        connection.execute(text("GRANT SELECT ON TABLE table1 TO bob"))
+        assert cache.get_table_acl(connection, "table1").acl is None
+
+        cache.invalidate("table", name="table1")
+        assert "bob=r/alice" in cache.get_table_acl(connection, "table1").acl
+        trans.rollback()
+
+    for _ in range(2):
+        with pytest.raises(NoSuchObjectError):
+            cache.get_table_acl(connection, "table3")
+
+    assert len(cache.get_column_acls(connection, "table2")) > 0
+    info = cache.get_function_acl(connection, "fun1", ["int4"])
+    assert info is cache.get_function_acl(connection, "fun1", ("int4",))
+    assert cache.get_schema_acl(connection, "public").name == "public"
+
+    stats = cache.stats
+    assert stats.hits == 3
+    assert stats.average_load_time > 0
+    assert cache.handle_change(AclChange("GRANT", "FUNCTION", None, None, None)) == 1
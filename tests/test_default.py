@@ -1,6 +1,15 @@
 import pytest
 
-from pg_grant import PgObjectType, Privileges, get_default_privileges
+from pg_grant import (
+    FunctionInfo,
+    PgObjectType,
+    Privileges,
+    RelationInfo,
+    SchemaRelationInfo,
+    expand_acls,
+    get_default_privileges,
+)
+from pg_grant.types import ColumnInfo, ParameterInfo
 
 
 @pytest.mark.parametrize(
@@ -32,3 +41,52 @@ def test_default_privileges(type, public_priv):
         expected.append(Privileges(grantee="PUBLIC", grantor=owner, privs=public_priv))
 
     assert get_default_privileges(type, owner) == expected
+
+
+def test_default_privileges_not_shared():
+    first = get_default_privileges(PgObjectType.TABLE, "alice")
+    first[0].privs.append("SELECT")
+    assert get_default_privileges(PgObjectType.TABLE, "alice")[0].privs == ["ALL"]
+
+
+def test_expand_acls():
+    infos = [
+        SchemaRelationInfo(oid=1, name="t1", owner="alice", acl=None, schema="s"),
+        SchemaRelationInfo(oid=2, name="t2", owner="alice", acl=None, schema="s"),
+        SchemaRelationInfo(oid=3, name="t3", owner="bob", acl=None, schema="s"),
+        SchemaRelationInfo(
+            oid=4, name="t4", owner="alice", acl=["bob=r/alice"], schema="s"
+        ),
+        ColumnInfo(
+            table_oid=1, schema="s", table="t1", column="c", owner="alice", acl=None
+        ),
+    ]
+
+    result = expand_acls(infos, PgObjectType.TABLE)
+    assert result == [
+        [Privileges("alice", "alice", ["ALL"])],
+        [Privileges("alice", "alice", ["ALL"])],
+        [Privileges("bob", "bob", ["ALL"])],
+        [Privileges("bob", "alice", ["SELECT"])],
+        [],
+    ]
+    assert result[0] is result[1]
+
+
+def test_expand_acls_type():
+    infos = [
+        FunctionInfo(
+            oid=1, name="f", owner="alice", acl=None, schema="s", arg_types=[]
+        ),
+        ParameterInfo(oid=2, name="work_mem", acl=None),
+    ]
+    assert expand_acls(infos) == [
+        [
+            Privileges("alice", "alice", ["ALL"]),
+            Privileges("PUBLIC", "alice", ["EXECUTE"]),
+        ],
+        [],
+    ]
+
+    with pytest.raises(ValueError):
+        expand_acls([RelationInfo(oid=1, name="l", owner="alice", acl=None)])
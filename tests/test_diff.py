@@ -0,0 +1,265 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from pg_grant import ObjectKey, PgObjectType, Privileges, SchemaRelationInfo
+from pg_grant.diff import (
+    PrivilegesChange,
+    diff_acl_streams,
+    diff_acls,
+    diff_privileges,
+    iter_privileges_by_key,
+    oid_sort_key,
+    privileges_by_key,
+)
+from pg_grant.types import ColumnInfo
+
+table = ObjectKey(type=PgObjectType.TABLE, name="t", schema="s")
+column = ObjectKey(type=PgObjectType.TABLE, name="t", schema="s", column="user")
+function = ObjectKey(
+    type=PgObjectType.FUNCTION, name="f", schema="s", arg_types=("integer",)
+)
+
+
+def compile_all(statements):
+    return [str(s.compile(dialect=postgresql.dialect())) for s in statements]
+
+
+@pytest.mark.parametrize(
+    "key, desired, current, expected",
+    [
+        (table, [], [], []),
+        (
+            table,
+            [Privileges("bob", "alice", ["SELECT", "INSERT"])],
+            [Privileges("bob", "alice", ["INSERT", "SELECT"])],
+            [],
+        ),
+        (
+            table,
+            [Privileges("bob", "alice", ["SELECT", "INSERT"])],
+            [Privileges("bob", "alice", ["SELECT"])],
+            ["GRANT INSERT ON TABLE s.t TO bob"],
+        ),
+        (
+            table,
+            [Privileges("bob", "alice", ["SELECT"])],
+            [Privileges("bob", "alice", ["SELECT", "INSERT", "UPDATE"])],
+            ["REVOKE UPDATE, INSERT ON TABLE s.t FROM bob"],
+        ),
+        (
+            table,
+            [],
+            [Privileges("bob", "alice", ["ALL"])],
+            ["REVOKE ALL ON TABLE s.t FROM bob"],
+        ),
+        (
+            table,
+            [Privileges("bob", "alice", ["ALL"])],
+            [Privileges("bob", "alice", ["SELECT"])],
+            [
+                "GRANT UPDATE, INSERT, REFERENCES, DELETE, TRIGGER, TRUNCATE "
+                "ON TABLE s.t TO bob"
+            ],
+        ),
+        (
+            # Granting the missing privileges adds up to ALL.
+            table,
+            [Privileges("bob", "alice", ["ALL"])],
+            [],
+            ["GRANT ALL ON TABLE s.t TO bob"],
+        ),
+        (
+            # Downgrade only revokes the grant option.
+            table,
+            [Privileges("bob", "alice", ["SELECT"])],
+            [Privileges("bob", "alice", [], ["SELECT"])],
+            ["REVOKE GRANT OPTION FOR SELECT ON TABLE s.t FROM bob"],
+        ),
+        (
+            table,
+            [Privileges("bob", "alice", [], ["SELECT"])],
+            [Privileges("bob", "alice", ["SELECT"])],
+            ["GRANT SELECT ON TABLE s.t TO bob WITH GRANT OPTION"],
+        ),
+        (
+            table,
+            [Privileges("bob", "alice", ["INSERT"], ["SELECT"])],
+            [Privileges("bob", "alice", ["UPDATE"])],
+            [
+                "REVOKE UPDATE ON TABLE s.t FROM bob",
+                "GRANT INSERT ON TABLE s.t TO bob",
+                "GRANT SELECT ON TABLE s.t TO bob WITH GRANT OPTION",
+            ],
+        ),
+        (
+            # Grantors are combined.
+            table,
+            [Privileges("bob", "alice", ["SELECT", "INSERT"])],
+            [
+                Privileges("bob", "alice", ["SELECT"]),
+                Privileges("bob", "charlie", ["INSERT"]),
+            ],
+            [],
+        ),
+        (
+            # Column privileges are separate from table privileges.
+            table,
+            [Privileges("bob", "alice", ["SELECT"])],
+            [Privileges("bob", "alice", ["SELECT", "SELECT (user)"])],
+            ['REVOKE SELECT ("user") ON TABLE s.t FROM bob'],
+        ),
+        (
+            table,
+            [Privileges("bob", "alice", ["SELECT (user)", "UPDATE (user)"])],
+            [Privileges("bob", "alice", ["SELECT"])],
+            [
+                "REVOKE SELECT ON TABLE s.t FROM bob",
+                'GRANT SELECT ("user"), UPDATE ("user") ON TABLE s.t TO bob',
+            ],
+        ),
+        (
+            column,
+            [Privileges("bob", "alice", ["ALL"])],
+            [Privileges("bob", "alice", ["SELECT (user)"])],
+            [
+                'GRANT UPDATE ("user"), INSERT ("user"), REFERENCES ("user") '
+                "ON TABLE s.t TO bob"
+            ],
+        ),
+        (
+            column,
+            [Privileges("bob", "alice", ["SELECT", "UPDATE", "INSERT", "REFERENCES"])],
+            [],
+            ['GRANT ALL ("user") ON TABLE s.t TO bob'],
+        ),
+        (
+            function,
+            [Privileges("alice", "alice", ["ALL"])],
+            [
+                Privileges("alice", "alice", ["ALL"]),
+                Privileges("PUBLIC", "alice", ["EXECUTE"]),
+            ],
+            ["REVOKE ALL ON FUNCTION s.f(integer) FROM PUBLIC"],
+        ),
+    ],
+)
+def test_diff_privileges(key, desired, current, expected):
+    assert compile_all(diff_privileges(key, desired, current)) == expected
+
+
+def test_diff_privileges_invalid():
+    with pytest.raises(ValueError):
+        diff_privileges(table, [Privileges("bob", "alice", ["BLAH"])], [])
+
+
+def test_diff_acls():
+    other = ObjectKey(type=PgObjectType.TABLE, name="t2", schema="s")
+    unmanaged = ObjectKey(type=PgObjectType.TABLE, name="t3", schema="s")
+
+    desired = {
+        table: [Privileges("bob", "alice", ["SELECT"])],
+        other: [Privileges("bob", "alice", ["SELECT"])],
+    }
+    current = {
+        table: [Privileges("bob", "alice", ["SELECT"])],
+        unmanaged: [Privileges("bob", "alice", ["SELECT"])],
+    }
+    assert compile_all(diff_acls(desired, current)) == [
+        "GRANT SELECT ON TABLE s.t2 TO bob"
+    ]
+
+
+def test_privileges_by_key():
+    tables = [
+        SchemaRelationInfo(oid=1, schema="s", name="t", owner="alice", acl=None),
+        SchemaRelationInfo(
+            oid=2, schema="s", name="t2", owner="alice", acl=["bob=r/alice"]
+        ),
+    ]
+    columns = [
+        ColumnInfo(
+            table_oid=1,
+            schema="s",
+            table="t",
+            column="user",
+            owner="alice",
+            acl=["bob=r/alice"],
+        ),
+        ColumnInfo(
+            table_oid=1, schema="s", table="t", column="id", owner="alice", acl=None
+        ),
+    ]
+
+    assert privileges_by_key(PgObjectType.TABLE, tables) == {
+        table: [Privileges("alice", "alice", ["ALL"])],
+        ObjectKey(type=PgObjectType.TABLE, name="t2", schema="s"): [
+            Privileges("bob", "alice", ["SELECT"])
+        ],
+    }
+    assert privileges_by_key(PgObjectType.TABLE, columns) == {
+        column: [Privileges("bob", "alice", ["SELECT (user)"])],
+        ObjectKey(type=PgObjectType.TABLE, name="t", schema="s", column="id"): [],
+    }
+
+
+def test_diff_acl_streams():
+    def key(oid, column=None):
+        return ObjectKey(
+            type=PgObjectType.TABLE, name=f"t{oid}", column=column, oid=oid
+        )
+
+    bob = Privileges("bob", "alice", ["SELECT"])
+    bob_insert = Privileges("bob", "alice", ["INSERT", "SELECT"])
+    carol = Privileges("carol", "alice", ["SELECT"])
+
+    old = [
+        (key(1), [bob]),
+        (key(2), [bob]),
+        (key(3, "a"), [bob, carol]),
+        (key(3, "b"), [bob]),
+    ]
+    new = [
+        (key(2), [Privileges("bob", "alice", ["SELECT"])]),
+        (key(3, "a"), [bob_insert]),
+        (key(4), [carol]),
+    ]
+
+    changes = list(diff_acl_streams(iter(old), iter(new)))
+    assert changes == [
+        PrivilegesChange(key(1), bob, None),
+        PrivilegesChange(key(3, "a"), bob, bob_insert),
+        PrivilegesChange(key(3, "a"), carol, None),
+        PrivilegesChange(key(3, "b"), bob, None),
+        PrivilegesChange(key(4), None, carol),
+    ]
+    assert [c.kind for c in changes] == [
+        "removed",
+        "changed",
+        "removed",
+        "removed",
+        "added",
+    ]
+
+    assert list(diff_acl_streams(old, [])) == list(diff_acl_streams(old, ()))
+    assert list(diff_acl_streams([], [])) == []
+
+
+def test_diff_acl_streams_unsorted():
+    keys = [
+        ObjectKey(type=PgObjectType.SCHEMA, name=name, oid=oid)
+        for name, oid in [("b", 2), ("a", 1)]
+    ]
+    with pytest.raises(ValueError, match="not sorted"):
+        list(diff_acl_streams([], [(k, []) for k in keys]))
+
+    new = sorted([(k, []) for k in keys], key=lambda kv: oid_sort_key(kv[0]))
+    assert list(diff_acl_streams([], new)) == []
+
+
+def test_iter_privileges_by_key():
+    tables = [
+        SchemaRelationInfo(oid=1, schema="s", name="t", owner="alice", acl=None),
+    ]
+    assert list(iter_privileges_by_key(PgObjectType.TABLE, tables)) == [
+        (table, [Privileges("alice", "alice", ["ALL"])]),
+    ]
@@ -5,8 +5,8 @@ from sqlalchemy import MetaData, Sequence, Table, table
 from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
-from pg_grant import PgObjectType, Privileges
-from pg_grant.sql import grant
+from pg_grant import PgObjectType, Privileges, sql
+from pg_grant.sql import grant, render_grant, revoke
 
 meta = MetaData()
 
@@ -294,3 +294,169 @@ def test_privileges_as_grant_statements(grantee, privs, privswgo, type_, target,
         expected.append(((privswgo, type_, target, grantee), gokw))
 
     assert r == expected
+
+
+@pytest.mark.parametrize(
+    "other, equal",
+    [
+        (grant(["SELECT"], PgObjectType.TABLE, "t", "alice", schema="s"), True),
+        (grant(["INSERT"], PgObjectType.TABLE, "t", "alice", schema="s"), False),
+        (grant(["SELECT"], PgObjectType.SEQUENCE, "t", "alice", schema="s"), False),
+        (grant(["SELECT"], PgObjectType.TABLE, "u", "alice", schema="s"), False),
+        (grant(["SELECT"], PgObjectType.TABLE, "t", "bob", schema="s"), False),
+        (grant(["SELECT"], PgObjectType.TABLE, "t", "alice"), False),
+        (
+            grant(
+                ["SELECT"],
+                PgObjectType.TABLE,
+                "t",
+                "alice",
+                schema="s",
+                grant_option=True,
+            ),
+            False,
+        ),
+        (
+            grant(
+                ["SELECT"],
+                PgObjectType.TABLE,
+                "t",
+                "alice",
+                schema="s",
+                quote_subname=False,
+            ),
+            False,
+        ),
+        (revoke(["SELECT"], PgObjectType.TABLE, "t", "alice", schema="s"), False),
+        (grant(["SELECT"], PgObjectType.TABLE, simple_table, "alice"), False),
+    ],
+)
+def test_grant_cache_key(other, equal):
+    statement = grant(["SELECT"], PgObjectType.TABLE, "t", "alice", schema="s")
+    key = statement._generate_cache_key()
+    assert key is not None
+    assert (key == other._generate_cache_key()) is equal
+
+
+def test_grant_function_cache_key():
+    def fn(arg_types):
+        return grant(
+            ["ALL"], PgObjectType.FUNCTION, "f", "alice", arg_types=arg_types
+        )._generate_cache_key()
+
+    assert fn(["integer"]) == fn(("integer",))
+    assert fn(["integer"]) != fn(["text"])
+    assert fn(["integer"]) != fn([])
+
+
+def test_grant_compile_cache_hit():
+    # Compile like Connection.execute does, without a database.
+    dialect = postgresql.dialect()
+    cache = {}
+    format_statement = patch(
+        "pg_grant.sql._format_statement", wraps=sql._format_statement
+    )
+
+    with format_statement as mock:
+        for grantee in ["bob", "bob", "bob", "charlie"]:
+            statement = grant(["SELECT"], PgObjectType.TABLE, "t", grantee)
+            statement._compile_w_cache(dialect, compiled_cache=cache, column_keys=[])
+
+    assert mock.call_count == 2
+    assert len(cache) == 2
+
+
+def test_grant_compiled_cache(connection):
+    cache = {}
+    connection.execution_options(compiled_cache=cache)
+    format_statement = patch(
+        "pg_grant.sql._format_statement", wraps=sql._format_statement
+    )
+
+    with connection.begin() as trans, format_statement as mock:
+        # Equal statements are compiled once, then found in the cache.
+        for _ in range(3):
+            connection.execute(grant(["SELECT"], PgObjectType.TABLE, "table1", "bob"))
+        assert mock.call_count == 1
+
+        connection.execute(grant(["INSERT"], PgObjectType.TABLE, "table1", "bob"))
+        assert mock.call_count == 2
+        assert len(cache) == 2
+        trans.rollback()
+
+
+@pytest.mark.parametrize(
+    "privs, type, target, grantee, kw",
+    [
+        (["ALL"], PgObjectType.TABLE, "users", "alice", {}),
+        (["SELECT", "INSERT"], PgObjectType.TABLE, "user", "grant", {"schema": "s"}),
+        (["SELECT (user)"], PgObjectType.TABLE, "t", "PUBLIC", {"grant_option": True}),
+        (["SELECT (id)"], PgObjectType.TABLE, "t", "alice", {"quote_subname": False}),
+        ("ALL", PgObjectType.SEQUENCE, "user_id", "Alice", {"schema": "S"}),
+        (["EXECUTE"], PgObjectType.FUNCTION, "f", "alice", {"arg_types": ()}),
+        (
+            ["ALL"],
+            PgObjectType.FUNCTION,
+            "f",
+            "alice",
+            {"arg_types": ["integer", "user"], "schema": "s"},
+        ),
+        (["USAGE"], PgObjectType.FOREIGN_DATA_WRAPPER, "fdw", "alice", {}),
+        (["SET", "ALTER SYSTEM"], PgObjectType.PARAMETER, "work_mem", "alice", {}),
+    ],
+)
+def test_render_grant(privs, type, target, grantee, kw):
+    statement = grant(privs, type, target, grantee, **kw)
+    rendered = render_grant(privs, type, target, grantee, **kw)
+    assert rendered == str(statement)
+    assert rendered == str(statement.compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.parametrize(
+    "privs, type, target, grantee, kw, expected",
+    [
+        (
+            ["SELECT"],
+            PgObjectType.TABLE,
+            "a%b",
+            "bob",
+            {},
+            'GRANT SELECT ON TABLE "a%b" TO bob',
+        ),
+        (
+            ["SELECT (c%d)"],
+            PgObjectType.TABLE,
+            "t",
+            "b%ob",
+            {"schema": "s%"},
+            'GRANT SELECT ("c%d") ON TABLE "s%".t TO "b%ob"',
+        ),
+        (
+            ["EXECUTE"],
+            PgObjectType.FUNCTION,
+            "f%",
+            "alice",
+            {"arg_types": ["integer"]},
+            'GRANT EXECUTE ON FUNCTION "f%"(integer) TO alice',
+        ),
+    ],
+)
+def test_render_grant_percent(privs, type, target, grantee, kw, expected):
+    # Percent signs are only doubled for drivers with the pyformat paramstyle.
+    statement = grant(privs, type, target, grantee, **kw)
+    assert render_grant(privs, type, target, grantee, **kw) == expected
+    assert str(statement) == expected
+
+
+@pytest.mark.parametrize(
+    "privs, type, target, kw",
+    [
+        (["BLAH"], PgObjectType.TABLE, "t", {}),
+        (["ALL"], PgObjectType.FUNCTION, "f", {}),
+        (["ALL"], PgObjectType.TABLE, "t", {"arg_types": ()}),
+        (["ALL"], PgObjectType.TABLE, simple_table, {}),
+    ],
+)
+def test_render_grant_invalid(privs, type, target, kw):
+    with pytest.raises(ValueError):
+        render_grant(privs, type, target, "alice", **kw)
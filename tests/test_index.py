@@ -0,0 +1,192 @@
+import pytest
+
+from pg_grant import (
+    FunctionInfo,
+    ObjectKey,
+    PgObjectType,
+    Privileges,
+    SchemaRelationInfo,
+    parse_acl,
+)
+from pg_grant.index import AclIndex
+from pg_grant.types import ColumnInfo
+
+tables = [
+    SchemaRelationInfo(oid=1, schema="public", name="table1", owner="alice", acl=None),
+    SchemaRelationInfo(
+        oid=2,
+        schema="public",
+        name="table2",
+        owner="alice",
+        acl=["alice=arwdDxt/alice", "bob=ar*wdDxt/alice"],
+    ),
+    SchemaRelationInfo(
+        oid=3,
+        schema="schema1",
+        name="table3",
+        owner="bob",
+        acl=["bob=arwdDxt/bob", "charlie=r/bob", "=r/bob"],
+    ),
+]
+
+functions = [
+    FunctionInfo(
+        oid=4,
+        schema="public",
+        name="fun1",
+        owner="alice",
+        arg_types=["integer"],
+        acl=None,
+    ),
+    FunctionInfo(
+        oid=5,
+        schema="public",
+        name="fun1",
+        owner="alice",
+        arg_types=["text"],
+        acl=["alice=X/alice"],
+    ),
+]
+
+columns = [
+    ColumnInfo(
+        table_oid=2,
+        schema="public",
+        table="table2",
+        column="user",
+        owner="alice",
+        acl=["charlie=r/alice"],
+    ),
+    ColumnInfo(
+        table_oid=2,
+        schema="public",
+        table="table2",
+        column="id",
+        owner="alice",
+        acl=None,
+    ),
+]
+
+
+@pytest.fixture
+def index():
+    index = AclIndex.from_infos(PgObjectType.TABLE, tables)
+    index.add_infos(PgObjectType.FUNCTION, functions)
+    index.add_infos(PgObjectType.TABLE, columns)
+    return index
+
+
+def key(info):
+    if isinstance(info, FunctionInfo):
+        return ObjectKey.from_info(PgObjectType.FUNCTION, info)
+    return ObjectKey.from_info(PgObjectType.TABLE, info)
+
+
+def test_object_key_ignores_oid():
+    assert ObjectKey(type=PgObjectType.TABLE, name="t", oid=1) == ObjectKey(
+        type=PgObjectType.TABLE, name="t"
+    )
+
+
+def test_len(index):
+    # table1 has the owner's default privileges, and fun1(integer) also has
+    # PUBLIC's default EXECUTE privilege.
+    assert len(index) == 1 + 2 + 3 + 2 + 1 + 1
+
+
+def test_add_duplicate(index):
+    with pytest.raises(ValueError, match="already in index"):
+        index.add(key(tables[1]), ["charlie=r/alice"])
+    with pytest.raises(ValueError, match="already in index"):
+        index.add_infos(PgObjectType.TABLE, tables[:1])
+    assert len(index) == 10
+    assert index.privileges(key(tables[0])) == [
+        Privileges(grantee="alice", grantor="alice", privs=["ALL"])
+    ]
+
+
+def test_contains(index):
+    assert key(tables[0]) in index
+    assert ObjectKey(type=PgObjectType.TABLE, name="table1") not in index
+
+
+@pytest.mark.parametrize("info", tables[1:])
+def test_privileges(index, info):
+    assert index.privileges(key(info)) == parse_acl(info.acl, PgObjectType.TABLE)
+
+
+def test_privileges_default(index):
+    assert index.privileges(key(tables[0])) == [
+        Privileges(grantee="alice", grantor="alice", privs=["ALL"])
+    ]
+    # Like parse_acl, EXECUTE is reduced to ALL for functions.
+    assert index.privileges(key(functions[0])) == [
+        Privileges(grantee="alice", grantor="alice", privs=["ALL"]),
+        Privileges(grantee="PUBLIC", grantor="alice", privs=["ALL"]),
+    ]
+
+
+def test_privileges_column(index):
+    assert index.privileges(key(columns[0])) == [
+        Privileges(grantee="charlie", grantor="alice", privs=["SELECT (user)"])
+    ]
+    assert index.privileges(key(columns[1])) == []
+
+
+def test_privileges_missing(index):
+    with pytest.raises(KeyError):
+        index.privileges(ObjectKey(type=PgObjectType.TABLE, name="table4"))
+
+
+def test_grantees(index):
+    assert index.grantees(key(tables[2])) == ["bob", "charlie", "PUBLIC"]
+
+
+@pytest.mark.parametrize(
+    "kwargs, expected",
+    [
+        ({"grantee": "bob"}, [tables[1], tables[2]]),
+        ({"grantee": "dave"}, []),
+        ({"grantee": "charlie"}, [tables[2], columns[0]]),
+        ({"grantee": "charlie", "schema": "public"}, [columns[0]]),
+        ({"grantee": "PUBLIC", "privilege": "SELECT"}, [tables[2]]),
+        ({"grantor": "bob"}, [tables[2]]),
+        ({"privilege": "SELECT", "grant_option": True}, [tables[1]]),
+        ({"grantee": "bob", "privilege": "UPDATE", "grant_option": True}, []),
+        ({"privilege": "TRUNCATE", "schema": "schema1"}, [tables[2]]),
+        ({"privilege": "EXECUTE"}, functions),
+    ],
+)
+def test_objects(index, kwargs, expected):
+    assert index.objects(**kwargs) == [key(info) for info in expected]
+
+
+def test_objects_role_only_grantee_or_grantor():
+    info = SchemaRelationInfo(
+        oid=1, schema="public", name="t", owner="alice", acl=["bob=r/alice"]
+    )
+    index = AclIndex.from_infos(PgObjectType.TABLE, [info])
+
+    assert index.objects(grantee="bob") == [key(info)]
+    assert index.objects(grantor="bob") == []
+    assert index.objects(grantor="alice") == [key(info)]
+    assert index.objects(grantee="alice") == []
+    assert index.objects(grantee="alice", grantor="bob") == []
+
+
+def test_objects_invalid(index):
+    with pytest.raises(ValueError):
+        index.objects(privilege="BLAH")
+
+    with pytest.raises(TypeError):
+        index.objects(grant_option=True)
+
+
+def test_lookup(index):
+    assert index.lookup(name="fun1") == [
+        key(functions[0]),
+        key(functions[1]),
+    ]
+    assert index.lookup(oid=2) == [key(tables[1]), key(columns[0]), key(columns[1])]
+    assert index.lookup(type=PgObjectType.TABLE, schema="schema1") == [key(tables[2])]
+    assert index.lookup(type=PgObjectType.SEQUENCE) == []
@@ -0,0 +1,94 @@
+import pytest
+
+from pg_grant import (
+    FunctionInfo,
+    PgObjectType,
+    Privileges,
+    RelationInfo,
+    SchemaRelationInfo,
+)
+from pg_grant.types import ColumnInfo, ParameterInfo
+
+
+def test_relation_info_privileges():
+    info = SchemaRelationInfo(
+        oid=1,
+        name="t",
+        owner="alice",
+        acl=["bob=r/alice"],
+        schema="s",
+        type=PgObjectType.TABLE,
+    )
+    assert info.privileges == [Privileges("bob", "alice", ["SELECT"])]
+    assert info.privileges is info.privileges
+
+    info.acl = None
+    assert info.privileges == [Privileges("alice", "alice", ["ALL"])]
+
+
+def test_relation_info_privileges_default():
+    info = RelationInfo(
+        oid=1, name="plpgsql", owner="alice", acl=None, type=PgObjectType.LANGUAGE
+    )
+    assert info.privileges == [
+        Privileges("alice", "alice", ["ALL"]),
+        Privileges("PUBLIC", "alice", ["USAGE"]),
+    ]
+
+    function = FunctionInfo(
+        oid=1, name="f", owner="alice", acl=None, schema="s", arg_types=[]
+    )
+    assert function.type is PgObjectType.FUNCTION
+    assert function.privileges[1] == Privileges("PUBLIC", "alice", ["EXECUTE"])
+
+
+def test_relation_info_privileges_unknown_type():
+    info = RelationInfo(oid=1, name="t", owner="alice", acl=None)
+    with pytest.raises(ValueError):
+        info.privileges
+
+
+def test_relation_info_type_not_compared():
+    kwargs = dict(oid=1, name="t", owner="alice", acl=None, schema="s")
+    info = SchemaRelationInfo(**kwargs, type=PgObjectType.TABLE)
+    assert info == SchemaRelationInfo(**kwargs)
+
+
+@pytest.mark.parametrize("acl", [None, ["bob=r/alice"]])
+def test_column_info_privileges(acl):
+    info = ColumnInfo(
+        table_oid=1, schema="s", table="t", column="c", owner="alice", acl=acl
+    )
+    expected = [] if acl is None else [Privileges("bob", "alice", ["SELECT (c)"])]
+    assert info.privileges == expected
+
+
+def test_parameter_info_privileges():
+    info = ParameterInfo(oid=1, name="work_mem", acl=None)
+    assert info.privileges == []
+    info = ParameterInfo(oid=1, name="work_mem", acl=["bob=s/alice"])
+    assert info.privileges == [Privileges("bob", "alice", ["SET"])]
+
+
+def test_init_privileges():
+    info = FunctionInfo(
+        oid=1,
+        name="f",
+        owner="alice",
+        acl=["alice=X/alice", "bob=X/alice"],
+        init_acl=["alice=X/alice"],
+        schema="s",
+        arg_types=[],
+    )
+    assert info.init_privileges == [Privileges("alice", "alice", ["ALL"])]
+
+    info.init_acl = None
+    assert info.init_privileges == [
+        Privileges("alice", "alice", ["ALL"]),
+        Privileges("PUBLIC", "alice", ["EXECUTE"]),
+    ]
+
+    column = ColumnInfo(
+        table_oid=1, schema="s", table="t", column="c", owner="alice", acl=None
+    )
+    assert column.init_privileges == []
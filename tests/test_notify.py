@@ -0,0 +1,108 @@
+import pytest
+from sqlalchemy import text
+
+from pg_grant import PgObjectType
+from pg_grant.notify import (
+    AclChange,
+    install_notify_trigger,
+    listen_acl_changes,
+    uninstall_notify_trigger,
+)
+
+
+@pytest.mark.parametrize(
+    "payload, expected",
+    [
+        (
+            '{"command": "GRANT", "object_type": "TABLE", "schema": null, '
+            '"identity": null, "oid": 0}',
+            AclChange("GRANT", "TABLE", None, None, None),
+        ),
+        (
+            '{"command": "DROP VIEW", "object_type": "view", "schema": "public", '
+            '"identity": "public.view1", "oid": 1234, "dropped": true}',
+            AclChange("DROP VIEW", "view", "public", "public.view1", 1234, True),
+        ),
+    ],
+)
+def test_acl_change_from_payload(payload, expected):
+    assert AclChange.from_payload(payload) == expected
+
+
+@pytest.mark.parametrize(
+    "object_type, type",
+    [
+        ("view", PgObjectType.TABLE),
+        ("table column", PgObjectType.TABLE),
+        ("function", PgObjectType.FUNCTION),
+        ("TABLE", PgObjectType.TABLE),
+        ("FOREIGN DATA WRAPPER", PgObjectType.FOREIGN_DATA_WRAPPER),
+        # ALTER DEFAULT PRIVILEGES
+        ("TABLES", PgObjectType.TABLE),
+        ("SEQUENCES", PgObjectType.SEQUENCE),
+        ("FUNCTIONS", PgObjectType.FUNCTION),
+        ("ROUTINES", PgObjectType.FUNCTION),
+        ("TYPES", PgObjectType.TYPE),
+        ("SCHEMAS", PgObjectType.SCHEMA),
+        ("index", None),
+        (None, None),
+    ],
+)
+def test_acl_change_type(object_type, type):
+    assert AclChange("ALTER", object_type, None, None, None).type is type
+
+
+@pytest.fixture
+def notify_trigger(engine, pg_schema):
+    with engine.begin() as conn:
+        install_notify_trigger(conn)
+    yield
+    with engine.begin() as conn:
+        uninstall_notify_trigger(conn)
+
+
+def test_listen_acl_changes(engine, notify_trigger):
+    listener = engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+    with listener:
+        changes = listen_acl_changes(listener, timeout=1)
+
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE notify1 (id integer)"))
+            conn.execute(text("GRANT SELECT ON TABLE notify1 TO bob"))
+            conn.execute(text("DROP TABLE notify1"))
+            conn.execute(text("ALTER DEFAULT PRIVILEGES GRANT SELECT ON TABLES TO bob"))
+            conn.execute(
+                text("ALTER DEFAULT PRIVILEGES REVOKE SELECT ON TABLES FROM bob")
+            )
+
+        received = list(changes)
+
+    commands = [(c.command, c.identity, c.dropped) for c in received]
+    assert ("CREATE TABLE", "public.notify1", False) in commands
+    assert ("GRANT", None, False) in commands
+    assert ("DROP TABLE", "public.notify1", True) in commands
+
+    types = {c.type for c in received if c.command == "ALTER DEFAULT PRIVILEGES"}
+    assert types == {PgObjectType.TABLE}
+
+
+def test_listen_acl_changes_channel(engine, pg_schema):
+    channel = "acl%changes"
+    with engine.begin() as conn:
+        install_notify_trigger(conn, channel=channel)
+
+    try:
+        listener = engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+        with listener:
+            changes = listen_acl_changes(listener, channel=channel, timeout=1)
+
+            with engine.begin() as conn:
+                conn.execute(text("GRANT SELECT ON TABLE table1 TO bob"))
+                conn.execute(text("REVOKE SELECT ON TABLE table1 FROM bob"))
+
+            commands = [c.command for c in changes]
+    finally:
+        with engine.begin() as conn:
+            uninstall_notify_trigger(conn)
+
+    assert {"GRANT", "REVOKE"} <= set(commands)
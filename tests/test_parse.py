@@ -1,6 +1,7 @@
 import pytest
 
 from pg_grant import PgObjectType, Privileges, parse_acl, parse_acl_item
+from pg_grant.parse import _split_acl_array
 
 parse_data = [
     (
@@ -486,6 +487,50 @@ def test_parse_acl():
     ]
 
 
+def test_parse_acl_shared_strings():
+    first, second = parse_acl(
+        ["bob=arwdDxt/alice", "bob=arwdDxt/alice"], PgObjectType.TABLE
+    )
+    assert first == second
+    assert first.grantee is second.grantee
+    assert first.grantor is second.grantor
+    assert first.privs[0] is second.privs[0]
+
+    # Privileges are still separate objects, which can be changed.
+    first.privs.append("SELECT")
+    assert second.privs == ["ALL"]
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("{}", []),
+        ("{ali=a/ali,bob=a/ali}", ["ali=a/ali", "bob=a/ali"]),
+        ("[0:1]={ali=a/ali,bob=a/ali}", ["ali=a/ali", "bob=a/ali"]),
+        ("{ ali=a/ali , bob=a/ali }", ["ali=a/ali", "bob=a/ali"]),
+        (r'{"\"a b\"=a/ali",=U/ali}', ['"a b"=a/ali', "=U/ali"]),
+        (r'{"\"a,\"\"b\"=a/ali"}', ['"a,""b"=a/ali']),
+        (r'{"a\\b=a/ali",b\,c=a/ali}', ["a\\b=a/ali", "b,c=a/ali"]),
+        ('{"NULL=a/ali"}', ["NULL=a/ali"]),
+    ],
+)
+def test_split_acl_array(text, expected):
+    assert _split_acl_array(text) == expected
+
+
+@pytest.mark.parametrize("text", ["", "ali=a/ali", "{NULL}", '{"ali=a/ali}'])
+def test_split_acl_array_invalid(text):
+    with pytest.raises(ValueError, match="ACL syntax error"):
+        _split_acl_array(text)
+
+
+def test_parse_acl_text():
+    assert parse_acl(r'{ali=a/ali,"\"b c\"=a/ali"}', PgObjectType.TABLE) == [
+        Privileges(grantee="ali", grantor="ali", privs=["INSERT"], privswgo=[]),
+        Privileges(grantee="b c", grantor="ali", privs=["INSERT"], privswgo=[]),
+    ]
+
+
 @pytest.mark.parametrize("acl, grantee, grantor, privs, privswgo", parse_table_data)
 def test_parse_table(acl, grantee, grantor, privs, privswgo):
     parsed = parse_acl_item(acl, PgObjectType.TABLE)
@@ -0,0 +1,252 @@
+import pytest
+from sqlalchemy import table, text
+from sqlalchemy.dialects import postgresql
+
+from pg_grant import ApplyError, ObjectKey, PgObjectType
+from pg_grant.plan import ApplyResult, _compile, apply_statements, coalesce_statements
+from pg_grant.query import get_table_acl
+from pg_grant.sql import grant, revoke
+
+
+def compile_all(statements):
+    return [str(s.compile(dialect=postgresql.dialect())) for s in statements]
+
+
+def table_key(name, schema="s"):
+    return ObjectKey(type=PgObjectType.TABLE, name=name, schema=schema)
+
+
+@pytest.mark.parametrize(
+    "statements, expected",
+    [
+        ([], []),
+        (
+            [
+                grant(["SELECT"], PgObjectType.TABLE, "a", "alice", schema="s"),
+                grant(["SELECT"], PgObjectType.TABLE, "b", "alice", schema="s"),
+                grant(["SELECT"], PgObjectType.TABLE, "a", "bob", schema="s"),
+                grant(["SELECT"], PgObjectType.TABLE, "b", "bob", schema="s"),
+            ],
+            ["GRANT SELECT ON TABLE s.a, s.b TO alice, bob"],
+        ),
+        (
+            [
+                grant(["SELECT"], PgObjectType.TABLE, "a", "alice"),
+                grant(["SELECT"], PgObjectType.TABLE, "b", "alice"),
+                grant(["SELECT"], PgObjectType.TABLE, "a", "bob"),
+            ],
+            [
+                "GRANT SELECT ON TABLE a TO alice, bob",
+                "GRANT SELECT ON TABLE b TO alice",
+            ],
+        ),
+        (
+            # Privileges in a different order are still the same.
+            [
+                grant(["SELECT", "INSERT"], PgObjectType.TABLE, "a", "alice"),
+                grant(["INSERT", "SELECT"], PgObjectType.TABLE, "b", "alice"),
+                grant(["INSERT"], PgObjectType.TABLE, "c", "alice"),
+            ],
+            [
+                "GRANT SELECT, INSERT ON TABLE a, b TO alice",
+                "GRANT INSERT ON TABLE c TO alice",
+            ],
+        ),
+        (
+            [
+                grant(["SELECT"], PgObjectType.TABLE, "a", "alice"),
+                grant(["SELECT"], PgObjectType.TABLE, "b", "alice", grant_option=True),
+                revoke(["SELECT"], PgObjectType.TABLE, "c", "alice"),
+                revoke(["SELECT"], PgObjectType.TABLE, "d", "alice"),
+                grant(["SELECT"], PgObjectType.SEQUENCE, "e", "alice"),
+            ],
+            [
+                "REVOKE SELECT ON TABLE c, d FROM alice",
+                "GRANT SELECT ON TABLE a TO alice",
+                "GRANT SELECT ON TABLE b TO alice WITH GRANT OPTION",
+                "GRANT SELECT ON SEQUENCE e TO alice",
+            ],
+        ),
+        (
+            [
+                grant(["ALL"], PgObjectType.FUNCTION, "f", "alice", arg_types=()),
+                grant(["ALL"], PgObjectType.FUNCTION, "f", "alice", arg_types=["text"]),
+                grant(["ALL"], PgObjectType.TABLE, table("t"), "alice"),
+                grant(["ALL"], PgObjectType.TABLE, table("u"), "alice"),
+            ],
+            [
+                "GRANT ALL ON FUNCTION f(), f(text) TO alice",
+                "GRANT ALL ON TABLE t, u TO alice",
+            ],
+        ),
+        (
+            [
+                text("SET lock_timeout = '1s'"),
+                grant(["SELECT"], PgObjectType.TABLE, "a", "alice"),
+            ],
+            ["SET lock_timeout = '1s'", "GRANT SELECT ON TABLE a TO alice"],
+        ),
+    ],
+)
+def test_coalesce_statements(statements, expected):
+    assert compile_all(coalesce_statements(statements)) == expected
+
+
+def test_coalesce_statements_grantee_order():
+    statements = [
+        grant(["SELECT"], PgObjectType.TABLE, "a", "alice"),
+        grant(["SELECT"], PgObjectType.TABLE, "a", "bob"),
+        grant(["SELECT"], PgObjectType.TABLE, "b", "bob"),
+        grant(["SELECT"], PgObjectType.TABLE, "b", "alice"),
+    ]
+    assert compile_all(coalesce_statements(statements)) == [
+        "GRANT SELECT ON TABLE a, b TO alice, bob",
+    ]
+
+
+def test_coalesce_statements_max_targets():
+    statements = [
+        grant(["SELECT"], PgObjectType.TABLE, name, "alice") for name in "abcde"
+    ]
+    assert compile_all(coalesce_statements(statements, max_targets=2)) == [
+        "GRANT SELECT ON TABLE a, b TO alice",
+        "GRANT SELECT ON TABLE c, d TO alice",
+        "GRANT SELECT ON TABLE e TO alice",
+    ]
+
+
+def test_coalesce_statements_in_schema():
+    catalog = [
+        table_key("a", "s1"),
+        table_key("b", "s1"),
+        table_key("c", "s2"),
+        table_key("d", "s2"),
+        table_key("e", "s3"),
+        ObjectKey(type=PgObjectType.TABLE, name="e", schema="s3", column="id"),
+    ]
+    statements = [
+        grant(["SELECT"], PgObjectType.TABLE, key.name, "alice", schema=key.schema)
+        for key in catalog[:3] + catalog[4:5]
+    ]
+    assert compile_all(coalesce_statements(statements, catalog=catalog)) == [
+        "GRANT SELECT ON ALL TABLES IN SCHEMA s1, s3 TO alice",
+        "GRANT SELECT ON TABLE s2.c TO alice",
+    ]
+
+
+def test_coalesce_statements_in_schema_function():
+    catalog = [
+        ObjectKey(
+            type=PgObjectType.FUNCTION, name="f", schema="s", arg_types=("integer",)
+        ),
+        ObjectKey(type=PgObjectType.FUNCTION, name="f", schema="s", arg_types=()),
+    ]
+    statements = [
+        revoke(["ALL"], PgObjectType.FUNCTION, "f", "PUBLIC", schema="s", arg_types=[]),
+    ]
+    assert compile_all(coalesce_statements(statements, catalog=catalog)) == [
+        "REVOKE ALL ON FUNCTION s.f() FROM PUBLIC",
+    ]
+
+    statements.append(
+        revoke(
+            ["ALL"],
+            PgObjectType.FUNCTION,
+            "f",
+            "PUBLIC",
+            schema="s",
+            arg_types=["integer"],
+        )
+    )
+    assert compile_all(coalesce_statements(statements, catalog=catalog)) == [
+        "REVOKE ALL ON ALL ROUTINES IN SCHEMA s FROM PUBLIC",
+    ]
+
+
+def test_compile_percent():
+    # Statements are sent without parameters, so percent signs aren't doubled.
+    statement = grant(["SELECT"], PgObjectType.TABLE, "a%b", "b%ob", schema="s%")
+    assert _compile(statement) == 'GRANT SELECT ON TABLE "s%"."a%b" TO "b%ob"'
+
+
+@pytest.fixture(params=[False, True], ids=["batch", "pipeline"])
+def pipeline(request, connection):
+    if request.param:
+        from psycopg import Pipeline
+
+        if not Pipeline.is_supported():
+            pytest.skip("pipeline mode is not supported")
+    return request.param
+
+
+def test_apply_statements(connection, pipeline):
+    statements = [
+        grant(["SELECT"], PgObjectType.TABLE, name, "bob")
+        for name in ["table1", "view1", "mview1"]
+    ]
+
+    with connection.begin() as trans:
+        result = apply_statements(
+            connection, statements, chunk_size=2, pipeline=pipeline, lock_timeout="1s"
+        )
+        assert result == ApplyResult(executed=3)
+        assert set(get_table_acl(connection, "table1").acl) == {
+            "alice=arwdDxt/alice",
+            "bob=r/alice",
+        }
+        trans.rollback()
+
+
+def test_apply_statements_percent(connection, pipeline):
+    statements = [grant(["SELECT"], PgObjectType.TABLE, "a%b", "bob")]
+
+    with connection.begin() as trans:
+        connection.execute(text('CREATE TABLE "a%b" (id integer)'))
+        result = apply_statements(connection, statements, pipeline=pipeline)
+        assert result == ApplyResult(executed=1)
+        assert "bob=r/alice" in get_table_acl(connection, "a%b").acl
+        trans.rollback()
+
+
+def test_apply_statements_continue_on_error(connection, pipeline):
+    statements = [
+        grant(["SELECT"], PgObjectType.TABLE, name, "bob")
+        for name in ["table1", "table3", "view1"]
+    ]
+
+    with connection.begin() as trans:
+        result = apply_statements(
+            connection, statements, pipeline=pipeline, continue_on_error=True
+        )
+        assert result.executed == 2
+        [failure] = result.failures
+        assert failure.sql == "GRANT SELECT ON TABLE table3 TO bob"
+        assert get_table_acl(connection, "view1").acl is not None
+        trans.rollback()
+
+
+def test_apply_statements_error(connection, pipeline):
+    statements = [
+        grant(["SELECT"], PgObjectType.TABLE, name, "bob")
+        for name in ["table1", "table3", "view1"]
+    ]
+
+    with connection.begin() as trans:
+        with pytest.raises(ApplyError) as exc_info:
+            apply_statements(connection, statements, pipeline=pipeline)
+        assert exc_info.value.sql == "GRANT SELECT ON TABLE table3 TO bob"
+        trans.rollback()
+
+
+def test_apply_statements_chunk_transaction(connection):
+    statements = [grant(["SELECT"], PgObjectType.TABLE, "table3", "bob")]
+
+    with pytest.raises(ValueError):
+        apply_statements(connection, statements, transaction="blah")
+
+    result = apply_statements(
+        connection, statements, transaction="chunk", continue_on_error=True
+    )
+    assert result.executed == 0
+    assert len(result.failures) == 1
+    assert not connection.in_transaction()
@@ -6,7 +6,7 @@ from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 from pg_grant import PgObjectType, Privileges
-from pg_grant.sql import revoke
+from pg_grant.sql import render_revoke, revoke
 
 meta = MetaData()
 
@@ -231,6 +231,53 @@ def test_privileges_as_revoke_statements(grantee, privs, privswgo, type_, target
         expected.append(((privs, type_, target, grantee), kw))
 
     if privswgo:
-        expected.append(((privswgo, type_, target, grantee), kw))
+        expected.append(
+            ((privswgo, type_, target, grantee), {**kw, "grant_option": False})
+        )
 
     assert r == expected
+
+
+@pytest.mark.parametrize(
+    "privs, privswgo, expected",
+    [
+        (["SELECT"], [], []),
+        (
+            ["SELECT"],
+            ["INSERT", "UPDATE"],
+            ["REVOKE GRANT OPTION FOR INSERT, UPDATE ON TABLE s.t FROM alice"],
+        ),
+    ],
+)
+def test_privileges_as_revoke_statements_grant_option(privs, privswgo, expected):
+    priv = Privileges("alice", "bob", privs, privswgo)
+    statements = priv.as_revoke_statements(
+        PgObjectType.TABLE, "t", schema="s", grant_option=True
+    )
+    assert [str(s) for s in statements] == expected
+
+
+@pytest.mark.parametrize(
+    "privs, type, target, grantee, kw",
+    [
+        (["ALL"], PgObjectType.TABLE, "users", "PUBLIC", {}),
+        (["SELECT (user)"], PgObjectType.TABLE, "user", "grant", {"schema": "s"}),
+        (["SELECT"], PgObjectType.TABLE, "t", "alice", {"grant_option": True}),
+        (["ALL"], PgObjectType.FUNCTION, "f", "alice", {"arg_types": ["int4"]}),
+        (["USAGE"], PgObjectType.SCHEMA, "public", "alice", {}),
+        (["SELECT (c%)"], PgObjectType.TABLE, "a%b", "b%ob", {"schema": "s%"}),
+    ],
+)
+def test_render_revoke(privs, type, target, grantee, kw):
+    statement = revoke(privs, type, target, grantee, **kw)
+    assert render_revoke(privs, type, target, grantee, **kw) == str(statement)
+
+
+def test_render_revoke_percent():
+    statement = revoke(["SELECT"], PgObjectType.TABLE, "a%b", "bob", schema="s%")
+    expected = 'REVOKE SELECT ON TABLE "s%"."a%b" FROM bob'
+    assert (
+        render_revoke(["SELECT"], PgObjectType.TABLE, "a%b", "bob", schema="s%")
+        == expected
+    )
+    assert str(statement) == expected
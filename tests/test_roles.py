@@ -0,0 +1,103 @@
+import pytest
+from sqlalchemy import text
+
+from pg_grant import ObjectKey, PgObjectType, Privileges
+from pg_grant.diff import privileges_by_key
+from pg_grant.query import get_all_table_acls
+from pg_grant.roles import (
+    PUBLIC_OID,
+    OidAclInfo,
+    OidAclItem,
+    RoleMap,
+    _oid_acl,
+    get_all_oid_acls,
+    get_role_map,
+)
+
+roles = RoleMap({10: "alice", 20: "bob"})
+table = ObjectKey(type=PgObjectType.TABLE, name="t", schema="s")
+
+
+def test_role_map():
+    assert len(roles) == 2
+    assert dict(roles) == {10: "alice", 20: "bob"}
+    assert roles.name(20) == "bob"
+    assert roles.name(PUBLIC_OID) == "PUBLIC"
+    assert roles.name(30) == "30"
+    assert roles.oid("bob") == 20
+    assert roles.oid("PUBLIC") == PUBLIC_OID
+    assert roles.oid("30") == 30
+    with pytest.raises(KeyError):
+        roles.oid("charlie")
+
+
+def test_oid_acl_info_privileges():
+    item = OidAclItem(grantee=PUBLIC_OID, grantor=10, privs_mask=1, privswgo_mask=0)
+    info = OidAclInfo(key=table, owner=10, acl=(item,))
+    assert info.privileges(roles) == [Privileges("PUBLIC", "alice", ["SELECT"])]
+
+    info = OidAclInfo(key=table, owner=10, acl=None)
+    assert info.privileges(roles) == [Privileges("alice", "alice", ["ALL"])]
+
+    column = ObjectKey(type=PgObjectType.TABLE, name="t", schema="s", column="c")
+    assert OidAclInfo(key=column, owner=10, acl=None).privileges(roles) == []
+
+
+def test_oid_acl():
+    items = {}
+    acl = _oid_acl(
+        items,
+        [10, 10, 20, 0],
+        [10, 10, 10, 10],
+        ["SELECT", "INSERT", "SELECT", "SELECT"],
+        [False, True, True, False],
+    )
+    assert acl == (
+        OidAclItem(grantee=10, grantor=10, privs_mask=1, privswgo_mask=4),
+        OidAclItem(grantee=20, grantor=10, privs_mask=0, privswgo_mask=1),
+        OidAclItem(grantee=PUBLIC_OID, grantor=10, privs_mask=1, privswgo_mask=0),
+    )
+    assert _oid_acl(items, [0], [10], ["SELECT"], [False])[0] is acl[2]
+    assert _oid_acl(items, [], [], [], []) == ()
+
+
+def test_oid_acl_unknown_privilege_type():
+    acl = _oid_acl({}, [20, 20], [10, 10], ["MAINTAIN", "SELECT"], [False, True])
+    assert acl == (OidAclItem(grantee=20, grantor=10, privs_mask=0, privswgo_mask=1),)
+
+
+def test_get_all_oid_acls(connection):
+    with connection.begin() as trans:
+        connection.execute(text("GRANT SELECT ON TABLE table1 TO bob"))
+        connection.execute(text("GRANT SELECT ON TABLE view1 TO bob"))
+        connection.execute(text("REVOKE ALL ON TABLE mview1 FROM alice"))
+
+        roles = get_role_map(connection)
+        assert roles.name(roles.oid("bob")) == "bob"
+
+        infos = get_all_oid_acls(connection, ["table"])
+        expected = privileges_by_key(PgObjectType.TABLE, get_all_table_acls(connection))
+        assert {info.key: info.privileges(roles) for info in infos} == expected
+
+        by_name = {info.key.name: info for info in infos}
+        assert by_name["table1"].owner == roles.oid("alice")
+        assert by_name["table1"].acl[1] is by_name["view1"].acl[1]
+        assert by_name["table2"].acl is not None
+        assert by_name["mview1"].acl == ()
+        trans.rollback()
+
+
+def test_get_all_oid_acls_renamed_role(connection):
+    with connection.begin() as trans:
+        connection.execute(text("GRANT SELECT ON TABLE table1 TO bob"))
+        roles = get_role_map(connection)
+
+        connection.execute(text("ALTER ROLE bob RENAME TO bobby"))
+        infos = get_all_oid_acls(connection, ["table"])
+        (table1,) = [info for info in infos if info.key.name == "table1"]
+        assert table1.acl[1].grantee == roles.oid("bob")
+        assert table1.privileges(roles)[1].grantee == "bob"
+
+        renamed = get_role_map(connection)
+        assert table1.privileges(renamed)[1].grantee == "bobby"
+        trans.rollback()
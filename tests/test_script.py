@@ -0,0 +1,77 @@
+import io
+
+import pytest
+
+from pg_grant import ObjectKey, PgObjectType, Privileges
+from pg_grant.sql import grant, iter_privilege_sql, write_script
+
+table = ObjectKey(type=PgObjectType.TABLE, name="user", schema="s")
+column = ObjectKey(type=PgObjectType.TABLE, name="t", column="id")
+function = ObjectKey(type=PgObjectType.FUNCTION, name="f", arg_types=())
+
+
+def test_iter_privilege_sql():
+    entries = [
+        (table, Privileges("alice", "alice", ["ALL"])),
+        (table, Privileges("bob", "alice", ["SELECT"], ["INSERT"])),
+        (column, Privileges("bob", "alice", ["SELECT (id)"])),
+        (function, Privileges("PUBLIC", "alice", ["EXECUTE"])),
+    ]
+    assert list(iter_privilege_sql(entries)) == [
+        'GRANT ALL ON TABLE s."user" TO alice',
+        'GRANT SELECT ON TABLE s."user" TO bob',
+        'GRANT INSERT ON TABLE s."user" TO bob WITH GRANT OPTION',
+        "GRANT SELECT (id) ON TABLE t TO bob",
+        "GRANT EXECUTE ON FUNCTION f() TO PUBLIC",
+    ]
+    assert list(iter_privilege_sql(entries[1:2], revoke=True)) == [
+        'REVOKE SELECT ON TABLE s."user" FROM bob',
+        'REVOKE INSERT ON TABLE s."user" FROM bob',
+    ]
+
+
+@pytest.mark.parametrize(
+    "kw, expected",
+    [
+        ({}, "BEGIN;\na;\nb;\nc;\nCOMMIT;\n"),
+        ({"batch_size": 2}, "BEGIN;\na;\nb;\nCOMMIT;\n\nBEGIN;\nc;\nCOMMIT;\n"),
+        ({"batch_size": 3}, "BEGIN;\na;\nb;\nc;\nCOMMIT;\n"),
+        ({"transaction": False}, "a;\nb;\nc;\n"),
+        ({"transaction": False, "batch_size": 2}, "a;\nb;\n\nc;\n"),
+    ],
+)
+def test_write_script(kw, expected):
+    fp = io.StringIO()
+    assert write_script(fp, iter("abc"), **kw) == 3
+    assert fp.getvalue() == expected
+
+
+def test_write_script_empty():
+    fp = io.StringIO()
+    assert write_script(fp, []) == 0
+    assert fp.getvalue() == ""
+
+
+def test_write_script_executable():
+    fp = io.StringIO()
+    write_script(fp, [grant(["SELECT"], PgObjectType.TABLE, "user", "bob")])
+    assert fp.getvalue() == 'BEGIN;\nGRANT SELECT ON TABLE "user" TO bob;\nCOMMIT;\n'
+
+
+def test_write_script_percent():
+    key = ObjectKey(type=PgObjectType.TABLE, name="a%b", schema="s%")
+    statements = [
+        *iter_privilege_sql([(key, Privileges("b%ob", "alice", ["SELECT"]))]),
+        grant(["INSERT"], PgObjectType.TABLE, "a%b", "b%ob", schema="s%"),
+    ]
+    fp = io.StringIO()
+    write_script(fp, statements, transaction=False)
+    assert fp.getvalue() == (
+        'GRANT SELECT ON TABLE "s%"."a%b" TO "b%ob";\n'
+        'GRANT INSERT ON TABLE "s%"."a%b" TO "b%ob";\n'
+    )
+
+
+def test_write_script_invalid_batch_size():
+    with pytest.raises(ValueError):
+        write_script(io.StringIO(), [], batch_size=0)
@@ -0,0 +1,125 @@
+import pytest
+from sqlalchemy import text
+
+from pg_grant import ObjectKey, PgObjectType, SchemaRelationInfo
+from pg_grant.query import get_all_column_acls, get_all_table_acls
+from pg_grant.snapshot import (
+    DEFAULT_KINDS,
+    ObjectChange,
+    compare_fingerprints,
+    get_acl_fingerprints,
+    get_acl_summary,
+    take_snapshot,
+)
+
+
+def by_name(changes):
+    result = {}
+    for change in changes:
+        info = change.new or change.old
+        name = info.column if change.kind == "column" else info.name
+        result[change.kind, name] = change
+    return result
+
+
+def test_take_snapshot(connection):
+    snapshot = take_snapshot(connection)
+    assert snapshot.kinds == DEFAULT_KINDS
+    assert sorted(snapshot.infos("table"), key=lambda i: i.oid) == sorted(
+        get_all_table_acls(connection), key=lambda i: i.oid
+    )
+    assert len(snapshot.infos("column")) == len(get_all_column_acls(connection))
+    assert {i.name for i in snapshot.infos("foreign_server")} == {
+        "server1",
+        "server2",
+    }
+    domains = {i.name: i.type for i in snapshot.infos("domain")}
+    assert domains["positive"] is PgObjectType.DOMAIN
+    assert "positive" not in {i.name for i in snapshot.infos("type")}
+    assert snapshot.refresh(connection) == []
+
+
+def test_take_snapshot_invalid(connection):
+    with pytest.raises(ValueError):
+        take_snapshot(connection, ["blah"])
+
+    snapshot = take_snapshot(connection, ["schema"])
+    with pytest.raises(ValueError):
+        snapshot.infos("table")
+
+
+def test_refresh_snapshot(connection):
+    with connection.begin() as trans:
+        snapshot = take_snapshot(connection, ["table", "column", "schema"])
+        size = len(snapshot)
+
+        connection.execute(text("GRANT SELECT ON TABLE table1 TO bob"))
+        connection.execute(text("CREATE TABLE snapshot1 (id integer)"))
+        connection.execute(text("DROP VIEW view2"))
+
+        changes = by_name(snapshot.refresh(connection))
+
+        change = changes.pop(("table", "table1"))
+        assert change.old.acl is None
+        assert "bob=r/alice" in change.new.acl
+        assert change.key == ObjectKey(
+            type=PgObjectType.TABLE, name="table1", schema="public"
+        )
+
+        change = changes.pop(("table", "snapshot1"))
+        assert change.old is None
+        assert changes.pop(("column", "id")).old is None
+
+        change = changes.pop(("table", "view2"))
+        assert change.new is None
+
+        # The columns of view2 were removed too
+        assert all(c.kind == "column" and c.new is None for c in changes.values())
+
+        assert snapshot.refresh(connection) == []
+        assert len(snapshot) != size
+        trans.rollback()
+
+
+def test_object_change_key():
+    info = SchemaRelationInfo(oid=1, schema="s", name="t", owner="alice", acl=None)
+    change = ObjectChange("sequence", None, info)
+    assert change.key == ObjectKey(type=PgObjectType.SEQUENCE, name="t", schema="s")
+
+
+def test_get_acl_fingerprints(connection):
+    table1 = ObjectKey(type=PgObjectType.TABLE, name="table1", schema="public")
+    table2 = ObjectKey(type=PgObjectType.TABLE, name="table2", schema="public")
+
+    with connection.begin() as trans:
+        before = get_acl_fingerprints(connection, ["table", "column", "function"])
+        assert before[table1] != before[table2]
+        assert get_acl_fingerprints(connection, ["table", "column", "function"]) == (
+            before
+        )
+
+        connection.execute(text("GRANT SELECT ON TABLE table1 TO bob"))
+        after = get_acl_fingerprints(connection, ["table", "column", "function"])
+        assert compare_fingerprints(before, after) == {table1}
+        trans.rollback()
+
+
+def test_get_acl_summary(connection):
+    with connection.begin() as trans:
+        before = get_acl_summary(connection, ["table", "schema"])
+        assert ("table", "public") in before
+        assert ("schema", None) in before
+
+        connection.execute(text("GRANT SELECT ON TABLE table1 TO bob"))
+        after = get_acl_summary(connection, ["table", "schema"])
+        assert compare_fingerprints(before, after) == {("table", "public")}
+        trans.rollback()
+
+
+def test_compare_fingerprints():
+    assert compare_fingerprints(
+        {"a": "1", "b": "2"}, {"a": "1", "b": "3", "c": "4"}
+    ) == {
+        "b",
+        "c",
+    }
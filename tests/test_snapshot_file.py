@@ -0,0 +1,174 @@
+import pytest
+
+from pg_grant import (
+    FunctionInfo,
+    ObjectKey,
+    PgObjectType,
+    SchemaRelationInfo,
+    parse_acl,
+)
+from pg_grant.diff import diff_acls
+from pg_grant.parse import get_default_privileges
+from pg_grant.snapshot import take_snapshot
+from pg_grant.snapshot_file import SnapshotFile, SnapshotWriter
+from pg_grant.types import ColumnInfo
+
+TABLE_ACL = ["alice=arwdDxt/alice", "bob=r*w/alice", "=r/alice"]
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "acls.snapshot"
+
+
+def test_snapshot_file_round_trip(path):
+    table = SchemaRelationInfo(
+        oid=10, name="table1", owner="alice", acl=TABLE_ACL, schema="public"
+    )
+    default = SchemaRelationInfo(
+        oid=11, name="table2", owner="alice", acl=None, schema="public"
+    )
+    columns = [
+        ColumnInfo(
+            table_oid=10,
+            schema="public",
+            table="table1",
+            column="id",
+            owner="alice",
+            acl=["bob=r/alice"],
+        ),
+        ColumnInfo(
+            table_oid=10,
+            schema="public",
+            table="table1",
+            column="name",
+            owner="alice",
+            acl=None,
+        ),
+    ]
+    functions = [
+        FunctionInfo(
+            oid=20,
+            name="fun1",
+            owner="alice",
+            acl=[],
+            schema="public",
+            arg_types=arg_types,
+        )
+        for arg_types in [(), ("int4",), ("int4", "text")]
+    ]
+
+    with SnapshotWriter(path) as writer:
+        writer.add_infos(PgObjectType.TABLE, [table, default])
+        writer.add_infos(PgObjectType.TABLE, columns)
+        writer.add_infos(PgObjectType.FUNCTION, functions)
+
+    with SnapshotFile(path) as snapshot:
+        assert len(snapshot) == 7
+
+        key = ObjectKey.from_info(PgObjectType.TABLE, table)
+        assert snapshot[key] == parse_acl(TABLE_ACL, PgObjectType.TABLE)
+        assert snapshot.owner(key) == "alice"
+
+        key = ObjectKey.from_info(PgObjectType.TABLE, default)
+        assert snapshot[key] == get_default_privileges(PgObjectType.TABLE, "alice")
+
+        key = ObjectKey.from_info(PgObjectType.TABLE, columns[0])
+        assert snapshot[key] == parse_acl(["bob=r/alice"], PgObjectType.TABLE, "id")
+        key = ObjectKey.from_info(PgObjectType.TABLE, columns[1])
+        assert snapshot[key] == []
+
+        for function in functions:
+            assert snapshot[ObjectKey.from_info(PgObjectType.FUNCTION, function)] == []
+
+        keys = list(snapshot)
+        assert keys[0] == ObjectKey(
+            type=PgObjectType.TABLE, name="table1", schema="public", oid=10
+        )
+        assert keys[0].oid == 10
+        assert [k.arg_types for k in keys[4:]] == [(), ("int4",), ("int4", "text")]
+        assert dict(snapshot.items()) == {k: snapshot[k] for k in snapshot}
+
+        missing = ObjectKey(type=PgObjectType.TABLE, name="table1")
+        assert missing not in snapshot
+        with pytest.raises(KeyError):
+            snapshot[missing]
+
+
+def test_snapshot_file_diff(path):
+    key = ObjectKey(type=PgObjectType.SCHEMA, name="schema1")
+    with SnapshotWriter(path) as writer:
+        writer.add(key, ["alice=UC/alice", "bob=U/alice"], owner="alice")
+
+    desired = {key: parse_acl(["alice=UC/alice"], PgObjectType.SCHEMA)}
+    with SnapshotFile(path) as snapshot:
+        statements = diff_acls(desired, snapshot)
+    assert [str(s) for s in statements] == ["REVOKE USAGE ON SCHEMA schema1 FROM bob"]
+
+
+def test_snapshot_file_empty(path):
+    with SnapshotWriter(path):
+        pass
+
+    with SnapshotFile(path) as snapshot:
+        assert len(snapshot) == 0
+        assert list(snapshot) == []
+
+
+def test_snapshot_file_invalid(path):
+    path.write_bytes(b"not a snapshot")
+    with pytest.raises(ValueError):
+        SnapshotFile(path)
+
+    path.write_bytes(bytes(100))
+    with pytest.raises(ValueError):
+        SnapshotFile(path)
+
+
+def test_snapshot_writer_duplicate(path):
+    key = ObjectKey(type=PgObjectType.TABLE, name="table1", schema="public")
+    with SnapshotWriter(path) as writer:
+        writer.add(key, TABLE_ACL, owner="alice")
+        with pytest.raises(ValueError, match="already in snapshot"):
+            writer.add(key, None, owner="alice")
+
+    with SnapshotFile(path) as snapshot:
+        assert len(snapshot) == 1
+        assert snapshot[key] == parse_acl(TABLE_ACL, PgObjectType.TABLE)
+
+
+def test_snapshot_writer_hash_collision(path, monkeypatch):
+    monkeypatch.setattr("pg_grant.snapshot_file._key_hash", lambda key: 1)
+    keys = [
+        ObjectKey(type=PgObjectType.TABLE, name=name, schema="public")
+        for name in ["table1", "table2"]
+    ]
+    with SnapshotWriter(path) as writer:
+        writer.add(keys[0], None, owner="alice")
+        writer.add(keys[1], ["bob=r/alice"], owner="alice")
+        for key in keys:
+            with pytest.raises(ValueError, match="already in snapshot"):
+                writer.add(key, None, owner="alice")
+
+    with SnapshotFile(path) as snapshot:
+        assert len(snapshot) == 2
+        assert snapshot[keys[1]] == parse_acl(["bob=r/alice"], PgObjectType.TABLE)
+
+
+def test_snapshot_writer_error(path):
+    with pytest.raises(RuntimeError):
+        with SnapshotWriter(path):
+            raise RuntimeError
+
+    assert not path.exists()
+
+
+def test_snapshot_writer_add_snapshot(connection, path):
+    snapshot = take_snapshot(connection, ["table", "schema"])
+    with SnapshotWriter(path) as writer:
+        writer.add_snapshot(snapshot)
+
+    with SnapshotFile(path) as snapshot_file:
+        assert len(snapshot_file) == len(snapshot)
+        key = ObjectKey(type=PgObjectType.TABLE, name="table1", schema="public")
+        assert snapshot_file[key] == get_default_privileges(PgObjectType.TABLE, "alice")